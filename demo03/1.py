@@ -1,8 +1,12 @@
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
+import argparse
+import json
+import multiprocessing
 import pandas as pd
 import numpy as np
 import os
+from concurrent.futures import ProcessPoolExecutor
 from dotenv import load_dotenv
 from prompts import (
     format_analyst_prompt, 
@@ -22,79 +26,194 @@ llm = ChatOpenAI(
     temperature=MODEL_CONFIG["temperature"]
 )
 
-# 修正后的示例数据生成函数（使用numpy代替pd.np）
-def generate_sample_data():
-    # 创建销售记录数据
-    products = [f"P{i:03d}" for i in range(1, SAMPLE_DATA_CONFIG['num_products'] + 1)]
-    dates = pd.date_range(end=pd.Timestamp.now(), periods=SAMPLE_DATA_CONFIG['date_range_days'], freq='D')
-    
-    sales_data = []
-    for product in products:
-        avg_sales = np.random.randint(5, 100)
-        volatility = np.random.uniform(0.2, 0.8)
-        for date in dates:
-            sales = max(0, np.random.normal(avg_sales, avg_sales * volatility))
-            sales_data.append({
-                'product_id': product,
-                'date': date.strftime('%Y-%m-%d'),
-                'quantity_sold': round(sales)
-            })
-    
-    sales_df = pd.DataFrame(sales_data)
-    sales_df.to_csv(DATA_FILES['sales_records'], index=False)
-    
-    # 创建商品信息数据
-    categories = SAMPLE_DATA_CONFIG['categories']
-    product_info = []
-    
-    for product in products:
-        category = np.random.choice(categories)
-        cost = round(np.random.uniform(5, 200), 2)
-        price = round(cost * np.random.uniform(1.2, 3), 2)
-        supplier_lead_time = np.random.randint(3, 15)
-        
-        product_info.append({
-            'product_id': product,
-            'name': f'{category}商品{product[1:]}',
-            'category': category,
-            'cost_price': cost,
-            'selling_price': price,
-            'supplier_lead_time': supplier_lead_time
-        })
-    
-    products_df = pd.DataFrame(product_info)
-    products_df.to_csv(DATA_FILES['products'], index=False)
-    
-    # 创建库存数据
-    inventory_data = []
-    
-    for product in products:
-        recent_sales = sales_df[sales_df['product_id'] == product].tail(30)
-        avg_daily_sales = recent_sales['quantity_sold'].mean()
-        max_daily_sales = recent_sales['quantity_sold'].max()
-        
-        # 随机确定商品类型（稳定或波动）
-        is_stable = np.random.choice([True, False])
-        safety_stock = avg_daily_sales * SAFETY_STOCK_CONFIG['stable_product_multiplier'] if is_stable else max_daily_sales * SAFETY_STOCK_CONFIG['volatile_product_multiplier']
-        
-        # 让一些商品处于低库存状态
-        if np.random.random() < SAMPLE_DATA_CONFIG['low_stock_probability']:
-            current_stock = np.random.randint(0, int(safety_stock * 0.7))
-        else:
-            current_stock = np.random.randint(int(safety_stock * 1.2), int(safety_stock * 3))
-        
-        inventory_data.append({
-            'product_id': product,
-            'current_stock': current_stock,
-            'safety_stock': safety_stock,
-            'last_updated': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
-        })
-    
-    inventory_df = pd.DataFrame(inventory_data)
-    inventory_df.to_csv(DATA_FILES['inventory'], index=False)
-    
-    print("示例数据已生成")
+# 分片数据集中的数据表（每张表一个子目录，每个分片一个 CSV 文件）
+SHARD_TABLES = ['sales_records', 'products', 'inventory']
+MANIFEST_NAME = 'manifest.json'
+
+
+def build_sample_data(product_numbers, num_days, categories, rng, end_date=None, updated_at=None):
+    """
+    按整块数组生成一组商品的示例数据，返回 (销售记录, 商品信息, 库存) 三张表
+
+    Args:
+        product_numbers: 商品序号数组（商品编号为 P + 至少 3 位序号）
+        num_days: 销售记录天数
+        categories: 商品类别列表
+        rng: numpy.random.Generator，相同种子生成相同数据
+        end_date: 销售记录的最后一天，默认为今天
+        updated_at: 库存的更新时间，默认为当前时间
+    """
+    num_products = len(product_numbers)
+    products = np.array([f"P{i:03d}" for i in product_numbers], dtype=object)
+    dates = pd.date_range(end=end_date or pd.Timestamp.now(), periods=num_days, freq='D').strftime('%Y-%m-%d')
+
+    # 销售记录：每个商品有自己的平均日销量和波动率，一次抽取 商品数 × 天数 的日销量
+    avg_sales = rng.integers(5, 100, num_products)
+    volatility = rng.uniform(0.2, 0.8, num_products)
+    sales = rng.normal(avg_sales[:, None], (avg_sales * volatility)[:, None], size=(num_products, num_days))
+    sales = np.rint(np.maximum(sales, 0)).astype('int32')
+
+    # 按商品、日期顺序排列；编号与日期用分类编码，写出时才展开为字符串
+    sales_df = pd.DataFrame({
+        'product_id': pd.Categorical.from_codes(np.repeat(np.arange(num_products), num_days), categories=products),
+        'date': pd.Categorical.from_codes(np.tile(np.arange(num_days), num_products), categories=dates),
+        'quantity_sold': sales.ravel()
+    })
+
+    # 商品信息
+    category = np.asarray(categories, dtype=object)[rng.integers(0, len(categories), num_products)]
+    cost = rng.uniform(5, 200, num_products).round(2)
+    products_df = pd.DataFrame({
+        'product_id': products,
+        'name': category + '商品' + np.array([product[1:] for product in products], dtype=object),
+        'category': category,
+        'cost_price': cost,
+        'selling_price': (cost * rng.uniform(1.2, 3, num_products)).round(2),
+        'supplier_lead_time': rng.integers(3, 15, num_products)
+    })
+
+    # 库存：按最近一个分析周期的销量计算安全库存（稳定商品用平均日销量，波动商品用最高日销量）
+    recent_sales = sales[:, -SAFETY_STOCK_CONFIG['analysis_period_days']:]
+    is_stable = rng.random(num_products) < 0.5
+    safety_stock = np.where(is_stable,
+                            recent_sales.mean(axis=1) * SAFETY_STOCK_CONFIG['stable_product_multiplier'],
+                            recent_sales.max(axis=1) * SAFETY_STOCK_CONFIG['volatile_product_multiplier'])
+
+    # 让一些商品处于低库存状态
+    is_low = rng.random(num_products) < SAMPLE_DATA_CONFIG['low_stock_probability']
+    low = np.where(is_low, 0, (safety_stock * 1.2).astype('int64'))
+    high = np.where(is_low, (safety_stock * 0.7).astype('int64'), (safety_stock * 3).astype('int64'))
+    current_stock = rng.integers(low, np.maximum(high, low + 1))
+
+    inventory_df = pd.DataFrame({
+        'product_id': products,
+        'current_stock': current_stock,
+        'safety_stock': safety_stock,
+        'last_updated': (updated_at or pd.Timestamp.now()).strftime('%Y-%m-%d %H:%M:%S')
+    })
+    return sales_df, products_df, inventory_df
+
+
+def generate_sample_data(num_products=None, num_days=None, categories=None, seed=None, data_files=DATA_FILES,
+                         end_date=None):
+    """
+    生成示例数据并写入数据文件（参数默认取 SAMPLE_DATA_CONFIG，相同种子与结束日期生成相同数据）
+
+    Args:
+        end_date: 销售记录的最后一天，默认为今天
+    """
+    num_products = num_products or SAMPLE_DATA_CONFIG['num_products']
+    num_days = num_days or SAMPLE_DATA_CONFIG['date_range_days']
+    categories = categories or SAMPLE_DATA_CONFIG['categories']
+    seed = SAMPLE_DATA_CONFIG['seed'] if seed is None else seed
+    end_date = pd.Timestamp.now().normalize() if end_date is None else pd.Timestamp(end_date).normalize()
+
+    rng = np.random.default_rng(seed)
+    sales_df, products_df, inventory_df = build_sample_data(
+        np.arange(1, num_products + 1), num_days, categories, rng, end_date)
+
+    sales_df.to_csv(data_files['sales_records'], index=False)
+    products_df.to_csv(data_files['products'], index=False)
+    inventory_df.to_csv(data_files['inventory'], index=False)
+
+    print(f"示例数据已生成：{num_products} 个商品，{num_days} 天（截至 {end_date:%Y-%m-%d}），"
+          f"{len(sales_df)} 条销售记录")
+
+
+def _generate_shard(task):
+    """在子进程中生成一个分片（一段连续的商品编号）并写入各数据表的分片文件，返回各表行数"""
+    index, product_start, product_stop, num_days, categories, seed_sequence, end_date, updated_at, output_dir = task
+    rng = np.random.default_rng(seed_sequence)
+    frames = build_sample_data(np.arange(product_start, product_stop), num_days, categories, rng,
+                               end_date, updated_at)
+    rows = {}
+    for name, df in zip(SHARD_TABLES, frames):
+        df.to_csv(os.path.join(output_dir, name, f'part-{index:05d}.csv'), index=False)
+        rows[name] = len(df)
+    return rows
+
+
+def generate_sharded_data(output_dir, num_products=None, num_days=None, shards=None, workers=None,
+                          categories=None, seed=None, end_date=None):
+    """
+    多进程生成分片示例数据：每个分片负责互不重叠的一段商品编号，使用由同一种子派生的独立随机数流，
+    各数据表写为 <output_dir>/<表名>/part-NNNNN.csv，最后写出清单文件 manifest.json。
+    在 config.py 中把 DATA_FILES['manifest'] 设置为清单路径即可直接加载分片数据集。
+
+    Args:
+        shards: 分片数，默认与进程数相同
+        workers: 生成进程数，默认使用全部 CPU 核心
+        end_date: 销售记录的最后一天，默认为今天（记录在清单中）
+
+    Returns:
+        清单文件路径
+    """
+    num_products = num_products or SAMPLE_DATA_CONFIG['num_products']
+    num_days = num_days or SAMPLE_DATA_CONFIG['date_range_days']
+    categories = categories or SAMPLE_DATA_CONFIG['categories']
+    seed = SAMPLE_DATA_CONFIG['seed'] if seed is None else seed
+    workers = workers or os.cpu_count() or 1
+    shards = min(shards or workers, num_products)
+
+    for name in SHARD_TABLES:
+        os.makedirs(os.path.join(output_dir, name), exist_ok=True)
+
+    # 所有分片共用同一个日期范围和更新时间；随机数流由种子派生，分片数相同时结果可复现
+    now = pd.Timestamp.now()
+    end_date = now.normalize() if end_date is None else pd.Timestamp(end_date).normalize()
+    bounds = np.linspace(1, num_products + 1, shards + 1).astype('int64')
+    seed_sequences = np.random.SeedSequence(seed).spawn(shards)
+    tasks = [(index, int(bounds[index]), int(bounds[index + 1]), num_days, categories,
+              seed_sequences[index], end_date, now, output_dir) for index in range(shards)]
+
+    if workers > 1 and shards > 1:
+        # 使用 spawn 启动子进程，避免在有后台线程的进程中 fork
+        with ProcessPoolExecutor(max_workers=min(workers, shards),
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            shard_rows = list(pool.map(_generate_shard, tasks))
+    else:
+        shard_rows = [_generate_shard(task) for task in tasks]
+
+    manifest = {
+        'format': 'csv',
+        'seed': seed,
+        'num_products': num_products,
+        'num_days': num_days,
+        'end_date': f"{end_date:%Y-%m-%d}",
+        'created_at': f"{now:%Y-%m-%d %H:%M:%S}",
+        'tables': {name: [f'{name}/part-{index:05d}.csv' for index in range(shards)] for name in SHARD_TABLES},
+        'shards': [
+            {'index': index, 'product_start': task[1], 'product_stop': task[2], 'rows': rows}
+            for index, (task, rows) in enumerate(zip(tasks, shard_rows))
+        ]
+    }
+    # 清单最后写出并原子替换：清单存在即表示所有分片都已写完
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+    total_rows = sum(rows['sales_records'] for rows in shard_rows)
+    print(f"分片示例数据已生成：{num_products} 个商品，{num_days} 天，{total_rows} 条销售记录，"
+          f"{shards} 个分片 -> {manifest_path}")
+    return manifest_path
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='生成示例数据')
+    parser.add_argument('--products', type=int, help='商品数（默认取 SAMPLE_DATA_CONFIG）')
+    parser.add_argument('--days', type=int, help='销售记录天数（默认取 SAMPLE_DATA_CONFIG）')
+    parser.add_argument('--seed', type=int, help='随机种子（默认取 SAMPLE_DATA_CONFIG）')
+    parser.add_argument('--end-date', type=pd.Timestamp,
+                        help='销售记录的最后一天，如 2024-06-30（默认为今天；相同种子与日期生成相同数据）')
+    parser.add_argument('--output-dir', help='分片模式：分片数据集的输出目录')
+    parser.add_argument('--shards', type=int, help='分片模式：分片数（默认与进程数相同）')
+    parser.add_argument('--workers', type=int, help='分片模式：生成进程数（默认使用全部 CPU 核心）')
+    args = parser.parse_args()
+
     # 生成示例数据
-    generate_sample_data()
\ No newline at end of file
+    if args.output_dir:
+        generate_sharded_data(args.output_dir, args.products, args.days, args.shards, args.workers,
+                              seed=args.seed, end_date=args.end_date)
+    else:
+        generate_sample_data(args.products, args.days, seed=args.seed, end_date=args.end_date)
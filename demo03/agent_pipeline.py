@@ -0,0 +1,154 @@
+# 多 Agent 流水线
+# 各阶段按依赖关系组成有向无环图：某个阶段的所有上游阶段完成后立即开始，
+# 互不依赖的阶段（如补货策略与促销策略）同时进行。阶段可以调用 LLM（AgentStage），
+# 也可以在本地精确计算（ComputeStage，如由数据快照直接得到数据分析师的结果）。
+# 每个阶段只接收它声明的上游 JSON 片段（如补货策略只接收 low_stock_products），而不是上游的完整回答文本。
+# 每个阶段记录为链路中的一个片段（耗时、输入/输出 token 数），可用 tracing.format_breakdown 输出。
+
+import json
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from langchain_core.messages import HumanMessage, SystemMessage
+from tracing import start_trace, finish_trace, token_attributes
+
+
+class PipelineStage(ABC):
+    """流水线中的一个阶段"""
+
+    def __init__(self, name, inputs=None):
+        """
+        Args:
+            name: 阶段名
+            inputs: {参数名: (上游阶段名, JSON 键)}；JSON 键为 None 时传入上游的完整结果
+        """
+        self.name = name
+        self.inputs = dict(inputs or {})
+
+    @property
+    def dependencies(self):
+        """上游阶段名集合"""
+        return {stage for stage, _ in self.inputs.values()}
+
+    def select_inputs(self, results):
+        """从上游结果中取出本阶段需要的片段"""
+        return {param: results[stage] if key is None else results[stage][key]
+                for param, (stage, key) in self.inputs.items()}
+
+    def span_attributes(self):
+        return {'depends_on': ','.join(sorted(self.dependencies))} if self.dependencies else {}
+
+    @abstractmethod
+    def run(self, llm, inputs, trace):
+        """完成本阶段，返回结果"""
+
+
+class AgentStage(PipelineStage):
+    """调用 LLM 的阶段"""
+
+    def __init__(self, name, system_message, build_prompt, inputs=None, output='json'):
+        """
+        Args:
+            system_message: 系统消息
+            build_prompt: 接收输入片段（关键字参数）、返回提示词的函数
+            output: 'json' 时解析回答中的 JSON 对象，'text' 时直接返回回答文本
+        """
+        super().__init__(name, inputs)
+        self.system_message = system_message
+        self.build_prompt = build_prompt
+        self.output = output
+
+    def run(self, llm, inputs, trace):
+        messages = [
+            SystemMessage(content=self.system_message),
+            HumanMessage(content=self.build_prompt(**inputs))
+        ]
+        with trace.span(self.name, **self.span_attributes()) as span:
+            response = llm.invoke(messages)
+            span.attributes.update(token_attributes(messages, response.content,
+                                                    getattr(response, 'usage_metadata', None)))
+        return parse_json_response(response.content) if self.output == 'json' else response.content
+
+
+class ComputeStage(PipelineStage):
+    """在本地计算结果的阶段（不调用 LLM，不消耗 token）"""
+
+    def __init__(self, name, compute, inputs=None):
+        """
+        Args:
+            compute: 接收输入片段（关键字参数）、返回结果的函数
+        """
+        super().__init__(name, inputs)
+        self.compute = compute
+
+    def run(self, llm, inputs, trace):
+        with trace.span(self.name, kind='compute', **self.span_attributes()):
+            return self.compute(**inputs)
+
+
+def parse_json_response(text):
+    """解析 LLM 回答中的 JSON 对象（允许包裹在 ```json 代码块或说明文字中）"""
+    start, end = text.find('{'), text.rfind('}')
+    if start < 0 or end < start:
+        raise ValueError(f"回答中没有 JSON 对象: {text[:100]}")
+    return json.loads(text[start:end + 1])
+
+
+def validate_pipeline(stages):
+    """检查阶段名唯一、依赖存在且没有环；返回按拓扑顺序排列的阶段"""
+    by_name = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"阶段名重复: {stage.name}")
+        by_name[stage.name] = stage
+    for stage in stages:
+        missing = stage.dependencies - by_name.keys()
+        if missing:
+            raise ValueError(f"阶段 {stage.name} 依赖不存在的阶段: {', '.join(sorted(missing))}")
+
+    ordered, done = [], set()
+    remaining = list(stages)
+    while remaining:
+        ready = [stage for stage in remaining if stage.dependencies <= done]
+        if not ready:
+            raise ValueError(f"阶段之间存在循环依赖: {', '.join(stage.name for stage in remaining)}")
+        for stage in ready:
+            ordered.append(stage)
+            done.add(stage.name)
+            remaining.remove(stage)
+    return ordered
+
+
+def run_pipeline(llm, stages, max_workers=None, name='agent.pipeline'):
+    """
+    按依赖关系运行各阶段，依赖已满足的阶段同时进行
+
+    Returns:
+        (results, trace): {阶段名: 结果}，以及记录了各阶段耗时与 token 数的链路
+    """
+    pending = validate_pipeline(stages)
+    trace = start_trace(name, stages=len(stages))
+    results = {}
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers or len(stages)) as executor:
+            running = {}
+            while pending or running:
+                for stage in [stage for stage in pending if stage.dependencies <= results.keys()]:
+                    future = executor.submit(stage.run, llm, stage.select_inputs(results), trace)
+                    running[future] = stage.name
+                    pending.remove(stage)
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+    finally:
+        finish_trace(trace)
+    return results, trace
+
+
+def stage_totals(trace):
+    """链路中各阶段耗时之和（串行执行所需时间）与 token 总数"""
+    stages = [span for span in trace.spans if span is not trace.root]
+    return {
+        'stage_seconds': sum(span.duration or 0.0 for span in stages),
+        'input_tokens': sum(span.attributes.get('input_tokens', 0) for span in stages),
+        'output_tokens': sum(span.attributes.get('output_tokens', 0) for span in stages)
+    }
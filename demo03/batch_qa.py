@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+批量问答：从文件读取问题，用 InventoryQASystem 并发回答，结果逐行写入 JSONL（用于离线评估）。
+
+同时处理的问题数即同时进行的LLM请求数上限；LLM请求按 requests_per_minute 均匀限速，
+本地查询引擎和回答缓存能回答的问题不占用限速额度。遇到限流、超时、连接错误或服务端错误时
+按指数退避（带随机抖动，优先使用接口返回的 Retry-After）重试整个问题（LLM客户端本身不再重试）。
+限速包装只用于本次批量问答的调用，不替换问答系统的共享客户端，同一问答系统上的其他请求不受影响。
+在达到接口限速之前，吞吐量随并发数线性增长。
+
+问题文件每行一个问题（空行和 # 开头的行忽略）；也可以每行一个 JSON 对象：{"id": ..., "question": ...}。
+
+用法：
+    python batch_qa.py questions.txt [--output batch_results.jsonl] [--concurrency 8]
+                                     [--rpm 60] [--max-retries 3]
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import openai
+from config import BATCH_QA_CONFIG, TRACING_CONFIG
+from llm_client import without_sdk_retries
+from qa_system import InventoryQASystem
+from tracing import configure_logging
+
+# 可重试的错误：限流、超时、连接错误、服务端错误
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError,
+                    TimeoutError, ConnectionError)
+
+# 结果中记录的问答阶段耗时（analyze_data 写入 timings 的键）
+RESULT_PHASES = ['summary', 'prompt', 'charts', 'llm', 'total']
+
+
+class RateLimiter:
+    """按固定间隔发放请求许可（线程安全），保证每分钟的请求数不超过上限"""
+
+    def __init__(self, requests_per_minute):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """等待下一个许可，返回等待的秒数"""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class RateLimitedLLM:
+    """在每次LLM调用前等待限速许可的客户端包装"""
+
+    def __init__(self, llm, limiter):
+        self.llm = llm
+        self.limiter = limiter
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, messages, **kwargs):
+        self.limiter.acquire()
+        with self._lock:
+            self.calls += 1
+        return self.llm.invoke(messages, **kwargs)
+
+
+def is_retryable(error):
+    """是否为值得重试的错误"""
+    return isinstance(error, RETRYABLE_ERRORS)
+
+
+def retry_delay(error, attempt, backoff_seconds, max_backoff_seconds):
+    """第 attempt 次重试前的等待时间：接口返回 Retry-After 时以其为准，否则指数退避加随机抖动"""
+    response = getattr(error, 'response', None)
+    retry_after = getattr(response, 'headers', {}).get('retry-after')
+    if retry_after is not None:
+        try:
+            return min(float(retry_after), max_backoff_seconds)
+        except ValueError:
+            pass
+    delay = min(backoff_seconds * 2 ** (attempt - 1), max_backoff_seconds)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def read_questions(path):
+    """读取问题文件，返回 [(编号, 问题)]；纯文本行以行号为编号"""
+    questions = []
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('{'):
+                item = json.loads(line)
+                questions.append((item.get('id', line_number), item['question']))
+            else:
+                questions.append((line_number, line))
+    return questions
+
+
+def answer_with_retry(qa_system, question, settings, llm=None):
+    """
+    回答一个问题，可重试的错误按退避策略重试；返回结果字典（失败时 error 为错误信息）
+
+    Args:
+        llm: 本次使用的LLM客户端（如限速包装），默认使用问答系统的共享客户端
+    """
+    start = time.perf_counter()
+    attempt = 0
+    while True:
+        attempt += 1
+        timings = {}
+        try:
+            text, charts_info = qa_system.analyze_data(question, timings, llm=llm)
+            error = None
+            break
+        except Exception as e:
+            if is_retryable(e) and attempt <= settings['max_retries']:
+                time.sleep(retry_delay(e, attempt, settings['backoff_seconds'], settings['max_backoff_seconds']))
+                continue
+            text, charts_info, error = None, [], f"{type(e).__name__}: {e}"
+            break
+
+    if 'local_intent' in timings:
+        source = 'local'
+    elif timings.get('cache_hit'):
+        source = 'cache'
+    else:
+        source = 'llm'
+    return {
+        'question': question,
+        'answer': text,
+        'source': source,
+        'latency': time.perf_counter() - start,
+        'attempts': attempt,
+        'error': error,
+        'charts': [chart['path'] for chart in charts_info],
+        'timings': {phase: timings[phase] for phase in RESULT_PHASES if phase in timings},
+        'trace_id': timings.get('trace_id')
+    }
+
+
+def percentile(values, fraction):
+    """最近秩法的分位数"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def summarize_results(results, wall_seconds, llm_calls):
+    """批量问答的汇总统计"""
+    latencies = [result['latency'] for result in results]
+    return {
+        'questions': len(results),
+        'errors': sum(result['error'] is not None for result in results),
+        'retries': sum(result['attempts'] - 1 for result in results),
+        'llm_calls': llm_calls,
+        'wall_seconds': wall_seconds,
+        'questions_per_second': len(results) / wall_seconds if wall_seconds else 0.0,
+        'latency_p50': percentile(latencies, 0.5),
+        'latency_p95': percentile(latencies, 0.95),
+        'latency_max': max(latencies, default=0.0)
+    }
+
+
+def run_batch(questions, output_path=None, qa_system=None, **options):
+    """
+    批量回答问题
+
+    Args:
+        questions: 问题列表，元素为问题字符串或 (编号, 问题)
+        output_path: 结果 JSONL 文件路径（按完成顺序逐行写入，中途中断也保留已完成的结果）
+        qa_system: 使用的问答系统，默认新建
+        options: 覆盖 BATCH_QA_CONFIG 中的配置项（concurrency、requests_per_minute 等）
+
+    Returns:
+        (results, summary): 按输入顺序排列的结果列表，以及汇总统计
+    """
+    unknown = set(options) - set(BATCH_QA_CONFIG)
+    if unknown:
+        raise TypeError(f"未知的批量问答配置项: {', '.join(sorted(unknown))}")
+    settings = {**BATCH_QA_CONFIG, **options}
+    items = [item if isinstance(item, tuple) else (index, item) for index, item in enumerate(questions, 1)]
+
+    owns_qa_system = qa_system is None
+    qa_system = qa_system or InventoryQASystem()
+    # 限速包装只传给本次批量问答的调用；重试由 answer_with_retry 统一负责
+    limited_llm = RateLimitedLLM(without_sdk_retries(qa_system.llm), RateLimiter(settings['requests_per_minute']))
+
+    results = [None] * len(items)
+    output = open(output_path, 'w', encoding='utf-8') if output_path else None
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, settings['concurrency'])) as executor:
+            futures = {executor.submit(answer_with_retry, qa_system, question, settings, limited_llm): index
+                       for index, (_, question) in enumerate(items)}
+            for done, future in enumerate(as_completed(futures), 1):
+                index = futures[future]
+                result = {'index': index, 'id': items[index][0], **future.result()}
+                results[index] = result
+                if output is not None:
+                    output.write(json.dumps(result, ensure_ascii=False) + '\n')
+                    output.flush()
+                status = '✅' if result['error'] is None else '❌'
+                print(f"{status} [{done}/{len(items)}] {result['latency']:.2f}s {result['question']}")
+    finally:
+        if owns_qa_system:
+            qa_system.close()
+        if output is not None:
+            output.close()
+
+    summary = summarize_results(results, time.perf_counter() - start, limited_llm.calls)
+    return results, summary
+
+
+def print_summary(summary):
+    """打印汇总统计"""
+    print("=" * 50)
+    print(f"📊 共 {summary['questions']} 个问题，失败 {summary['errors']} 个，重试 {summary['retries']} 次，"
+          f"LLM 调用 {summary['llm_calls']} 次")
+    print(f"⏱️  总耗时 {summary['wall_seconds']:.2f}s（{summary['questions_per_second']:.2f} 问/s）| "
+          f"延迟 p50 {summary['latency_p50']:.2f}s | p95 {summary['latency_p95']:.2f}s | "
+          f"最大 {summary['latency_max']:.2f}s")
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='批量问答（离线评估）')
+    parser.add_argument('questions', help='问题文件（每行一个问题，或每行一个 {"id", "question"} JSON 对象）')
+    parser.add_argument('--output', default='batch_results.jsonl', help='结果 JSONL 文件')
+    parser.add_argument('--concurrency', type=int, default=BATCH_QA_CONFIG['concurrency'], help='同时进行的LLM请求数')
+    parser.add_argument('--rpm', type=int, default=BATCH_QA_CONFIG['requests_per_minute'],
+                        help='每分钟LLM请求数上限（0 表示不限速）')
+    parser.add_argument('--max-retries', type=int, default=BATCH_QA_CONFIG['max_retries'], help='最大重试次数')
+    parser.add_argument('--log-level', default=TRACING_CONFIG['log_level'], help='日志级别（DEBUG/INFO/WARNING）')
+    args = parser.parse_args()
+    configure_logging(args.log_level)
+
+    questions = read_questions(args.questions)
+    print(f"📝 读取了 {len(questions)} 个问题，并发 {args.concurrency}，"
+          f"限速 {args.rpm or '不限'} 次/分钟")
+    _, summary = run_batch(questions, args.output, concurrency=args.concurrency,
+                           requests_per_minute=args.rpm or None, max_retries=args.max_retries)
+    print_summary(summary)
+    print(f"💾 结果已保存到 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
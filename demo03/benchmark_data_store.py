@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+数据加载基准测试：对比旧的逐入口 pd.read_csv 加载方式与共享数据存储层的耗时和内存
+
+用法：
+    python benchmark_data_store.py [商品数] [天数]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from data_store import load_snapshot
+
+# 旧实现中读取数据的入口数（问答系统、简洁报告、简单报告、数据验证）
+LEGACY_ENTRY_POINTS = 4
+
+
+def write_synthetic_data(directory, num_products, num_days, seed=42):
+    """在指定目录生成与 DATA_FILES 同结构的合成数据，返回文件路径字典"""
+    rng = np.random.default_rng(seed)
+    products = np.array([f"P{i:06d}" for i in range(1, num_products + 1)])
+    categories = np.array(['电子产品', '服装', '食品', '家居', '运动', '书籍', '玩具', '美妆', '电器', '文具'])
+    dates = pd.date_range('2025-01-01', periods=num_days, freq='D').strftime('%Y-%m-%d')
+
+    product_category = categories[rng.integers(0, len(categories), num_products)]
+    cost = rng.uniform(5, 200, num_products).round(2)
+    pd.DataFrame({
+        'product_id': products,
+        'name': [f'{c}商品{p[1:]}' for c, p in zip(product_category, products)],
+        'category': product_category,
+        'cost_price': cost,
+        'selling_price': (cost * rng.uniform(1.2, 3, num_products)).round(2),
+        'supplier_lead_time': rng.integers(3, 15, num_products)
+    }).to_csv(os.path.join(directory, 'products.csv'), index=False)
+
+    safety_stock = rng.uniform(10, 500, num_products)
+    pd.DataFrame({
+        'product_id': products,
+        'current_stock': rng.integers(0, 1500, num_products),
+        'safety_stock': safety_stock,
+        'last_updated': '2025-08-08 14:27:01'
+    }).to_csv(os.path.join(directory, 'inventory.csv'), index=False)
+
+    pd.DataFrame({
+        'product_id': np.repeat(products, num_days),
+        'date': np.tile(dates, num_products),
+        'quantity_sold': rng.integers(0, 150, num_products * num_days)
+    }).to_csv(os.path.join(directory, 'sales_records.csv'), index=False)
+
+    return {
+        'inventory': os.path.join(directory, 'inventory.csv'),
+        'products': os.path.join(directory, 'products.csv'),
+        'sales_records': os.path.join(directory, 'sales_records.csv')
+    }
+
+
+def legacy_load(data_files):
+    """旧实现：每个入口各自用默认类型读取 CSV 并重复合并、聚合"""
+    inventory_df = pd.read_csv(data_files['inventory'])
+    products_df = pd.read_csv(data_files['products'])
+    sales_df = pd.read_csv(data_files['sales_records'])
+
+    merged_df = inventory_df.merge(products_df, on='product_id', how='left')
+    sales_stats = sales_df.groupby('product_id').agg({
+        'quantity_sold': ['mean', 'max', 'sum', 'count']
+    }).round(2)
+    sales_stats.columns = ['avg_daily_sales', 'max_daily_sales', 'total_sales', 'sales_days']
+    return [inventory_df, products_df, sales_df, merged_df, sales_stats]
+
+
+def measure(func):
+    """执行函数，返回 (结果, 耗时秒, 峰值分配字节)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def frames_memory(frames):
+    """多个 DataFrame 的总内存占用（字节）"""
+    return sum(int(df.memory_usage(deep=True).sum()) for df in frames)
+
+
+def run_benchmark(num_products=2000, num_days=365):
+    """运行基准测试并打印对比结果"""
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"📦 生成合成数据：{num_products}个商品 × {num_days}天 = {num_products * num_days}条销售记录")
+        data_files = write_synthetic_data(directory, num_products, num_days)
+
+        legacy_frames, legacy_time, legacy_peak = measure(lambda: legacy_load(data_files))
+        snapshot, store_time, store_peak = measure(lambda: load_snapshot(data_files))
+
+    legacy_resident = frames_memory(legacy_frames)
+    store_resident = sum(snapshot.memory_usage().values())
+
+    print("=" * 60)
+    print(f"{'指标':<24}{'旧实现':>16}{'数据存储层':>16}")
+    print("-" * 60)
+    print(f"{'单次加载耗时 (s)':<24}{legacy_time:>16.3f}{store_time:>16.3f}")
+    print(f"{'全部入口加载耗时 (s)':<22}{legacy_time * LEGACY_ENTRY_POINTS:>16.3f}{store_time:>16.3f}")
+    print(f"{'常驻内存 (MB)':<24}{legacy_resident / 1e6:>16.1f}{store_resident / 1e6:>16.1f}")
+    print(f"{'加载峰值分配 (MB)':<23}{legacy_peak / 1e6:>16.1f}{store_peak / 1e6:>16.1f}")
+    print("=" * 60)
+    print(f"说明：旧实现中 {LEGACY_ENTRY_POINTS} 个入口各自加载一次，数据存储层在进程内只加载一次")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    run_benchmark(*args)
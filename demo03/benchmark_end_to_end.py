@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+端到端基准测试：在不同规模的合成数据上运行问答系统和两种报告生成器，
+用本地模拟的 LLM（可配置延迟）代替 ChatOpenAI，不需要 API 密钥。
+
+记录各阶段耗时（数据生成、加载、数据摘要、提示词、图表、LLM、报告渲染）、峰值内存和吞吐量，
+结果保存为 JSON；指定 --baseline 时与之前的结果对比，耗时超出容差即视为性能回退（退出码 1）。
+
+用法：
+    python benchmark_end_to_end.py [--sizes 1000 10000 100000] [--days 30] [--llm-latency 0.5]
+                                   [--output benchmark_results.json] [--baseline 旧结果.json]
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import pandas as pd
+import data_store
+from config import (DATA_FILES, CHART_CONFIG, RELOAD_CONFIG, RESPONSE_CACHE_CONFIG, INCREMENTAL_STATS_CONFIG,
+                    CACHE_CONFIG)
+from fake_llm import FakeLLM
+from llm_client import set_llm
+from qa_system import InventoryQASystem, answer_source
+from compact_report_generator import CompactReportGenerator
+from simple_report_generator import generate_simple_report
+
+sample_data = importlib.import_module('1')
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DEFAULT_DAYS = 30
+DEFAULT_LLM_LATENCY = 0.5
+DEFAULT_TOLERANCE = 0.25
+
+# 既有需要调用 LLM 的开放问题，也有由本地查询引擎回答的常见问题
+QUESTIONS = [
+    "我们的库存状况如何？",
+    "给我一个库存和销售的综合分析",
+    "哪些商品销售最好？",
+    "有哪些商品库存不足？",
+    "我们的利润率怎么样？"
+]
+
+# 问答各阶段（analyze_data 写入 timings 的键）
+QA_PHASES = ['summary', 'prompt', 'charts', 'llm', 'total']
+
+
+def peak_rss_mb():
+    """当前进程与已结束子进程的峰值常驻内存（MB，Linux 下 ru_maxrss 以 KB 为单位）"""
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return {
+        'self': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+        'children': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    }
+
+
+@contextlib.contextmanager
+def quiet():
+    """屏蔽被测代码的控制台输出"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def configure(work_dir, chart_workers):
+    """基准测试使用独立的目录与配置：不监控数据文件，不缓存回答，每次都调用 LLM"""
+    RELOAD_CONFIG['enabled'] = False
+    RESPONSE_CACHE_CONFIG['enabled'] = False
+    CHART_CONFIG['output_dir'] = os.path.join(work_dir, 'charts')
+    if chart_workers is not None:
+        CHART_CONFIG['render_workers'] = chart_workers
+
+
+def use_dataset(data_dir):
+    """让所有入口读取指定目录的数据文件"""
+    DATA_FILES.update({name: os.path.join(data_dir, f'{name}.csv')
+                       for name in ['inventory', 'products', 'sales_records']})
+    DATA_FILES['manifest'] = None
+
+
+def run_size(num_products, num_days, work_dir, qa_system_holder, seed):
+    """在一种数据规模上运行全部测试，返回结果字典"""
+    data_dir = os.path.join(work_dir, f'data_{num_products}')
+    os.makedirs(data_dir, exist_ok=True)
+    use_dataset(data_dir)
+
+    phases = {}
+    with quiet():
+        _, phases['generate'] = timed(sample_data.generate_sample_data, num_products, num_days,
+                                      seed=seed, data_files=DATA_FILES)
+
+        # 加载：读取数据文件、合并、销售统计与物化视图
+        def load():
+            data_store.get_snapshot(reload=True).views
+        _, phases['load'] = timed(load)
+        snapshot = data_store.get_snapshot()
+        sales_rows = len(snapshot.sales_df) if snapshot.sales_df is not None else snapshot.sales_summary.record_count
+
+        if qa_system_holder.get('qa') is None:
+            qa_system_holder['qa'] = InventoryQASystem()
+        qa_system = qa_system_holder['qa']
+
+        questions = []
+        for question in QUESTIONS:
+            timings = {}
+            qa_system.ask_question(question, timings)
+            questions.append({
+                'question': question,
+                'source': answer_source(timings) or 'LLM',
+                **{phase: timings.get(phase, 0.0) for phase in QA_PHASES}
+            })
+
+        reports = {}
+        generator = CompactReportGenerator()
+        content, seconds = timed(generator.generate_compact_report,
+                                 output_path=os.path.join(work_dir, 'compact_inventory_report.md'))
+        reports['compact'] = {'seconds': seconds, 'bytes': len(content.encode('utf-8'))}
+        content, seconds = timed(generate_simple_report,
+                                 output_path=os.path.join(work_dir, 'simple_inventory_report.md'))
+        reports['simple'] = {'seconds': seconds, 'bytes': len(content.encode('utf-8'))}
+    for report in reports.values():
+        report['products_per_second'] = num_products / report['seconds']
+
+    qa_total = sum(item['total'] for item in questions)
+    return {
+        'num_products': num_products,
+        'num_days': num_days,
+        'sales_rows': sales_rows,
+        'phases': phases,
+        'questions': questions,
+        'qa_mean': {phase: sum(item[phase] for item in questions) / len(questions) for phase in QA_PHASES},
+        'reports': reports,
+        'throughput': {
+            'load_rows_per_second': sales_rows / phases['load'],
+            'questions_per_second': len(questions) / qa_total
+        },
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def print_result(result):
+    """打印一种数据规模的结果"""
+    phases, qa_mean, reports = result['phases'], result['qa_mean'], result['reports']
+    print(f"\n📦 {result['num_products']} 个商品 × {result['num_days']} 天（{result['sales_rows']} 条销售记录）")
+    print(f"   生成 {phases['generate']:.2f}s | 加载 {phases['load']:.2f}s "
+          f"({result['throughput']['load_rows_per_second'] / 1e6:.2f}M 行/s)")
+    for item in result['questions']:
+        print(f"   {item['question']:<16} 摘要 {item['summary']:.3f}s | 提示词 {item['prompt']:.3f}s | "
+              f"图表 {item['charts']:.2f}s | LLM {item['llm']:.2f}s | 总计 {item['total']:.2f}s {item['source']}")
+    print(f"   问答平均 {qa_mean['total']:.2f}s（{result['throughput']['questions_per_second']:.2f} 问/s）")
+    for name, label in [('compact', '简洁报告'), ('simple', '简单报告')]:
+        report = reports[name]
+        print(f"   {label} {report['seconds']:.2f}s，{report['bytes'] / 1e6:.1f} MB，"
+              f"{report['products_per_second']:.0f} 商品/s")
+    rss = result['peak_rss_mb']
+    print(f"   峰值内存 {rss['self']:.0f} MB（渲染子进程 {rss['children']:.0f} MB）")
+
+
+def regression_metrics(result):
+    """参与回退比较的耗时指标"""
+    return {
+        'load': result['phases']['load'],
+        'qa_mean_total': result['qa_mean']['total'],
+        'compact_report': result['reports']['compact']['seconds'],
+        'simple_report': result['reports']['simple']['seconds']
+    }
+
+
+def compare_with_baseline(results, baseline_path, tolerance):
+    """与基线结果对比，返回超出容差的指标列表"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(item['num_products'], item['num_days']): item for item in json.load(f)['results']}
+
+    regressions = []
+    for result in results:
+        previous = baseline.get((result['num_products'], result['num_days']))
+        if previous is None:
+            continue
+        current_metrics, previous_metrics = regression_metrics(result), regression_metrics(previous)
+        for name, value in current_metrics.items():
+            if value > previous_metrics[name] * (1 + tolerance):
+                regressions.append(f"{result['num_products']} 个商品 {name}: "
+                                   f"{previous_metrics[name]:.3f}s -> {value:.3f}s")
+    return regressions
+
+
+def run_benchmark(sizes=DEFAULT_SIZES, num_days=DEFAULT_DAYS, llm_latency=DEFAULT_LLM_LATENCY,
+                  chart_workers=None, seed=42, output_path='benchmark_results.json'):
+    """运行端到端基准测试，返回结果字典（同时写入 output_path）"""
+    fake_llm = FakeLLM(latency=llm_latency)
+    previous_llm = set_llm(fake_llm)
+    previous_snapshot = data_store._snapshot
+    saved_configs = [(config, dict(config)) for config in
+                     [DATA_FILES, CHART_CONFIG, RELOAD_CONFIG, RESPONSE_CACHE_CONFIG]]
+    qa_system_holder = {}
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            configure(work_dir, chart_workers)
+            results = []
+            for num_products in sizes:
+                result = run_size(num_products, num_days, work_dir, qa_system_holder, seed)
+                print_result(result)
+                results.append(result)
+    finally:
+        # 恢复客户端、配置与共享快照，不影响同一进程中的其他入口
+        if qa_system_holder.get('qa') is not None:
+            qa_system_holder['qa'].close()
+        set_llm(previous_llm)
+        for config, saved in saved_configs:
+            config.clear()
+            config.update(saved)
+        data_store._swap_snapshot(previous_snapshot)
+
+    output = {
+        'created_at': f"{pd.Timestamp.now():%Y-%m-%d %H:%M:%S}",
+        'environment': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        },
+        'settings': {
+            'sizes': list(sizes),
+            'num_days': num_days,
+            'llm_latency': llm_latency,
+            'llm_calls': fake_llm.calls,
+            'chart_workers': CHART_CONFIG['render_workers'],
+            'incremental_stats': INCREMENTAL_STATS_CONFIG['enabled'],
+            'csv_cache': CACHE_CONFIG['enabled'],
+            'seed': seed
+        },
+        'results': results
+    }
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(output, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 结果已保存到 {output_path}")
+    return output
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='端到端基准测试（使用本地模拟的 LLM）')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='商品数（可指定多个）')
+    parser.add_argument('--days', type=int, default=DEFAULT_DAYS, help='销售记录天数')
+    parser.add_argument('--llm-latency', type=float, default=DEFAULT_LLM_LATENCY, help='模拟 LLM 每次调用的耗时（秒）')
+    parser.add_argument('--chart-workers', type=int, help='图表渲染进程数（默认取 CHART_CONFIG）')
+    parser.add_argument('--seed', type=int, default=42, help='合成数据的随机种子')
+    parser.add_argument('--output', default='benchmark_results.json', help='结果 JSON 文件')
+    parser.add_argument('--baseline', help='用于对比的历史结果 JSON 文件')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='允许的耗时增长比例')
+    args = parser.parse_args()
+
+    output = run_benchmark(args.sizes, args.days, args.llm_latency, args.chart_workers, args.seed, args.output)
+    if args.baseline:
+        regressions = compare_with_baseline(output['results'], args.baseline, args.tolerance)
+        if regressions:
+            print(f"❌ 发现 {len(regressions)} 项性能回退（容差 {args.tolerance:.0%}）：")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"✅ 与基线相比没有性能回退（容差 {args.tolerance:.0%}）")
+
+
+if __name__ == "__main__":
+    main()
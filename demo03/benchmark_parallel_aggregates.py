@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+销售汇总并行计算的扩展性基准测试：对比单进程与不同进程数的耗时，并校验结果一致；
+再按不同记录数对比单进程与最多进程数的耗时，给出并行开始更快的记录数（用于设置 min_rows）
+
+用法：
+    python benchmark_parallel_aggregates.py [记录数] [进程数 ...]
+    （默认 10000000 条记录，进程数为 1, 2, 4, ... 直到 CPU 核心数）
+"""
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from config import PARALLEL_AGGREGATION_CONFIG
+from parallel_aggregates import get_aggregation_pool, summarize_sales_parallel
+from sales_aggregates import summarize_sales
+
+DEFAULT_ROWS = 10_000_000
+CROSSOVER_ROWS = [100_000, 300_000, 1_000_000, 3_000_000]
+NUM_PRODUCTS = 100_000
+NUM_DAYS = 365
+
+
+def synthetic_sales(num_rows, seed=42):
+    """生成与 read_sales 结果同类型的合成销售记录"""
+    rng = np.random.default_rng(seed)
+    categories = pd.Index([f"P{i:06d}" for i in range(1, NUM_PRODUCTS + 1)])
+    dates = pd.date_range('2025-01-01', periods=NUM_DAYS, freq='D')
+    return pd.DataFrame({
+        'date': dates[rng.integers(0, NUM_DAYS, num_rows)],
+        'product_id': pd.Categorical.from_codes(rng.integers(0, NUM_PRODUCTS, num_rows), categories=categories),
+        'quantity_sold': rng.integers(0, 50, num_rows).astype('int32')
+    })
+
+
+def default_worker_counts():
+    """1, 2, 4, ... 直到 CPU 核心数（包含核心数本身）"""
+    cpu_count = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 < cpu_count:
+        counts.append(counts[-1] * 2)
+    if cpu_count > 1:
+        counts.append(cpu_count)
+    return counts
+
+
+def same_summary(a, b):
+    """两份销售汇总是否一致（累加量按字符串商品编号比较）"""
+    a_aggregates, b_aggregates = a.aggregates.copy(), b.aggregates.copy()
+    a_aggregates.index = a_aggregates.index.astype(str)
+    b_aggregates.index = b_aggregates.index.astype(str)
+    return (a_aggregates.sort_index().equals(b_aggregates.sort_index())
+            and a.daily_sales.sort_index().equals(b.daily_sales.sort_index())
+            and a.quantity_counts.sort_index().equals(b.quantity_counts.sort_index()))
+
+
+def timed(function, *args):
+    """函数的执行耗时（秒）"""
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def run_benchmark(num_rows=DEFAULT_ROWS, worker_counts=None):
+    """运行基准测试并打印各进程数的耗时、加速比和并行效率"""
+    worker_counts = worker_counts or default_worker_counts()
+    sales_df = synthetic_sales(num_rows)
+    print(f"📊 {num_rows} 条销售记录，{NUM_PRODUCTS} 个商品，CPU 核心数 {os.cpu_count()}")
+
+    start = time.perf_counter()
+    expected = summarize_sales(sales_df)
+    serial_time = time.perf_counter() - start
+
+    min_rows = PARALLEL_AGGREGATION_CONFIG['min_rows']
+    PARALLEL_AGGREGATION_CONFIG['min_rows'] = 0
+    try:
+        print("=" * 64)
+        print(f"{'进程数':<8}{'耗时 (s)':>12}{'加速比':>10}{'并行效率':>12}{'一致':>8}")
+        print("-" * 64)
+        print(f"{'单进程':<8}{serial_time:>14.3f}{1.0:>11.2f}x{100.0:>12.0f}%{'✅':>6}")
+        for workers in worker_counts:
+            if workers > 1:
+                # 先启动进程池，子进程启动时间不计入计算耗时
+                pool = get_aggregation_pool(workers - 1)
+                list(pool.map(abs, range(workers - 1)))
+            start = time.perf_counter()
+            summary = summarize_sales_parallel(sales_df, workers)
+            elapsed = time.perf_counter() - start
+            identical = same_summary(summary, expected)
+            speedup = serial_time / elapsed
+            print(f"{workers:<11}{elapsed:>14.3f}{speedup:>11.2f}x{speedup / workers * 100:>12.0f}%"
+                  f"{'✅' if identical else '❌':>6}")
+            assert identical, f"{workers} 个进程的计算结果与单进程不一致"
+        print("=" * 64)
+
+        workers = max(worker_counts)
+        if workers > 1:
+            crossover = None
+            print(f"{'记录数':<12}{'单进程 (s)':>14}{f'{workers} 个进程 (s)':>16}")
+            for rows in [rows for rows in CROSSOVER_ROWS if rows < num_rows]:
+                part = sales_df.iloc[:rows]
+                serial, parallel = (min(timed(function, part) for _ in range(3))
+                                    for function in [summarize_sales,
+                                                     lambda df: summarize_sales_parallel(df, workers)])
+                print(f"{rows:<15}{serial:>14.3f}{parallel:>16.3f}")
+                if crossover is None and parallel < serial:
+                    crossover = rows
+            print(f"📌 并行从 {crossover or '（测试范围内未）'} 条记录开始更快，"
+                  f"当前 min_rows = {min_rows}")
+    finally:
+        PARALLEL_AGGREGATION_CONFIG['min_rows'] = min_rows
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS,
+                  [int(arg) for arg in sys.argv[2:]] or None)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+报告表格渲染基准测试：对比逐行 iterrows 拼接字符串与按列批量格式化的耗时，并校验输出逐字节一致
+
+用法：
+    python benchmark_report_tables.py [商品数 ...]（默认 10000 100000 1000000）
+"""
+
+import sys
+import time
+import numpy as np
+import pandas as pd
+from report_tables import low_stock_rows, high_stock_rows, replenishment_rows, promotion_rows
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+CATEGORIES = ['电子产品', '服装', '食品', '家居', '运动', '书籍', '玩具', '美妆', '电器', '文具']
+
+
+def synthetic_stock_frames(num_products, seed=42):
+    """生成与数据快照 merged_df 同类型的合成数据，返回按风险排序的 (低库存, 高库存)"""
+    rng = np.random.default_rng(seed)
+    product_ids = pd.Series([f"P{i:07d}" for i in range(1, num_products + 1)], dtype='category')
+    category = pd.Categorical(np.array(CATEGORIES)[rng.integers(0, len(CATEGORIES), num_products)])
+    merged_df = pd.DataFrame({
+        'product_id': product_ids,
+        'current_stock': rng.integers(0, 1500, num_products).astype('int32'),
+        'safety_stock': rng.uniform(10, 500, num_products),
+        'name': pd.Series(category.astype(str) + '商品' + product_ids.str[1:].to_numpy(), dtype='string'),
+        'category': category
+    })
+
+    low_stock_df = merged_df[merged_df['current_stock'] < merged_df['safety_stock']].copy()
+    low_stock_df['out_of_stock_risk'] = ((low_stock_df['safety_stock'] - low_stock_df['current_stock']) /
+                                        low_stock_df['safety_stock'] * 100)
+    high_stock_df = merged_df[merged_df['current_stock'] > merged_df['safety_stock'] * 2].copy()
+    high_stock_df['overstock_risk'] = ((high_stock_df['current_stock'] - high_stock_df['safety_stock']) /
+                                      high_stock_df['safety_stock'] * 100)
+    return (low_stock_df.sort_values('out_of_stock_risk', ascending=False),
+            high_stock_df.sort_values('overstock_risk', ascending=False))
+
+
+def legacy_tables(low_stock_df, high_stock_df):
+    """旧实现：逐行 iterrows 并用 += 拼接"""
+    report = ""
+    for _, row in low_stock_df.iterrows():
+        risk_level = "🔴" if row['out_of_stock_risk'] > 70 else "🟡" if row['out_of_stock_risk'] > 40 else "🟢"
+        report += f"| {row['product_id']} | {row['name']} | {row['current_stock']} | {row['safety_stock']:.1f} | {row['out_of_stock_risk']:.1f}% | {row['category']} | {risk_level} |\n"
+
+    for _, row in high_stock_df.iterrows():
+        risk_level = "🔴" if row['overstock_risk'] > 200 else "🟡" if row['overstock_risk'] > 100 else "🟢"
+        report += f"| {row['product_id']} | {row['name']} | {row['current_stock']} | {row['safety_stock']:.1f} | {row['overstock_risk']:.1f}% | {row['category']} | {risk_level} |\n"
+
+    for _, row in low_stock_df[low_stock_df['out_of_stock_risk'] > 40].iterrows():
+        priority = "🔴 紧急" if row['out_of_stock_risk'] > 70 else "🟡 高" if row['out_of_stock_risk'] > 50 else "🟢 中"
+        amount = int((row['safety_stock'] - row['current_stock']) * 1.2)
+        timeline = "48小时内" if row['out_of_stock_risk'] > 70 else "7天内" if row['out_of_stock_risk'] > 50 else "14天内"
+        report += f"| {row['product_id']} | {row['name']} | {amount} | {priority} | {timeline} | 缺货风险{row['out_of_stock_risk']:.1f}% |\n"
+
+    for _, row in high_stock_df[high_stock_df['overstock_risk'] > 100].iterrows():
+        discount = "30%" if row['overstock_risk'] > 200 else "20%" if row['overstock_risk'] > 150 else "15%"
+        duration = "立即" if row['overstock_risk'] > 200 else "1周内" if row['overstock_risk'] > 150 else "2周内"
+        report += f"| {row['product_id']} | {row['name']} | 限时折扣 | {discount} | {duration} | 积压风险{row['overstock_risk']:.1f}% |\n"
+    return report
+
+
+def vectorized_tables(low_stock_df, high_stock_df):
+    """新实现：按列批量格式化，每张表一次 join"""
+    tables = [
+        low_stock_rows(low_stock_df),
+        high_stock_rows(high_stock_df),
+        replenishment_rows(low_stock_df[low_stock_df['out_of_stock_risk'] > 40]),
+        promotion_rows(high_stock_df[high_stock_df['overstock_risk'] > 100])
+    ]
+    return ''.join(table + '\n' for table in tables if table)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def run_benchmark(sizes=DEFAULT_SIZES):
+    """运行基准测试并打印对比结果"""
+    print("=" * 72)
+    print(f"{'商品数':<10}{'表格行数':>12}{'逐行 (s)':>14}{'按列 (s)':>14}{'加速比':>10}{'一致':>8}")
+    print("-" * 72)
+    for num_products in sizes:
+        low_stock_df, high_stock_df = synthetic_stock_frames(num_products)
+        legacy, legacy_time = timed(legacy_tables, low_stock_df, high_stock_df)
+        vectorized, vectorized_time = timed(vectorized_tables, low_stock_df, high_stock_df)
+        identical = legacy == vectorized
+        print(f"{num_products:<12}{legacy.count(chr(10)):>12}{legacy_time:>14.3f}{vectorized_time:>14.3f}"
+              f"{legacy_time / vectorized_time:>10.1f}x{'✅' if identical else '❌':>6}")
+        assert identical, f"{num_products} 个商品时两种实现的输出不一致"
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    run_benchmark([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,96 @@
+# 图表渲染缓存
+# 图表由 数据快照指纹 + 图表类型 + 渲染参数 唯一确定，输出文件名包含该键的哈希：
+# 相同问题在数据不变时直接复用已渲染的 PNG。数据快照被替换后旧快照的图表不再复用，
+# 但进行中的回答和 Web 聊天记录仍引用这些文件，因此保留最近 keep_snapshots 个被替换快照的图表，更早的才删除。
+
+import hashlib
+import json
+import os
+import threading
+from config import CHART_CONFIG
+
+
+class ChartCache:
+    """按 (快照指纹, 图表类型, 渲染参数) 缓存已渲染的图表文件"""
+
+    def __init__(self, output_dir, keep_snapshots=None):
+        self.output_dir = output_dir
+        self.keep_snapshots = (keep_snapshots if keep_snapshots is not None
+                               else CHART_CONFIG['cache_keep_snapshots'])
+        self._entries = {}  # 可复用的图表路径 -> 所基于的快照指纹（只包含未被替换的快照）
+        self._files = {}  # 已渲染的全部图表路径 -> 快照指纹（包括被替换的快照，待删除）
+        self._retired = []  # 被替换的快照指纹（从旧到新），其图表暂时保留
+        self._dropped = set()  # 图表已删除的快照指纹
+        self._lock = threading.Lock()
+        self._render_locks = {}  # 图表路径 -> 渲染锁，同一图表并发请求时只渲染一次
+        self.hits = 0
+        self.misses = 0
+    def chart_path(self, snapshot, chart_name, params):
+        """图表的输出路径（内容寻址：键不变则路径不变）"""
+        key_source = json.dumps([snapshot.fingerprint, chart_name, params], sort_keys=True)
+        key = hashlib.sha1(key_source.encode()).hexdigest()[:16]
+        return os.path.join(self.output_dir, f'{chart_name}_{key}.png')
+
+    def get_or_render(self, snapshot, chart_name, params, render):
+        """
+        返回图表路径；缓存中没有或文件已被删除时调用 render(chart_path) 渲染
+
+        Args:
+            snapshot: 图表所基于的数据快照
+            chart_name: 图表类型（如 inventory_distribution）
+            params: 渲染参数字典（dpi 等），参与缓存键计算
+            render: 渲染函数，接收输出路径
+        """
+        chart_path = self.chart_path(snapshot, chart_name, params)
+        with self._lock:
+            render_lock = self._render_locks.setdefault(chart_path, threading.Lock())
+
+        with render_lock:
+            with self._lock:
+                if chart_path in self._entries and os.path.exists(chart_path):
+                    self.hits += 1
+                    return chart_path
+                self.misses += 1
+
+            os.makedirs(self.output_dir, exist_ok=True)
+            render(chart_path)
+
+            with self._lock:
+                # 渲染期间快照可能已被替换：这样的图表只交给本次请求，不再复用，随被替换的快照一起删除
+                self._files[chart_path] = snapshot.fingerprint
+                if snapshot.fingerprint not in self._retired and snapshot.fingerprint not in self._dropped:
+                    self._entries[chart_path] = snapshot.fingerprint
+        return chart_path
+
+    def evict_snapshot(self, old_snapshot, new_snapshot=None):
+        """
+        快照替换回调：旧快照的图表不再复用；删除替换次数超出 keep_snapshots 的快照的图表
+        （可直接注册为快照替换回调）
+        """
+        if old_snapshot is None or (new_snapshot is not None
+                                    and old_snapshot.fingerprint == new_snapshot.fingerprint):
+            return
+        with self._lock:
+            if new_snapshot is not None:
+                # 数据恢复为之前的某个版本时，该版本重新成为当前快照
+                self._dropped.discard(new_snapshot.fingerprint)
+                if new_snapshot.fingerprint in self._retired:
+                    self._retired.remove(new_snapshot.fingerprint)
+            if old_snapshot.fingerprint not in self._retired:
+                self._retired.append(old_snapshot.fingerprint)
+            for path in [path for path, fingerprint in self._entries.items()
+                         if fingerprint == old_snapshot.fingerprint]:
+                del self._entries[path]
+                self._render_locks.pop(path, None)
+
+            while len(self._retired) > self.keep_snapshots:
+                self._dropped.add(self._retired.pop(0))
+            stale = [path for path, fingerprint in self._files.items() if fingerprint in self._dropped]
+            for path in stale:
+                del self._files[path]
+
+        for path in stale:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
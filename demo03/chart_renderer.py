@@ -0,0 +1,204 @@
+# 图表绘制
+# 每个绘制函数只接收绘图所需的少量聚合数据（而不是完整的 merged_df / sales_df），
+# 使用面向对象的 Figure API，不依赖 pyplot 全局状态，因此可以在线程或子进程中并行执行。
+
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib
+from matplotlib.figure import Figure
+
+# 设置中文字体
+matplotlib.rcParams['font.sans-serif'] = ['SimHei', 'DejaVu Sans']
+matplotlib.rcParams['axes.unicode_minus'] = False
+
+
+def save_figure(fig, chart_path, dpi):
+    """保存图表：先写入临时文件再原子替换，读取方不会看到写了一半的文件"""
+    fig.tight_layout()
+    tmp_path = f'{chart_path}.{uuid.uuid4().hex}.tmp.png'
+    fig.savefig(tmp_path, dpi=dpi, bbox_inches='tight')
+    os.replace(tmp_path, chart_path)
+    return chart_path
+
+
+def draw_inventory_distribution(data, chart_path, dpi):
+    """库存分布图：data 包含前20个商品的 product_id / current_stock / safety_stock"""
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+
+    x = range(len(data['product_id']))
+    width = 0.35
+
+    ax.bar([i - width/2 for i in x], data['current_stock'],
+           width, label='当前库存', alpha=0.8, color='skyblue')
+    ax.bar([i + width/2 for i in x], data['safety_stock'],
+           width, label='安全库存', alpha=0.8, color='lightcoral')
+
+    ax.set_xlabel('商品')
+    ax.set_ylabel('库存数量')
+    ax.set_title('库存分布对比图')
+    ax.legend()
+    ax.set_xticks(x)
+    ax.set_xticklabels(data['product_id'], rotation=45)
+
+    return save_figure(fig, chart_path, dpi)
+
+
+def draw_sales_trend(data, chart_path, dpi):
+    """销售趋势图：data 包含按日期排序的 date / quantity_sold"""
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+
+    ax.plot(data['date'], data['quantity_sold'],
+            marker='o', linewidth=2, markersize=4)
+    ax.set_xlabel('日期')
+    ax.set_ylabel('日销量')
+    ax.set_title('销售趋势图')
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.grid(True, alpha=0.3)
+
+    return save_figure(fig, chart_path, dpi)
+
+
+def draw_category_analysis(data, chart_path, dpi):
+    """类别分析图：data 包含各类别库存合计与各类别销量"""
+    fig = Figure(figsize=(15, 6))
+    ax1, ax2 = fig.subplots(1, 2)
+
+    # 库存对比
+    x = range(len(data['category']))
+    width = 0.35
+    ax1.bar([i - width/2 for i in x], data['current_stock'],
+            width, label='当前库存', alpha=0.8, color='skyblue')
+    ax1.bar([i + width/2 for i in x], data['safety_stock'],
+            width, label='安全库存', alpha=0.8, color='lightcoral')
+    ax1.set_xlabel('商品类别')
+    ax1.set_ylabel('库存数量')
+    ax1.set_title('各类别库存对比')
+    ax1.legend()
+    ax1.set_xticks(x)
+    ax1.set_xticklabels(data['category'], rotation=45)
+
+    # 销量占比
+    ax2.pie(data['sales'], labels=data['sales_category'], autopct='%1.1f%%')
+    ax2.set_title('各类别销量占比')
+
+    return save_figure(fig, chart_path, dpi)
+
+
+def draw_low_stock_analysis(data, chart_path, dpi):
+    """低库存商品图：data 包含按缺货风险排序的 product_id / stockout_risk"""
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+
+    colors = ['red' if risk > 70 else 'orange' if risk > 40 else 'yellow'
+              for risk in data['stockout_risk']]
+
+    bars = ax.bar(range(len(data['product_id'])), data['stockout_risk'],
+                  color=colors, alpha=0.8)
+
+    ax.set_xlabel('商品')
+    ax.set_ylabel('缺货风险 (%)')
+    ax.set_title('低库存商品缺货风险分析')
+    ax.set_xticks(range(len(data['product_id'])))
+    ax.set_xticklabels(data['product_id'], rotation=45)
+
+    # 添加数值标签
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'{height:.1f}%', ha='center', va='bottom')
+
+    return save_figure(fig, chart_path, dpi)
+
+
+def draw_profit_analysis(data, chart_path, dpi):
+    """利润率分析图：data 包含按利润率降序的 category / profit_margin"""
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+
+    bars = ax.bar(range(len(data['category'])), data['profit_margin'],
+                  color='lightgreen', alpha=0.8)
+
+    ax.set_xlabel('商品类别')
+    ax.set_ylabel('平均利润率 (%)')
+    ax.set_title('各类别平均利润率')
+    ax.set_xticks(range(len(data['category'])))
+    ax.set_xticklabels(data['category'], rotation=45)
+
+    # 添加数值标签
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'{height:.1f}%', ha='center', va='bottom')
+
+    return save_figure(fig, chart_path, dpi)
+
+
+def draw_overview(data, chart_path, dpi):
+    """综合概览图：data 包含库存散点（抽样后）、销量直方图分箱、类别商品数与库存状态计数"""
+    fig = Figure(figsize=(15, 10))
+    ((ax1, ax2), (ax3, ax4)) = fig.subplots(2, 2)
+
+    # 1. 库存vs安全库存散点图
+    ax1.scatter(data['safety_stock'], data['current_stock'],
+                alpha=0.6, color='blue')
+    ax1.plot([0, data['max_safety_stock']],
+             [0, data['max_safety_stock']], 'r--', alpha=0.8)
+    ax1.set_xlabel('安全库存')
+    ax1.set_ylabel('当前库存')
+    ax1.set_title('库存vs安全库存')
+
+    # 2. 销量分布直方图（分箱已在主进程计算，这里按权重还原）
+    edges = data['hist_edges']
+    ax2.hist(edges[:-1], bins=edges, weights=data['hist_counts'], alpha=0.7, color='green')
+    ax2.set_xlabel('日销量')
+    ax2.set_ylabel('频次')
+    ax2.set_title('销量分布')
+
+    # 3. 类别商品数量
+    ax3.pie(data['category_counts'], labels=data['category_labels'], autopct='%1.1f%%')
+    ax3.set_title('商品类别分布')
+
+    # 4. 库存状态饼图
+    ax4.pie([data['low_stock_count'], data['normal_stock_count']],
+            labels=['低库存', '正常库存'], autopct='%1.1f%%',
+            colors=['orange', 'lightblue'])
+    ax4.set_title('库存状态分布')
+
+    return save_figure(fig, chart_path, dpi)
+
+
+CHART_DRAWERS = {
+    'inventory_distribution': draw_inventory_distribution,
+    'sales_trend': draw_sales_trend,
+    'category_analysis': draw_category_analysis,
+    'low_stock_analysis': draw_low_stock_analysis,
+    'profit_analysis': draw_profit_analysis,
+    'overview': draw_overview
+}
+
+
+def draw_chart(chart_name, data, chart_path, dpi):
+    """按图表类型绘制（进程池任务入口）"""
+    return CHART_DRAWERS[chart_name](data, chart_path, dpi)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_render_pool(workers):
+    """获取进程内共享的图表渲染进程池；workers 为 0 时返回 None（在当前进程渲染）"""
+    global _pool
+    if workers <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # 使用 spawn 启动子进程，避免在有后台线程的进程中 fork
+            _pool = ProcessPoolExecutor(max_workers=workers,
+                                        mp_context=multiprocessing.get_context('spawn'))
+        return _pool
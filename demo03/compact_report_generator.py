@@ -1,10 +1,13 @@
 import pandas as pd
 import numpy as np
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 import json
 import os
-from config import MODEL_CONFIG, DATA_FILES
+from llm_client import get_llm
+from data_store import get_snapshot
+from report_tables import low_stock_rows, high_stock_rows, replenishment_rows, promotion_rows
+from report_writer import render_report, write_report_streaming
+from config import REPORT_CONFIG
 
 class CompactReportGenerator:
     def __init__(self):
@@ -17,12 +20,8 @@ class CompactReportGenerator:
             format_report_prompt
         )
         
-        self.llm = ChatOpenAI(
-            model_name=MODEL_CONFIG["model_name"],
-            openai_api_base=MODEL_CONFIG["openai_api_base"],
-            openai_api_key=MODEL_CONFIG["openai_api_key"],
-            temperature=MODEL_CONFIG["temperature"]
-        )
+        # 共享的LLM客户端
+        self.llm = get_llm()
         
         self.analyst_system_message = ANALYST_SYSTEM_MESSAGE
         self.strategy_system_message = STRATEGY_SYSTEM_MESSAGE
@@ -34,22 +33,15 @@ class CompactReportGenerator:
         self.load_data()
         
     def load_data(self):
-        """加载所有数据文件"""
+        """加载所有数据文件（与其他入口共享同一份数据快照）"""
         try:
-            self.inventory_df = pd.read_csv(DATA_FILES['inventory'])
-            self.products_df = pd.read_csv(DATA_FILES['products'])
-            self.sales_df = pd.read_csv(DATA_FILES['sales_records'])
-            
-            # 合并数据
-            self.merged_df = self.inventory_df.merge(
-                self.products_df, on='product_id', how='left'
-            )
+            snapshot = get_snapshot()
             
-            # 计算销售统计
-            self.sales_stats = self.sales_df.groupby('product_id').agg({
-                'quantity_sold': ['mean', 'max', 'sum', 'count']
-            }).round(2)
-            self.sales_stats.columns = ['avg_daily_sales', 'max_daily_sales', 'total_sales', 'sales_days']
+            self.inventory_df = snapshot.inventory_df
+            self.products_df = snapshot.products_df
+            self.sales_df = snapshot.sales_df
+            self.merged_df = snapshot.merged_df
+            self.sales_stats = snapshot.sales_stats
             
             print("✅ 数据加载成功")
             
@@ -57,8 +49,14 @@ class CompactReportGenerator:
             print(f"❌ 数据加载失败: {e}")
             raise
     
-    def generate_compact_report(self):
-        """生成简洁的库存管理报告"""
+    def generate_compact_report(self, stream=False, output_path='compact_inventory_report.md'):
+        """
+        生成简洁的库存管理报告
+        
+        Args:
+            stream: 为 True 时逐段写入报告文件（表格按 REPORT_CONFIG['stream_chunk_rows'] 行分块），
+                    不在内存中拼接完整报告，返回报告文件路径；否则返回报告内容
+        """
         print("🚀 开始生成简洁库存管理报告...")
         
         # 1. 分析数据
@@ -71,40 +69,37 @@ class CompactReportGenerator:
         high_stock_df['overstock_risk'] = ((high_stock_df['current_stock'] - high_stock_df['safety_stock']) / 
                                           high_stock_df['safety_stock'] * 100)
         
-        # 2. 生成报告内容
+        # 2. 生成并保存报告
+        if stream:
+            total_rows = (len(low_stock_df) + len(high_stock_df) + int((low_stock_df['out_of_stock_risk'] > 40).sum())
+                          + int((high_stock_df['overstock_risk'] > 100).sum()))
+            write_report_streaming(self._report_parts(low_stock_df, high_stock_df), output_path,
+                                   REPORT_CONFIG['encoding'], REPORT_CONFIG['stream_chunk_rows'], total_rows)
+            print(f"✅ 简洁报告已保存到 {output_path}")
+            return output_path
+        
         report_content = self._generate_report_content(low_stock_df, high_stock_df)
         
-        # 3. 保存报告
-        with open('compact_inventory_report.md', 'w', encoding='utf-8') as f:
+        with open(output_path, 'w', encoding='utf-8') as f:
             f.write(report_content)
         
-        print("✅ 简洁报告已保存到 compact_inventory_report.md")
+        print(f"✅ 简洁报告已保存到 {output_path}")
         return report_content
     
     def _generate_report_content(self, low_stock_df, high_stock_df):
         """生成报告内容"""
+        return render_report(self._report_parts(low_stock_df, high_stock_df))
+    
+    def _report_parts(self, low_stock_df, high_stock_df):
+        """按顺序产出报告片段：字符串或 (表格数据, 行渲染函数)"""
         
         # 统计信息
-        total_products = len(self.merged_df)
         low_stock_count = len(low_stock_df)
         high_stock_count = len(high_stock_df)
         critical_low = len(low_stock_df[low_stock_df['out_of_stock_risk'] > 70])
         critical_high = len(high_stock_df[high_stock_df['overstock_risk'] > 200])
         
-        # 生成低库存表格
-        low_stock_table = self._generate_low_stock_table(low_stock_df)
-        
-        # 生成高库存表格
-        high_stock_table = self._generate_high_stock_table(high_stock_df)
-        
-        # 生成补货建议
-        replenishment_table = self._generate_replenishment_table(low_stock_df)
-        
-        # 生成促销建议
-        promotion_table = self._generate_promotion_table(high_stock_df)
-        
-        # 组装完整报告
-        report = f"""# 库存管理报告
+        yield f"""# 库存管理报告
 
 ## 执行摘要
 
@@ -120,122 +115,119 @@ class CompactReportGenerator:
 
 ### 低库存商品分析
 
-{low_stock_table}
+"""
+        # 低库存表格
+        yield from self._low_stock_table_parts(low_stock_df)
+        
+        yield """
 
 ### 高库存商品分析
 
-{high_stock_table}
+"""
+        # 高库存表格
+        yield from self._high_stock_table_parts(high_stock_df)
+        
+        yield """
 
 ## 补货与促销策略
 
 ### 补货建议
 
-{replenishment_table}
+"""
+        # 补货建议
+        yield from self._replenishment_table_parts(low_stock_df)
+        
+        yield """
 
 ### 促销策略
 
-{promotion_table}
+"""
+        # 促销建议
+        yield from self._promotion_table_parts(high_stock_df)
+        
+        yield """
 
 ## 总结
 
 本报告基于实时数据分析，提供了详细的库存状况和相应的管理建议。建议管理层根据报告内容制定相应的补货和促销策略，以优化库存结构，提高资金使用效率。
 """
-        
-        return report
     
-    def _generate_low_stock_table(self, low_stock_df):
-        """生成低库存商品表格"""
+    def _low_stock_table_parts(self, low_stock_df):
+        """低库存商品表格"""
         if len(low_stock_df) == 0:
-            return "**无低库存商品**"
+            yield "**无低库存商品**"
+            return
         
         # 按缺货风险排序
         low_stock_df = low_stock_df.sort_values('out_of_stock_risk', ascending=False)
         
-        table_rows = []
-        for _, row in low_stock_df.iterrows():
-            risk_level = "🔴" if row['out_of_stock_risk'] > 70 else "🟡" if row['out_of_stock_risk'] > 40 else "🟢"
-            table_rows.append(f"| {row['product_id']} | {row['name']} | {row['current_stock']} | {row['safety_stock']:.1f} | {row['out_of_stock_risk']:.1f}% | {row['category']} | {risk_level} |")
-        
-        table_content = "\n".join(table_rows)
-        
-        return f"""| 商品编号 | 商品名称 | 当前库存 | 安全库存 | 缺货风险 | 类别 | 风险等级 |
+        yield """| 商品编号 | 商品名称 | 当前库存 | 安全库存 | 缺货风险 | 类别 | 风险等级 |
 |----------|----------|----------|----------|----------|------|----------|
-{table_content}
+"""
+        yield (low_stock_df, low_stock_rows)
+        yield """
 
 **说明**：🔴 高风险(>70%)，🟡 中风险(40-70%)，🟢 低风险(<40%)"""
     
-    def _generate_high_stock_table(self, high_stock_df):
-        """生成高库存商品表格"""
+    def _high_stock_table_parts(self, high_stock_df):
+        """高库存商品表格"""
         if len(high_stock_df) == 0:
-            return "**无高库存商品**"
+            yield "**无高库存商品**"
+            return
         
         # 按积压风险排序
         high_stock_df = high_stock_df.sort_values('overstock_risk', ascending=False)
         
-        table_rows = []
-        for _, row in high_stock_df.iterrows():
-            risk_level = "🔴" if row['overstock_risk'] > 200 else "🟡" if row['overstock_risk'] > 100 else "🟢"
-            table_rows.append(f"| {row['product_id']} | {row['name']} | {row['current_stock']} | {row['safety_stock']:.1f} | {row['overstock_risk']:.1f}% | {row['category']} | {risk_level} |")
-        
-        table_content = "\n".join(table_rows)
-        
-        return f"""| 商品编号 | 商品名称 | 当前库存 | 安全库存 | 积压风险 | 类别 | 风险等级 |
+        yield """| 商品编号 | 商品名称 | 当前库存 | 安全库存 | 积压风险 | 类别 | 风险等级 |
 |----------|----------|----------|----------|----------|------|----------|
-{table_content}
+"""
+        yield (high_stock_df, high_stock_rows)
+        yield """
 
 **说明**：🔴 高风险(>200%)，🟡 中风险(100-200%)，🟢 低风险(<100%)"""
     
-    def _generate_replenishment_table(self, low_stock_df):
-        """生成补货建议表格"""
+    def _replenishment_table_parts(self, low_stock_df):
+        """补货建议表格"""
         if len(low_stock_df) == 0:
-            return "**无需补货**"
+            yield "**无需补货**"
+            return
         
         # 筛选需要补货的商品（缺货风险>40%）
-        replenishment_df = low_stock_df[low_stock_df['out_of_stock_risk'] > 40].copy()
+        replenishment_df = low_stock_df[low_stock_df['out_of_stock_risk'] > 40]
         replenishment_df = replenishment_df.sort_values('out_of_stock_risk', ascending=False)
         
-        table_rows = []
-        for _, row in replenishment_df.iterrows():
-            priority = "🔴 紧急" if row['out_of_stock_risk'] > 70 else "🟡 高" if row['out_of_stock_risk'] > 50 else "🟢 中"
-            amount = int((row['safety_stock'] - row['current_stock']) * 1.2)  # 建议补货量
-            timeline = "48小时内" if row['out_of_stock_risk'] > 70 else "7天内" if row['out_of_stock_risk'] > 50 else "14天内"
-            
-            table_rows.append(f"| {row['product_id']} | {row['name']} | {amount} | {priority} | {timeline} | 缺货风险{row['out_of_stock_risk']:.1f}% |")
-        
-        table_content = "\n".join(table_rows)
-        
-        return f"""| 商品编号 | 商品名称 | 建议补货量 | 优先级 | 补货时间 | 补货原因 |
+        yield """| 商品编号 | 商品名称 | 建议补货量 | 优先级 | 补货时间 | 补货原因 |
 |----------|----------|------------|--------|----------|----------|
-{table_content}"""
+"""
+        yield (replenishment_df, replenishment_rows)
     
-    def _generate_promotion_table(self, high_stock_df):
-        """生成促销建议表格"""
+    def _promotion_table_parts(self, high_stock_df):
+        """促销建议表格"""
         if len(high_stock_df) == 0:
-            return "**无需促销**"
+            yield "**无需促销**"
+            return
         
         # 筛选需要促销的商品（积压风险>100%）
-        promotion_df = high_stock_df[high_stock_df['overstock_risk'] > 100].copy()
+        promotion_df = high_stock_df[high_stock_df['overstock_risk'] > 100]
         promotion_df = promotion_df.sort_values('overstock_risk', ascending=False)
         
-        table_rows = []
-        for _, row in promotion_df.iterrows():
-            priority = "🔴 紧急" if row['overstock_risk'] > 200 else "🟡 高" if row['overstock_risk'] > 150 else "🟢 中"
-            discount = "30%" if row['overstock_risk'] > 200 else "20%" if row['overstock_risk'] > 150 else "15%"
-            duration = "立即" if row['overstock_risk'] > 200 else "1周内" if row['overstock_risk'] > 150 else "2周内"
-            
-            table_rows.append(f"| {row['product_id']} | {row['name']} | 限时折扣 | {discount} | {duration} | 积压风险{row['overstock_risk']:.1f}% |")
-        
-        table_content = "\n".join(table_rows)
-        
-        return f"""| 商品编号 | 商品名称 | 促销方式 | 折扣率 | 促销时间 | 促销原因 |
+        yield """| 商品编号 | 商品名称 | 促销方式 | 折扣率 | 促销时间 | 促销原因 |
 |----------|----------|----------|--------|----------|----------|
-{table_content}"""
+"""
+        yield (promotion_df, promotion_rows)
 
 def main():
     """主函数"""
+    import argparse
+    parser = argparse.ArgumentParser(description='生成简洁库存管理报告')
+    parser.add_argument('--stream', action='store_true', help='报告文本逐段写入文件，不在内存中拼接完整报告')
+    args = parser.parse_args()
+    
     generator = CompactReportGenerator()
-    report = generator.generate_compact_report()
+    report = generator.generate_compact_report(stream=args.stream)
     print("\n📊 简洁报告生成完成！")
+    if args.stream:
+        return
     print("="*50)
     print(report[:500] + "..." if len(report) > 500 else report)
 
@@ -18,7 +18,63 @@ DATA_FILES = {
     "sales_records": "sales_records.csv",
     "products": "products.csv", 
     "inventory": "inventory.csv",
-    "report_output": "inventory_management_report.md"
+    "report_output": "inventory_management_report.md",
+    "manifest": None  # 分片数据集的清单文件（如 "sample_shards/manifest.json"），设置后从分片文件加载
+}
+
+# CSV 解析缓存配置（以 Feather 格式保存解析结果，需要安装 pyarrow，未安装时直接读取 CSV）
+CACHE_CONFIG = {
+    "enabled": True,
+    "suffix": ".feather"  # 缓存文件与 CSV 同目录同名，仅扩展名不同
+}
+
+# 销售统计增量聚合配置（检查点保存在销售记录文件旁）
+INCREMENTAL_STATS_CONFIG = {
+    "enabled": True,
+    "checkpoint_suffix": ".stats.json"
+}
+
+# 分块汇总配置（销售记录超出内存时启用：分块读取并汇总，不保留完整的销售记录）
+OUT_OF_CORE_CONFIG = {
+    "enabled": False,
+    "max_memory_mb": 64  # 分块读取销售记录的内存上限，决定每块行数
+}
+
+# 销售汇总并行计算配置（按商品哈希分区，在多个进程中计算后合并）
+PARALLEL_AGGREGATION_CONFIG = {
+    "workers": None,  # 计算进程数，None 表示使用全部 CPU 核心，0 或 1 表示在当前进程计算
+    "min_rows": 1000000  # 销售记录少于该行数时不启用并行（benchmark_parallel_aggregates.py 输出实测的临界记录数）
+}
+
+# 数据热加载配置（问答系统在后台监控数据文件，变化后自动替换数据快照）
+RELOAD_CONFIG = {
+    "enabled": True,
+    "poll_interval_seconds": 5
+}
+
+# 图表配置（相同数据快照、图表类型和渲染参数的图表只渲染一次）
+CHART_CONFIG = {
+    "output_dir": "charts",
+    "dpi": 300,
+    "cache_enabled": True,
+    "cache_keep_snapshots": 2,  # 数据更新后仍保留图表文件的旧快照个数（进行中的回答与聊天记录仍会引用）
+    "render_workers": 4,  # 图表渲染进程数，0 表示在请求线程中渲染
+    "overview_scatter_points": 2000  # 概览图库存散点的最多点数（超出时抽样并保留离群点）
+}
+
+# LLM回答缓存配置（相同问题在数据和提示词不变时直接返回缓存的回答）
+RESPONSE_CACHE_CONFIG = {
+    "enabled": True,
+    "max_entries": 256,  # 超出时淘汰最久未使用的回答
+    "ttl_seconds": 3600,  # 回答的有效期
+    "persist_path": None  # 设置为文件路径（如 "qa_response_cache.json"）时缓存保存到磁盘
+}
+
+# 本地查询引擎配置（低库存、畅销商品、类别销量、利润率等常见问题直接计算，不调用LLM）
+QUERY_ENGINE_CONFIG = {
+    "enabled": True,
+    "top_n": 5,  # 畅销商品默认列出的数量（问题中含“前N”时以问题为准）
+    "max_listed_items": 10  # 低库存商品最多列出的数量
 }
 
 # 安全库存配置
@@ -28,16 +84,50 @@ SAFETY_STOCK_CONFIG = {
     "analysis_period_days": 30  # 分析周期（天）
 }
 
+# 库存分析配置（多 Agent 流水线中由 pandas 直接计算低库存/高库存商品，代替数据分析师 LLM）
+INVENTORY_ANALYSIS_CONFIG = {
+    "trend_recent_days": 7,  # 销售趋势：最近 N 天的平均日销量与此前相比
+    "trend_threshold": 0.1,  # 变化超过 10% 时判定为上升或下降，否则为平稳
+    "critical_stockout_risk": 70,  # 缺货风险指数高于该值的商品需要紧急补货
+    "critical_overstock_risk": 200  # 积压风险指数高于该值的商品需要强力促销
+}
+
 # 示例数据生成配置
 SAMPLE_DATA_CONFIG = {
     "num_products": 100,
     "date_range_days": 30,
     "low_stock_probability": 0.3,  # 30%的商品处于低库存状态
+    "seed": 42,  # 随机种子，相同种子生成相同数据
     "categories": ['电子产品', '服装', '食品', '家居', '运动', '书籍', '玩具', '美妆', '电器', '文具']
 }
 
+# 问答链路追踪配置（记录每个问题各阶段的耗时、token 数和图表大小）
+TRACING_CONFIG = {
+    "enabled": True,  # 关闭后仍记录耗时明细，但不调用钩子
+    "log": True,  # 通过 logging（inventory.tracing）输出每个问题的耗时明细
+    "log_level": "INFO",  # 命令行入口中 inventory.* 日志的输出级别（DEBUG 时还输出提示词中被汇总的商品编号）
+    "otel_export_path": None  # 设置为文件路径（如 "traces.jsonl"）时按 OTLP/JSON 格式逐行写入链路
+}
+
+# 批量问答配置（离线评估：从文件读取问题，并发调用LLM，结果逐行写入 JSONL）
+BATCH_QA_CONFIG = {
+    "concurrency": 8,  # 同时处理的问题数（即同时进行的LLM请求数上限）
+    "requests_per_minute": 60,  # LLM请求速率上限（按接口限流设置），None 表示不限速
+    "max_retries": 3,  # 限流、超时、连接错误和服务端错误的最大重试次数
+    "backoff_seconds": 1.0,  # 首次重试前的等待时间，之后每次翻倍（带随机抖动）
+    "max_backoff_seconds": 30.0
+}
+
+# 提示词 token 预算配置（商品很多时按风险保留商品明细，其余按类别汇总，提示词长度不随商品数增长）
+PROMPT_BUDGET_CONFIG = {
+    "enabled": True,
+    "max_prompt_tokens": 4000,  # 每个提示词的 token 上限（moonshot-v1-8k 的其余上下文留给系统消息和回答）
+    "safety_margin": 0.15  # 按估算的 token 数只用满上限的 85%（估算值与模型实际的分词结果有出入）
+}
+
 # 报告配置
 REPORT_CONFIG = {
     "max_preview_length": 500,  # 控制台预览的最大字符数
-    "encoding": "utf-8"
+    "encoding": "utf-8",
+    "stream_chunk_rows": 10000  # 流式写出报告时每次渲染的表格行数
 } 
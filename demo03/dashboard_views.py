@@ -0,0 +1,105 @@
+# 数据快照的物化视图
+# 问答摘要、本地查询和图表反复用到的聚合结果（每日销量、各类别库存与销量、低库存清单、
+# 各类别利润率、数据摘要文本等）在每份数据快照上只计算一次并保存在内存中；
+# 数据文件变化后新快照会重新计算，旧视图随旧快照一起释放。
+# 与销售记录相关的视图都由快照的销售汇总得到，分块模式下不需要完整的销售记录。
+# 概览图的库存散点只保留有上限的抽样点与离群点，传给图表子进程的数据量与商品数无关。
+
+import numpy as np
+from config import CHART_CONFIG
+
+
+def sample_scatter(x, y, max_points):
+    """
+    散点抽样：点数不超过 max_points 时全部保留；否则保留离对角线最远的点
+    与两个坐标轴上的极值点（约占十分之一），其余名额在剩下的点中等间隔抽取（结果确定，便于图表缓存）
+
+    Returns:
+        (x, y): 按原有顺序排列的抽样点
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    if len(x) <= max_points:
+        return x, y
+    extremes = [np.argmin(x), np.argmax(x), np.argmin(y), np.argmax(y)]
+    outliers = np.argsort(-np.abs(y - x), kind='stable')[:max(max_points // 10, 1)]
+    keep = np.zeros(len(x), dtype=bool)
+    keep[extremes] = True
+    keep[outliers] = True
+    rest = np.flatnonzero(~keep)
+    slots = max_points - int(keep.sum())
+    if slots > 0:
+        keep[rest[np.linspace(0, len(rest) - 1, slots).astype(int)]] = True
+    return x[keep], y[keep]
+
+
+class DashboardViews:
+    """基于一份数据快照预先计算的聚合结果（只读）"""
+
+    def __init__(self, snapshot):
+        merged_df = snapshot.merged_df
+        sales_summary = snapshot.sales_summary
+        products_df = snapshot.products_df
+
+        # 每日总销量（按日期排序）
+        self.daily_sales = sales_summary.daily_sales.sort_index()
+
+        # 各类别库存合计与各类别销量
+        self.category_stock = merged_df.groupby('category', observed=True).agg({
+            'current_stock': 'sum',
+            'safety_stock': 'sum'
+        })
+        products = products_df.set_index('product_id')[['name', 'category']]
+        self.product_sales = snapshot.sales_stats.join(products, how='inner')
+        self.category_sales = self.product_sales.groupby('category', observed=True)['total_sales'].sum()
+        self.category_counts = products_df['category'].value_counts()
+
+        # 低库存清单（当前库存 < 安全库存，保持原有顺序），附带缺口与缺货风险
+        low_stock = merged_df[merged_df['current_stock'] < merged_df['safety_stock']].copy()
+        low_stock['shortage'] = low_stock['safety_stock'] - low_stock['current_stock']
+        low_stock['stockout_risk'] = low_stock['shortage'] / low_stock['safety_stock'] * 100
+        self.low_stock = low_stock
+        self.out_of_stock_count = int((merged_df['current_stock'] == 0).sum())
+
+        # 各商品与各类别的平均利润率（利润率 = (售价 - 成本) / 售价）
+        self.profit_margin = (merged_df['selling_price'] - merged_df['cost_price']) / merged_df['selling_price'] * 100
+        self.category_margin = self.profit_margin.groupby(merged_df['category'], observed=True).mean()
+
+        # 概览图的库存散点（抽样）与对角线范围
+        self.stock_scatter = sample_scatter(merged_df['safety_stock'].to_numpy(),
+                                            merged_df['current_stock'].to_numpy(),
+                                            CHART_CONFIG['overview_scatter_points'])
+        self.max_safety_stock = merged_df['safety_stock'].max()
+
+        # 销量分布直方图分箱
+        self.quantity_histogram = sales_summary.quantity_histogram(bins=30)
+
+        # 销售日期范围与整体统计
+        self.sales_start = sales_summary.start_date
+        self.sales_end = sales_summary.end_date
+        self.summary_text = self._summary_text(snapshot)
+
+    @property
+    def sales_period(self):
+        return f"{self.sales_start:%Y-%m-%d} 到 {self.sales_end:%Y-%m-%d}"
+
+    def _summary_text(self, snapshot):
+        """问答提示词中的数据摘要"""
+        merged_df = snapshot.merged_df
+        sales_summary = snapshot.sales_summary
+        return f"""
+        数据概览：
+        - 总商品数：{len(snapshot.products_df)}
+        - 商品类别：{', '.join(snapshot.products_df['category'].unique())}
+        - 销售记录数：{sales_summary.record_count}
+        - 销售日期范围：{self.sales_start:%Y-%m-%d} 到 {self.sales_end:%Y-%m-%d}
+        
+        库存状况：
+        - 低库存商品（当前库存 < 安全库存）：{len(self.low_stock)}个
+        - 缺货商品（当前库存 = 0）：{self.out_of_stock_count}个
+        - 平均库存水平：{merged_df['current_stock'].mean():.0f}
+        
+        销售统计：
+        - 平均日销量：{sales_summary.mean_quantity:.1f}
+        - 最高日销量：{sales_summary.max_quantity}
+        - 总销量：{sales_summary.total_quantity}
+        """
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+CSV 解析缓存
+
+首次读取 CSV 时在同目录写入一份 Feather（Arrow IPC）副本，之后直接读取该副本，省去 CSV 解析与类型转换；
+源 CSV 的修改时间或大小发生变化时自动重建。未安装 pyarrow 时直接读取 CSV。
+副本以内存映射方式打开（不额外读入一份缓冲），但转换为 pandas DataFrame 时各列仍会复制到 pandas 内存中，
+因此缓存只缩短加载时间，不减少加载后的内存占用。
+
+用法：
+    python data_cache.py --warm    # 预热缓存
+    python data_cache.py --clear   # 清除缓存
+"""
+
+import argparse
+import os
+from config import CACHE_CONFIG, DATA_FILES
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow 是可选依赖
+    pa = None
+    feather = None
+
+# 写入缓存文件 schema 元数据中的源文件信息
+SOURCE_MTIME_KEY = b'source_mtime_ns'
+SOURCE_SIZE_KEY = b'source_size'
+
+# 参与缓存的数据表（report_output 等输出文件除外）
+CACHED_TABLES = ['inventory', 'products', 'sales_records']
+
+
+def cache_available():
+    """缓存是否可用"""
+    return CACHE_CONFIG['enabled'] and feather is not None
+
+
+def cache_path_for(csv_path):
+    """CSV 对应的缓存文件路径"""
+    return os.path.splitext(csv_path)[0] + CACHE_CONFIG['suffix']
+
+
+def _source_signature(stat):
+    return {
+        SOURCE_MTIME_KEY: str(stat.st_mtime_ns).encode(),
+        SOURCE_SIZE_KEY: str(stat.st_size).encode()
+    }
+
+
+def _read_cache(cache_path, stat):
+    """读取缓存；缓存不存在或已过期时返回 None（返回的 DataFrame 已复制到 pandas 内存，不引用映射的文件）"""
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        table = feather.read_table(cache_path, memory_map=True)
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+    metadata = table.schema.metadata or {}
+    signature = _source_signature(stat)
+    if any(metadata.get(key) != value for key, value in signature.items()):
+        return None
+    return table.to_pandas()
+
+
+def _write_cache(df, cache_path, stat):
+    """写入缓存（不压缩，以便内存映射读取）；失败时仅提示，不影响数据加载"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), **_source_signature(stat)})
+    tmp_path = cache_path + '.tmp'
+    try:
+        feather.write_feather(table, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"⚠️  缓存写入失败，继续使用 CSV: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def read_cached(csv_path, reader):
+    """
+    读取数据表：缓存有效时读取缓存，否则调用 reader 解析 CSV 并重建缓存
+
+    Args:
+        csv_path: CSV 文件路径
+        reader: 解析 CSV 的函数，接收路径返回 DataFrame
+    """
+    if not cache_available():
+        return reader(csv_path)
+
+    stat = os.stat(csv_path)
+    cache_path = cache_path_for(csv_path)
+
+    df = _read_cache(cache_path, stat)
+    if df is None:
+        df = reader(csv_path)
+        _write_cache(df, cache_path, stat)
+    return df
+
+
+def warm_cache(data_files=DATA_FILES):
+    """为所有数据表构建缓存"""
+    from data_store import TABLE_READERS, table_paths
+
+    if not cache_available():
+        print("❌ 缓存不可用：请安装 pyarrow 并在 config.py 中启用 CACHE_CONFIG")
+        return
+    paths = table_paths(data_files)
+    for name in CACHED_TABLES:
+        for path in paths[name]:
+            read_cached(path, TABLE_READERS[name])
+            print(f"✅ 已缓存 {path} -> {cache_path_for(path)}")
+
+
+def clear_cache(data_files=DATA_FILES):
+    """删除所有数据表的缓存文件"""
+    from data_store import table_paths
+
+    paths = table_paths(data_files)
+    for name in CACHED_TABLES:
+        for path in paths[name]:
+            cache_path = cache_path_for(path)
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+                print(f"🗑️  已删除 {cache_path}")
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="CSV 解析缓存管理")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--warm', action='store_true', help='预热缓存')
+    group.add_argument('--clear', action='store_true', help='清除缓存')
+    args = parser.parse_args()
+
+    if args.warm:
+        warm_cache()
+    else:
+        clear_cache()
+
+
+if __name__ == "__main__":
+    main()
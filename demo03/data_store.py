@@ -0,0 +1,492 @@
+# 库存数据存储层
+# 所有入口（问答系统、报告生成器、数据验证脚本）共享同一份数据快照：
+# 每张表按显式 dtype 只读取一次，合并表和销售统计也只计算一次。
+# 销售记录只追加新行时，重新加载只解析新增的行，按商品累加量（销售统计）与销售汇总在原有结果上合并；
+# 累加量同时保存为检查点（incremental_stats），进程重启后文件没有变化时不需要重新聚合。
+
+import hashlib
+import io
+import json
+import os
+import threading
+import uuid
+import pandas as pd
+from pandas.api.types import union_categoricals
+from config import DATA_FILES, INCREMENTAL_STATS_CONFIG, RELOAD_CONFIG, OUT_OF_CORE_CONFIG
+from dashboard_views import DashboardViews
+from data_cache import read_cached
+from incremental_stats import checkpoint_path_for, save_checkpoint, restore_aggregates, file_fingerprint, last_line_end
+from parallel_aggregates import use_parallel, summarize_sales_parallel
+from sales_aggregates import aggregate_sales, merge_aggregates, finalize_sales_stats, summarize_sales, merge_summaries
+
+# 快照包含的数据表（DATA_FILES 中的键）
+SOURCE_TABLES = ['inventory', 'products', 'sales_records']
+
+# 各数据表的列类型（product_id / category 使用分类类型，数量使用 int32）
+INVENTORY_DTYPES = {
+    'product_id': 'category',
+    'current_stock': 'int32',
+    'safety_stock': 'float64'
+}
+PRODUCTS_DTYPES = {
+    'product_id': 'category',
+    'name': 'string',
+    'category': 'category',
+    'cost_price': 'float64',
+    'selling_price': 'float64',
+    'supplier_lead_time': 'int16'
+}
+SALES_DTYPES = {
+    'product_id': 'category',
+    'quantity_sold': 'int32'
+}
+
+# 分块读取销售记录时每行的估算内存（解析缓冲、分类编码、日期与分组中间结果）
+SALES_CHUNK_BYTES_PER_ROW = 256
+
+# 各数据表需要解析为日期的列及其格式（指定格式避免逐行推断）
+INVENTORY_DATE_COLUMNS = ['last_updated']
+INVENTORY_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+SALES_DATE_COLUMNS = ['date']
+SALES_DATE_FORMAT = '%Y-%m-%d'
+
+
+def read_inventory(path):
+    """读取库存数据"""
+    return pd.read_csv(path, dtype=INVENTORY_DTYPES, parse_dates=INVENTORY_DATE_COLUMNS,
+                       date_format=INVENTORY_DATE_FORMAT)
+
+
+def read_products(path):
+    """读取商品信息数据"""
+    return pd.read_csv(path, dtype=PRODUCTS_DTYPES)
+
+
+def read_sales(path):
+    """读取销售记录数据"""
+    return pd.read_csv(path, dtype=SALES_DTYPES, parse_dates=SALES_DATE_COLUMNS,
+                       date_format=SALES_DATE_FORMAT)
+
+
+# 数据表名称（DATA_FILES 中的键）到读取函数的映射
+TABLE_READERS = {
+    'inventory': read_inventory,
+    'products': read_products,
+    'sales_records': read_sales
+}
+
+
+def read_manifest(manifest_path):
+    """读取分片数据集清单，返回各数据表的分片文件路径（清单中的路径相对清单所在目录）"""
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    return {name: [os.path.join(base_dir, path) for path in manifest['tables'][name]] for name in SOURCE_TABLES}
+
+
+def table_paths(data_files=DATA_FILES):
+    """各数据表的文件路径列表：配置了分片清单时为各分片文件，否则为单个 CSV 文件"""
+    if data_files.get('manifest'):
+        return read_manifest(data_files['manifest'])
+    return {name: [data_files[name]] for name in SOURCE_TABLES}
+
+
+def concat_partitions(frames):
+    """按顺序拼接同一数据表的各个分片，分类列合并取值后仍为分类类型"""
+    if len(frames) == 1:
+        return frames[0]
+    columns = {}
+    for column in frames[0].columns:
+        if isinstance(frames[0][column].dtype, pd.CategoricalDtype):
+            columns[column] = union_categoricals([df[column] for df in frames])
+        else:
+            columns[column] = pd.concat([df[column] for df in frames], ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+def read_table(paths, reader):
+    """读取一张数据表的全部分片（每个分片单独使用解析缓存）"""
+    return concat_partitions([read_cached(path, reader) for path in paths])
+
+
+def unify_product_ids(*frames, extra_ids=None):
+    """
+    让多张表的 product_id 共用同一组分类取值，保证合并与分组时不退化为 object 类型
+
+    extra_ids 为未随数据表加载、但也要纳入分类取值的商品编号（如分块汇总得到的销售统计索引）
+    """
+    categories = pd.Index([]) if extra_ids is None else pd.Index(extra_ids.astype(str))
+    for df in frames:
+        categories = categories.union(df['product_id'].cat.categories)
+    dtype = pd.CategoricalDtype(categories.sort_values())
+    for df in frames:
+        df['product_id'] = df['product_id'].astype(dtype)
+    return dtype
+
+
+def compute_sales_stats(sales_aggregates, product_id_dtype):
+    """由按商品累加量计算销售统计：平均日销量、最高日销量、总销量、销售天数"""
+    sales_stats = finalize_sales_stats(sales_aggregates)
+    # 累加量可能来自检查点或分块汇总（字符串索引），统一为与数据表相同的分类索引
+    sales_stats.index = pd.CategoricalIndex(sales_stats.index.astype(str),
+                                            dtype=product_id_dtype, name='product_id')
+    return sales_stats.sort_index()
+
+
+class DataSnapshot:
+    """一次加载得到的只读数据快照"""
+
+    def __init__(self, inventory_df, products_df, sales_df, sales_aggregates=None, source_signature=None,
+                 sales_summary=None):
+        """
+        sales_summary 为预先计算的销售汇总（并行计算或分块模式）；
+        分块模式下不保留销售记录：sales_df 为 None，由 sales_summary 提供销售统计与汇总
+        """
+        if sales_aggregates is None and sales_summary is not None:
+            sales_aggregates = sales_summary.aggregates
+        if sales_df is not None:
+            product_id_dtype = unify_product_ids(inventory_df, products_df, sales_df)
+        else:
+            product_id_dtype = unify_product_ids(inventory_df, products_df, extra_ids=sales_aggregates.index)
+
+        self.inventory_df = inventory_df
+        self.products_df = products_df
+        self.sales_df = sales_df
+
+        # 合并数据
+        self.merged_df = inventory_df.merge(products_df, on='product_id', how='left')
+
+        # 计算销售统计（提供了增量累加量时直接使用）
+        if sales_aggregates is None:
+            sales_aggregates = aggregate_sales(sales_df)
+        self.sales_stats = compute_sales_stats(sales_aggregates, product_id_dtype)
+        self._sales_aggregates = sales_aggregates
+        self._sales_summary = sales_summary
+        self._sales_summary_lock = threading.Lock()
+
+        # 加载时各数据文件的 (修改时间, 大小)，用于判断数据是否已更新
+        self.source_signature = source_signature
+        self.loaded_at = pd.Timestamp.now()
+
+        # 物化视图在首次使用时计算
+        self._views = None
+        self._views_lock = threading.Lock()
+
+        # 快照指纹：相同数据文件得到相同指纹，可作为图表等派生结果的缓存键
+        if source_signature is not None:
+            self.fingerprint = hashlib.sha1(repr(sorted(source_signature.items())).encode()).hexdigest()
+        else:
+            self.fingerprint = uuid.uuid4().hex
+
+    @property
+    def sales_summary(self):
+        """销售汇总（每日总销量、销量分布等）；分块模式在加载时已计算，否则首次使用时由销售记录计算"""
+        if self._sales_summary is None:
+            with self._sales_summary_lock:
+                if self._sales_summary is None:
+                    self._sales_summary = summarize_sales(self.sales_df, self._sales_aggregates)
+        return self._sales_summary
+
+    @property
+    def views(self):
+        """快照的物化视图（每份快照只计算一次）"""
+        if self._views is None:
+            with self._views_lock:
+                if self._views is None:
+                    self._views = DashboardViews(self)
+        return self._views
+
+    def memory_usage(self):
+        """快照中各数据表占用的内存（字节）"""
+        return {
+            name: int(getattr(self, name).memory_usage(deep=True).sum())
+            for name in ['inventory_df', 'products_df', 'sales_df', 'merged_df', 'sales_stats']
+            if getattr(self, name) is not None
+        }
+
+
+def source_signature(data_files=DATA_FILES):
+    """各数据文件当前的 (修改时间, 大小)；分片数据集包含清单与每个分片文件"""
+    signature = {}
+    if data_files.get('manifest'):
+        stat = os.stat(data_files['manifest'])
+        signature['manifest'] = (stat.st_mtime_ns, stat.st_size)
+    for name, paths in table_paths(data_files).items():
+        stats = [os.stat(path) for path in paths]
+        if len(stats) == 1:
+            signature[name] = (stats[0].st_mtime_ns, stats[0].st_size)
+        else:
+            signature[name] = tuple((stat.st_mtime_ns, stat.st_size) for stat in stats)
+    return signature
+
+
+def chunk_rows_for_memory(max_memory_mb):
+    """按内存上限计算分块读取销售记录时每块的行数"""
+    return max(1, int(max_memory_mb * 1024 * 1024 / SALES_CHUNK_BYTES_PER_ROW))
+
+
+def read_sales_summary_chunked(path, chunk_rows):
+    """分块读取销售记录并逐块汇总，内存占用只与每块行数有关"""
+    summary = None
+    for chunk in pd.read_csv(path, dtype=SALES_DTYPES, parse_dates=SALES_DATE_COLUMNS,
+                             date_format=SALES_DATE_FORMAT, chunksize=chunk_rows):
+        part = summarize_sales(chunk)
+        summary = part if summary is None else merge_summaries(summary, part)
+    if summary is None:
+        summary = summarize_sales(read_sales(path))
+    return summary
+
+
+class SalesPrefix:
+    """销售记录文件中已解析的完整行：处理到的偏移量、指纹、表头行、销售记录、按商品累加量，以及（已计算时的）销售汇总"""
+
+    def __init__(self, offset, fingerprint, header_line, sales_df, aggregates, summary=None):
+        self.offset = offset
+        self.fingerprint = fingerprint
+        self.header_line = header_line
+        self.sales_df = sales_df
+        self.aggregates = aggregates
+        self.summary = summary
+
+
+# 进程内已解析的销售记录前缀（{文件绝对路径: SalesPrefix}）：重新加载时只解析之后追加的行
+_sales_prefixes = {}
+_sales_prefixes_lock = threading.Lock()
+
+
+def parse_sales_rows(header_line, data):
+    """解析销售记录文件中的一段完整行（data 不含表头）"""
+    return read_sales(io.BytesIO(header_line.rstrip(b'\r\n') + b'\n' + data))
+
+
+def read_sales_appended(path):
+    """
+    读取一个销售记录文件：与上次解析的前缀相比只是追加了新行时，只解析新增的行并拼接到前缀之后；
+    首次读取或文件被截断、重写（指纹不匹配）时读取整个文件（优先读取解析缓存），
+    按商品累加量优先取自检查点；累加量有变化时更新检查点
+
+    Returns:
+        (prefix, tail_df): 截至最后一个换行符的前缀（SalesPrefix），以及末尾尚未写完换行的行（没有时为 None）。
+        末尾的行本次计入结果，但不计入前缀，下次重新解析
+    """
+    key = os.path.abspath(path)
+    previous = _sales_prefixes.get(key)
+    with open(path, 'rb') as f:
+        header_line = f.readline()
+        size = os.fstat(f.fileno()).st_size
+        resumed = (previous is not None and previous.header_line == header_line and previous.offset <= size
+                   and file_fingerprint(f, previous.offset) == previous.fingerprint)
+        start = previous.offset if resumed else len(header_line)
+        complete = last_line_end(f, start, size)
+        f.seek(complete)
+        tail = f.read(size - complete)
+
+        header = header_line.decode('utf-8').strip().split(',')
+        if resumed:
+            prefix = previous
+            if complete > start:
+                f.seek(start)
+                new_df = parse_sales_rows(header_line, f.read(complete - start))
+                new_aggregates = aggregate_sales(new_df)
+                summary = previous.summary
+                if summary is not None:
+                    summary = merge_summaries(summary, summarize_sales(new_df, new_aggregates))
+                prefix = SalesPrefix(complete, file_fingerprint(f, complete), header_line,
+                                     concat_partitions([previous.sales_df, new_df]),
+                                     merge_aggregates(previous.aggregates, new_aggregates), summary)
+                save_checkpoint(checkpoint_path_for(path), complete, prefix.fingerprint, header, prefix.aggregates)
+        else:
+            sales_df = read_cached(path, read_sales)
+            if os.stat(path).st_size != size:
+                # 读取期间文件又被追加：只解析本次确定的完整行，其余留给下次
+                f.seek(start)
+                sales_df = parse_sales_rows(header_line, f.read(complete - start))
+            elif tail.strip():
+                sales_df = sales_df.iloc[:-1]
+            aggregates = restore_aggregates(path, f, complete, header)
+            fingerprint = file_fingerprint(f, complete)
+            if aggregates is None:
+                aggregates = aggregate_sales(sales_df)
+                save_checkpoint(checkpoint_path_for(path), complete, fingerprint, header, aggregates)
+            prefix = SalesPrefix(complete, fingerprint, header_line, sales_df, aggregates)
+    _sales_prefixes[key] = prefix
+    tail_df = parse_sales_rows(header_line, tail) if tail.strip() else None
+    return prefix, tail_df
+
+
+def read_sales_incremental(paths):
+    """
+    增量读取销售记录的全部分片，返回 (sales_df, sales_aggregates, sales_summary)
+
+    按商品累加量与销售汇总都由各分片前缀的结果与末尾未写完换行的行合并得到；前缀还没有汇总时，
+    销售记录较多则在多个进程中计算（之后追加的行只需合并），否则为 None（首次使用时计算）
+    """
+    with _sales_prefixes_lock:
+        for key in [key for key in _sales_prefixes if not os.path.exists(key)]:
+            del _sales_prefixes[key]
+        parts = [read_sales_appended(path) for path in paths]
+
+        frames = [frame for prefix, tail_df in parts for frame in (prefix.sales_df, tail_df) if frame is not None]
+        sales_df = concat_partitions(frames)
+        if use_parallel(len(sales_df)):
+            for prefix, _ in parts:
+                if prefix.summary is None:
+                    prefix.summary = summarize_sales_parallel(prefix.sales_df)
+
+        tail_aggregates = [None if tail_df is None else aggregate_sales(tail_df) for _, tail_df in parts]
+        sales_aggregates = merge_aggregates(*(aggregates for (prefix, _), tail in zip(parts, tail_aggregates)
+                                              for aggregates in (prefix.aggregates, tail) if aggregates is not None))
+        sales_summary = None
+        if all(prefix.summary is not None for prefix, _ in parts):
+            sales_summary = merge_summaries(*(summary for (prefix, tail_df), tail in zip(parts, tail_aggregates)
+                                              for summary in (prefix.summary, None if tail_df is None
+                                                              else summarize_sales(tail_df, tail))
+                                              if summary is not None))
+    # 快照会统一 product_id 的分类取值（替换该列），使用浅拷贝，不影响缓存的前缀和旧快照
+    return sales_df.copy(deep=False), sales_aggregates, sales_summary
+
+
+def load_snapshot(data_files=DATA_FILES):
+    """从数据文件加载一份新的快照（优先读取解析缓存，销售记录与销售统计增量更新）"""
+    # 先记录文件签名再读取：读取期间发生的修改会在下一次检查时被发现
+    signature = source_signature(data_files)
+    paths = table_paths(data_files)
+
+    if OUT_OF_CORE_CONFIG['enabled']:
+        # 分块模式：销售记录逐块汇总，不整体载入内存
+        chunk_rows = chunk_rows_for_memory(OUT_OF_CORE_CONFIG['max_memory_mb'])
+        return DataSnapshot(
+            read_table(paths['inventory'], read_inventory),
+            read_table(paths['products'], read_products),
+            None,
+            source_signature=signature,
+            sales_summary=merge_summaries(*(read_sales_summary_chunked(path, chunk_rows)
+                                            for path in paths['sales_records']))
+        )
+
+    if INCREMENTAL_STATS_CONFIG['enabled']:
+        # 每个分片文件分别增量读取（各有检查点）；只解析上次加载之后追加的行
+        sales_df, sales_aggregates, sales_summary = read_sales_incremental(paths['sales_records'])
+    else:
+        # 销售记录较多时在多个进程中计算销售汇总，否则在首次使用时计算
+        sales_df = read_table(paths['sales_records'], read_sales)
+        sales_aggregates, sales_summary = None, None
+        if use_parallel(len(sales_df)):
+            sales_summary = summarize_sales_parallel(sales_df)
+
+    return DataSnapshot(
+        read_table(paths['inventory'], read_inventory),
+        read_table(paths['products'], read_products),
+        sales_df,
+        sales_aggregates,
+        signature,
+        sales_summary
+    )
+
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+# 重新加载与替换快照依次进行，较早开始的加载不会覆盖较新的快照
+_reload_lock = threading.Lock()
+_watcher = None
+_listeners = []
+
+
+def get_snapshot(reload=False):
+    """获取进程内共享的数据快照，首次调用时加载；reload 为 True 时重新加载并替换"""
+    global _snapshot
+    with _snapshot_lock:
+        if _snapshot is None:
+            _snapshot = load_snapshot()
+            return _snapshot
+        if not reload:
+            return _snapshot
+
+    with _reload_lock:
+        snapshot = load_snapshot()
+        _swap_snapshot(snapshot)
+    return snapshot
+
+
+def add_snapshot_listener(callback):
+    """注册快照替换回调 callback(old_snapshot, new_snapshot)，用于清理依赖旧快照的派生结果"""
+    with _snapshot_lock:
+        if callback not in _listeners:
+            _listeners.append(callback)
+
+
+def remove_snapshot_listener(callback):
+    """取消注册快照替换回调（回调所属的对象不再使用时调用，避免被一直引用）"""
+    with _snapshot_lock:
+        if callback in _listeners:
+            _listeners.remove(callback)
+
+
+def _swap_snapshot(snapshot):
+    """原子地替换共享快照；已取得旧快照的调用方继续使用旧数据直到完成"""
+    global _snapshot
+    with _snapshot_lock:
+        old_snapshot, _snapshot = _snapshot, snapshot
+        listeners = list(_listeners)
+
+    for callback in listeners:
+        try:
+            callback(old_snapshot, snapshot)
+        except Exception as e:
+            print(f"⚠️  快照替换回调执行失败: {e}")
+
+
+class SnapshotWatcher(threading.Thread):
+    """后台线程：定期检查数据文件，发生变化时在后台重建快照并替换"""
+
+    def __init__(self, data_files=DATA_FILES, interval=None, signature=None):
+        super().__init__(name='snapshot-watcher', daemon=True)
+        self.data_files = data_files
+        self.interval = interval if interval is not None else RELOAD_CONFIG['poll_interval_seconds']
+        # 本线程最近一次加载（或启动时）的数据文件签名，默认取当前快照的签名；与它比较而不是与当前快照比较，
+        # 其他来源替换的快照（如测试或其他数据文件的监控线程）不会被当作文件变化
+        self.signature = signature if signature is not None else get_snapshot().source_signature
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.check()
+
+    def stop(self):
+        """停止监控"""
+        self._stop_event.set()
+
+    def check(self):
+        """检查一次数据文件，有变化时重新加载；返回是否替换了快照"""
+        with _reload_lock:
+            # 在锁内比较签名：其他线程刚完成的重新加载不会被重复执行或被旧数据覆盖
+            try:
+                signature = source_signature(self.data_files)
+                if signature == self.signature:
+                    return False
+                if signature == get_snapshot().source_signature:
+                    self.signature = signature
+                    return False
+                snapshot = load_snapshot(self.data_files)
+                # 在替换前计算物化视图，替换后的第一个问题不需要等待
+                snapshot.views
+            except Exception as e:
+                # 文件可能正在写入，保留旧快照，下次再试
+                print(f"⚠️  数据重新加载失败，继续使用旧数据: {e}")
+                return False
+
+            self.signature = snapshot.source_signature
+            _swap_snapshot(snapshot)
+        print(f"🔄 数据已更新（{snapshot.loaded_at:%Y-%m-%d %H:%M:%S}）")
+        return True
+
+
+def start_watcher():
+    """启动进程内唯一的数据文件监控线程（重复调用不会启动多个）"""
+    global _watcher
+    signature = get_snapshot().source_signature
+    with _snapshot_lock:
+        if _watcher is None or not _watcher.is_alive():
+            _watcher = SnapshotWatcher(signature=signature)
+            _watcher.start()
+        return _watcher
@@ -0,0 +1,55 @@
+# 本地模拟的大模型客户端
+# 接口与 ChatOpenAI 的 invoke / ainvoke / astream 一致，按配置的延迟返回固定回答，
+# 不访问网络、不需要 API 密钥。用于基准测试和离线测试：通过 llm_client.set_llm() 替换共享客户端。
+
+import asyncio
+import threading
+import time
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+DEFAULT_RESPONSE = (
+    "根据当前数据，整体库存状况需要关注：部分商品低于安全库存，建议优先补货缺货风险高的商品；"
+    "同时有商品库存积压，可以通过限时折扣等促销方式消化库存，并结合销售趋势调整采购计划。"
+)
+
+
+class FakeLLM:
+    """按固定延迟返回固定回答的 LLM 客户端"""
+
+    def __init__(self, latency=0.5, response=DEFAULT_RESPONSE, chunks=20):
+        """
+        Args:
+            latency: 每次调用的总耗时（秒），流式输出时平均分配到各个片段
+            response: 返回的回答内容
+            chunks: 流式输出时的片段数
+        """
+        self.latency = latency
+        self.response = response
+        self.chunks = max(1, min(chunks, len(response)))
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _count_call(self):
+        with self._lock:
+            self.calls += 1
+
+    def _split_response(self):
+        size = -(-len(self.response) // self.chunks)
+        return [self.response[i:i + size] for i in range(0, len(self.response), size)]
+
+    def invoke(self, messages, **kwargs):
+        self._count_call()
+        time.sleep(self.latency)
+        return AIMessage(content=self.response)
+
+    async def ainvoke(self, messages, **kwargs):
+        self._count_call()
+        await asyncio.sleep(self.latency)
+        return AIMessage(content=self.response)
+
+    async def astream(self, messages, **kwargs):
+        self._count_call()
+        parts = self._split_response()
+        for part in parts:
+            await asyncio.sleep(self.latency / len(parts))
+            yield AIMessageChunk(content=part)
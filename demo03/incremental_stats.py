@@ -0,0 +1,82 @@
+# 销售统计增量聚合的检查点
+# 销售记录只会追加新的日期。data_store 在进程内记录每个销售记录文件已解析到的偏移量和按商品的累加量，
+# 重新加载时只解析之后追加的行并合并进累加量；这里负责识别文件是否被截断或重写（指纹），
+# 并把累加量与偏移量一起保存为检查点，进程重启后文件没有变化时直接使用检查点中的累加量。
+
+import hashlib
+import json
+import os
+import pandas as pd
+from config import INCREMENTAL_STATS_CONFIG
+
+# 计算指纹时读取的字节数：文件开头一段 + 检查点偏移量之前一段
+FINGERPRINT_BYTES = 4096
+
+
+def checkpoint_path_for(csv_path):
+    """销售记录对应的检查点文件路径"""
+    return os.path.splitext(csv_path)[0] + INCREMENTAL_STATS_CONFIG['checkpoint_suffix']
+
+
+def file_fingerprint(f, offset):
+    """文件开头与偏移量之前各一段内容的摘要，用于识别文件是否被重写"""
+    digest = hashlib.sha1()
+    f.seek(0)
+    digest.update(f.read(min(offset, FINGERPRINT_BYTES)))
+    f.seek(max(0, offset - FINGERPRINT_BYTES))
+    digest.update(f.read(min(offset, FINGERPRINT_BYTES)))
+    return digest.hexdigest()
+
+
+def last_line_end(f, start, size):
+    """start 到 size 之间最后一个换行符之后的偏移量（从末尾向前查找；没有换行符时返回 start）"""
+    end = size
+    while end > start:
+        begin = max(start, end - FINGERPRINT_BYTES)
+        f.seek(begin)
+        position = f.read(end - begin).rfind(b'\n')
+        if position >= 0:
+            return begin + position + 1
+        end = begin
+    return start
+
+
+def load_checkpoint(checkpoint_path):
+    """读取检查点，返回 (偏移量, 指纹, 表头, 累加量)；不存在或损坏时返回 None"""
+    try:
+        with open(checkpoint_path, encoding='utf-8') as f:
+            state = json.load(f)
+        aggregates = pd.DataFrame(state['aggregates'], columns=['product_id', 'count', 'sum', 'max'])
+        aggregates = aggregates.set_index('product_id').astype('int64')
+        return state['offset'], state['fingerprint'], state['header'], aggregates
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_checkpoint(checkpoint_path, offset, fingerprint, header, aggregates):
+    """原子地写入检查点"""
+    state = {
+        'offset': offset,
+        'fingerprint': fingerprint,
+        'header': header,
+        'aggregates': [list(row) for row in zip(aggregates.index.astype(str).tolist(),
+                                                 *(aggregates[column].tolist() for column in aggregates.columns))]
+    }
+    tmp_path = checkpoint_path + '.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, checkpoint_path)
+    except OSError as e:
+        print(f"⚠️  销售统计检查点写入失败: {e}")
+
+
+def restore_aggregates(csv_path, f, offset, header):
+    """检查点恰好处理到 offset 且文件内容未被重写时返回其中的累加量，否则返回 None"""
+    checkpoint = load_checkpoint(checkpoint_path_for(csv_path))
+    if checkpoint is None:
+        return None
+    saved_offset, saved_fingerprint, saved_header, aggregates = checkpoint
+    if saved_offset != offset or saved_header != header or file_fingerprint(f, offset) != saved_fingerprint:
+        return None
+    return aggregates
@@ -0,0 +1,97 @@
+# 库存分析（数据分析师阶段的精确计算）
+# 直接由数据快照筛选低库存商品（当前库存 < 安全库存）和高库存商品（当前库存 > 安全库存 × 2），
+# 计算缺货风险与积压风险指数并按风险排序，结果结构与 prompts.ANALYST_PROMPT_TEMPLATE 要求 LLM 返回的 JSON 一致。
+# 不调用 LLM：耗时与 token 不随商品数增长，也不会出现错误分类（如 test_data_accuracy.py 中的 P005）。
+
+import numpy as np
+import pandas as pd
+from config import INVENTORY_ANALYSIS_CONFIG
+
+LOW_STOCK_FIELDS = ['product_id', 'name', 'category', 'current_stock', 'safety_stock',
+                    'out_of_stock_risk', 'sales_trend']
+HIGH_STOCK_FIELDS = ['product_id', 'name', 'category', 'current_stock', 'safety_stock',
+                     'overstock_risk', 'sales_trend']
+
+
+def product_sales_trends(sales_df, recent_days, threshold):
+    """
+    各商品的销售趋势：最近 recent_days 天的平均日销量与此前相比，变化超过 threshold 为上升/下降，否则为平稳
+
+    Returns:
+        以 product_id 为索引的 Series；没有完整销售记录（分块汇总模式）时返回 None
+    """
+    if sales_df is None or sales_df.empty:
+        return None
+    recent = sales_df['date'] > sales_df['date'].max() - pd.Timedelta(days=recent_days)
+    means = (sales_df.groupby([sales_df['product_id'], recent.rename('recent')], observed=True)['quantity_sold']
+             .mean().unstack().reindex(columns=[False, True]))
+    ratio = means[True] / means[False]
+    trends = np.select([ratio > 1 + threshold, ratio < 1 - threshold], ['上升', '下降'], '平稳')
+    return pd.Series(trends, index=means.index.astype(str))
+
+
+def _product_records(df, fields):
+    """DataFrame 转为 JSON 记录（数值转为 Python 类型，风险与安全库存保留 1 位小数）"""
+    df = df[fields].copy()
+    for column in ['product_id', 'name', 'category']:
+        df[column] = df[column].astype(str)
+    df['current_stock'] = df['current_stock'].astype('int64')
+    for column in ['safety_stock', 'out_of_stock_risk', 'overstock_risk']:
+        if column in df:
+            df[column] = df[column].astype('float64').round(1)
+    return df.to_dict(orient='records')
+
+
+def overall_health(abnormal_ratio):
+    """按低库存与高库存商品的占比评估整体库存健康状况"""
+    if abnormal_ratio <= 0.1:
+        return "良好"
+    if abnormal_ratio <= 0.3:
+        return "需要关注"
+    return "不佳"
+
+
+def analyze_inventory(snapshot, config=INVENTORY_ANALYSIS_CONFIG):
+    """
+    计算数据分析师阶段的结果
+
+    Returns:
+        {"low_stock_products": [...], "high_stock_products": [...], "analysis_summary": {...}}，
+        与 ANALYST_PROMPT_TEMPLATE 中的结构一致
+    """
+    merged_df = snapshot.merged_df
+    current_stock = merged_df['current_stock']
+    safety_stock = merged_df['safety_stock']
+
+    trends = product_sales_trends(snapshot.sales_df, config['trend_recent_days'], config['trend_threshold'])
+    product_ids = merged_df['product_id'].astype(str)
+    sales_trend = product_ids.map(trends).fillna('平稳') if trends is not None else '未知'
+    df = merged_df.assign(sales_trend=sales_trend)
+
+    low_stock_df = df[current_stock < safety_stock].assign(
+        out_of_stock_risk=(safety_stock - current_stock) / safety_stock * 100
+    ).sort_values('out_of_stock_risk', ascending=False, kind='stable')
+    high_stock_df = df[current_stock > safety_stock * 2].assign(
+        overstock_risk=(current_stock - safety_stock) / safety_stock * 100
+    ).sort_values('overstock_risk', ascending=False, kind='stable')
+
+    total_products = len(merged_df)
+    critical_low = int((low_stock_df['out_of_stock_risk'] > config['critical_stockout_risk']).sum())
+    critical_high = int((high_stock_df['overstock_risk'] > config['critical_overstock_risk']).sum())
+    abnormal_ratio = (len(low_stock_df) + len(high_stock_df)) / total_products if total_products else 0.0
+
+    return {
+        "low_stock_products": _product_records(low_stock_df, LOW_STOCK_FIELDS),
+        "high_stock_products": _product_records(high_stock_df, HIGH_STOCK_FIELDS),
+        "analysis_summary": {
+            "total_products": total_products,
+            "low_stock_count": len(low_stock_df),
+            "high_stock_count": len(high_stock_df),
+            "overall_health": overall_health(abnormal_ratio),
+            "key_findings": (
+                f"发现{len(low_stock_df)}个商品低于安全库存，其中{critical_low}个商品缺货风险高于"
+                f"{config['critical_stockout_risk']}%；发现{len(high_stock_df)}个商品库存积压，"
+                f"其中{critical_high}个商品积压风险超过{config['critical_overstock_risk']}%"
+            )
+        }
+    }
@@ -0,0 +1,78 @@
+# 大模型客户端
+# 进程内所有会话、问答系统和报告生成器共用同一个 ChatOpenAI 客户端（内部复用 HTTP 连接池），
+# 避免每个会话各自创建客户端与连接。
+# 客户端的异步连接池绑定在首次使用它的事件循环上，因此异步调用（流式输出）都在进程内唯一、
+# 在后台线程中持续运行的事件循环中执行（run_async / iter_async），而不是每次 asyncio.run 新建事件循环。
+
+import asyncio
+import threading
+from langchain_openai import ChatOpenAI
+from config import MODEL_CONFIG
+
+_llm = None
+_llm_lock = threading.Lock()
+
+
+def get_llm():
+    """获取进程内共享的 LLM 客户端，首次调用时创建"""
+    global _llm
+    with _llm_lock:
+        if _llm is None:
+            _llm = ChatOpenAI(
+                model_name=MODEL_CONFIG["model_name"],
+                openai_api_base=MODEL_CONFIG["openai_api_base"],
+                openai_api_key=MODEL_CONFIG["openai_api_key"],
+                temperature=MODEL_CONFIG["temperature"]
+            )
+        return _llm
+
+
+def without_sdk_retries(llm):
+    """
+    返回关闭了 SDK 内部重试（max_retries=0）的同配置客户端，供自行重试的调用方使用（如批量问答），
+    避免两层重试叠加；共享客户端本身不受影响。不是 ChatOpenAI 或已关闭重试时原样返回。
+    """
+    if not isinstance(llm, ChatOpenAI) or llm.max_retries == 0:
+        return llm
+    # 底层的 HTTP 客户端按 max_retries 创建，需要重新创建
+    fields = llm.model_fields_set - {'client', 'async_client', 'root_client', 'root_async_client'}
+    return type(llm)(**{name: getattr(llm, name) for name in fields}, max_retries=0)
+
+
+def set_llm(llm):
+    """替换进程内共享的 LLM 客户端（如基准测试使用 fake_llm.FakeLLM），返回原来的客户端"""
+    global _llm
+    with _llm_lock:
+        previous, _llm = _llm, llm
+        return previous
+
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def get_event_loop():
+    """获取进程内共享的事件循环（首次调用时在后台线程中启动，之后一直运行）"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='llm-event-loop', daemon=True).start()
+        return _loop
+
+
+def run_async(coroutine):
+    """在共享事件循环中运行协程并等待结果（可在任意线程中调用，不能在共享事件循环中调用）"""
+    return asyncio.run_coroutine_threadsafe(coroutine, get_event_loop()).result()
+
+
+def iter_async(async_iterator):
+    """在共享事件循环中逐个取出异步生成器的元素，调用方线程中同步遍历；提前结束时关闭生成器"""
+    try:
+        while True:
+            try:
+                yield run_async(async_iterator.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        run_async(async_iterator.aclose())
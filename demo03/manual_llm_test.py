@@ -1,6 +1,10 @@
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, SystemMessage
-import json
+from agent_pipeline import AgentStage, ComputeStage, run_pipeline, stage_totals
+from data_store import get_snapshot
+from inventory_analysis import analyze_inventory
+from tracing import format_breakdown, configure_logging
+from prompt_builder import build_replenishment_prompt, build_promotion_prompt, build_report_prompt
+from prompts import STRATEGY_SYSTEM_MESSAGE, REPORT_SYSTEM_MESSAGE
 
 # 配置 Moonshot 大模型
 llm = ChatOpenAI(
@@ -10,129 +14,65 @@ llm = ChatOpenAI(
     temperature=0.7
 )
 
-def manual_crewai_simulation():
-    """手动模拟 crewai 的工作流程"""
-    
-    # 模拟 Agent 1: 数据分析师
-    print("🤖 Agent 1: 数据分析师开始工作...")
-    
-    # 构建数据分析师的任务提示
-    analyst_prompt = """
-    你是一位经验丰富的数据分析师。请分析以下库存数据并识别低库存商品。
-
-    数据文件信息：
-    - 销售记录: sales_records.csv (3000行数据)
-    - 商品信息: products.csv (100个商品)
-    - 库存数据: inventory.csv (100个商品库存)
-
-    请返回JSON格式的分析结果，结构如下：
-    {
-        "low_stock_products": [
-            {
-                "product_id": "P001",
-                "name": "商品名称",
-                "current_stock": 50,
-                "safety_stock": 100,
-                "days_of_inventory": 5.2,
-                "out_of_stock_risk": 50.0
-            }
-        ],
-        "overall_health": "不佳",
-        "key_findings": "发现10个商品低于安全库存水平，其中3个商品缺货风险高于70%"
-    }
+def build_stages(snapshot):
     """
-    
-    try:
-        # 手动调用 LLM，只传递必要的参数
-        messages = [
-            SystemMessage(content="你是一个专业的数据分析师，擅长分析库存数据。"),
-            HumanMessage(content=analyst_prompt)
-        ]
-        
-        response1 = llm.invoke(messages)
-        print("✅ Agent 1 分析完成")
-        print("分析结果:", response1.content)
-        
-        # 模拟 Agent 2: 策略顾问
-        print("\n🤖 Agent 2: 策略顾问开始工作...")
-        
-        # 使用 Agent 1 的结果作为输入
-        strategy_prompt = f"""
-        你是一位资深的库存策略顾问。根据数据分析师的分析结果：
-        
-        {response1.content}
-        
-        请为低库存商品制定具体的补货建议和促销策略。
-        
-        请返回JSON格式的策略建议，结构如下：
-        {{
-            "replenishment_strategies": [
-                {{
-                    "product_id": "P001",
-                    "replenishment_amount": 200,
-                    "timeline": "紧急补货（48小时内）",
-                    "reason": "高缺货风险且销售趋势上升"
-                }}
-            ],
-            "promotion_strategies": [
-                {{
-                    "product_id": "P045",
-                    "promotion_method": "限时折扣",
-                    "discount_rate": 15,
-                    "duration": "2周"
-                }}
-            ],
-            "overall_recommendations": "建议优化安全库存计算公式并建立自动补货系统"
-        }}
-        """
-        
-        messages2 = [
-            SystemMessage(content="你是一个专业的库存策略顾问，擅长制定补货和促销策略。"),
-            HumanMessage(content=strategy_prompt)
-        ]
-        
-        response2 = llm.invoke(messages2)
-        print("✅ Agent 2 策略制定完成")
-        print("策略建议:", response2.content)
-        
-        # 模拟 Agent 3: 报告生成器
-        print("\n🤖 Agent 3: 报告生成器开始工作...")
-        
-        report_prompt = f"""
-        你是一位专业的报告撰写专家。根据以下分析结果和策略建议，撰写一份全面的库存管理报告：
+    多 Agent 流水线：数据分析师 -> (补货策略 ∥ 促销策略) -> 报告生成器
 
-        数据分析结果：
-        {response1.content}
+    数据分析师的结果由数据快照精确计算（结构与 ANALYST_PROMPT_TEMPLATE 一致），不调用 LLM；
+    补货与促销分别只依赖分析结果中的 low_stock_products 和 high_stock_products，两者同时调用 LLM；
+    报告生成器接收分析结果与两部分策略的 JSON 片段，而不是上游回答的原始文本。
+    提示词按 token 预算构建：商品很多时按风险保留明细，其余商品按类别汇总。
+    """
+    return [
+        ComputeStage('analyst', lambda: analyze_inventory(snapshot)),
+        AgentStage('replenishment', STRATEGY_SYSTEM_MESSAGE,
+                   build_replenishment_prompt,
+                   inputs={'low_stock_products': ('analyst', 'low_stock_products')}),
+        AgentStage('promotion', STRATEGY_SYSTEM_MESSAGE,
+                   build_promotion_prompt,
+                   inputs={'high_stock_products': ('analyst', 'high_stock_products')}),
+        AgentStage('report', REPORT_SYSTEM_MESSAGE,
+                   lambda analysis, replenishment, promotion: build_report_prompt(
+                       analysis, {**replenishment, **promotion}),
+                   inputs={'analysis': ('analyst', None),
+                           'replenishment': ('replenishment', None),
+                           'promotion': ('promotion', None)},
+                   output='text')
+    ]
 
-        策略建议：
-        {response2.content}
 
-        请生成一份完整的Markdown格式库存管理报告，包含：
-        1. 执行摘要
-        2. 详细库存分析
-        3. 具体补货和促销策略
-        4. 实施计划和时间表
-        5. 预期效果和ROI分析
-        """
-        
-        messages3 = [
-            SystemMessage(content="你是一个专业的报告撰写专家，擅长将复杂信息整理成清晰的报告。"),
-            HumanMessage(content=report_prompt)
-        ]
-        
-        response3 = llm.invoke(messages3)
-        print("✅ Agent 3 报告生成完成")
+def manual_crewai_simulation(llm=llm, output_path='manual_inventory_report.md'):
+    """手动模拟 crewai 的工作流程（互不依赖的 Agent 同时工作）"""
+    
+    try:
+        snapshot = get_snapshot()
+        print("🤖 数据分析师（本地计算） -> (补货策略 ∥ 促销策略) -> 报告生成器")
+        results, trace = run_pipeline(llm, build_stages(snapshot))
+        analysis = results['analyst']
+        print(f"✅ 分析完成：低库存商品 {len(analysis['low_stock_products'])} 个，"
+              f"高库存商品 {len(analysis['high_stock_products'])} 个")
+        print(f"✅ 策略制定完成：补货建议 {len(results['replenishment']['replenishment_strategies'])} 条，"
+              f"促销策略 {len(results['promotion']['promotion_strategies'])} 条")
         
         # 保存最终报告
-        with open('manual_inventory_report.md', 'w', encoding='utf-8') as f:
-            f.write(response3.content)
+        report = results['report']
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(report)
+        
+        # 各阶段耗时与 token 数；总耗时小于各阶段耗时之和的部分来自并行执行
+        totals = stage_totals(trace)
+        print("\n⏱️  各阶段耗时与 token 数:")
+        for line in format_breakdown(trace.breakdown()):
+            print(f"  {line}")
+        print(f"  总耗时 {trace.root.duration:.2f}s（各阶段串行需 {totals['stage_seconds']:.2f}s），"
+              f"输入 {totals['input_tokens']} tokens，输出 {totals['output_tokens']} tokens")
         
         print("\n🎉 手动工作流执行成功！")
-        print("📄 报告已保存到: manual_inventory_report.md")
+        print(f"📄 报告已保存到: {output_path}")
         print("\n" + "="*50)
         print("最终报告预览:")
         print("="*50)
-        print(response3.content[:500] + "..." if len(response3.content) > 500 else response3.content)
+        print(report[:500] + "..." if len(report) > 500 else report)
         
         return True
         
@@ -143,6 +83,7 @@ def manual_crewai_simulation():
         return False
 
 if __name__ == "__main__":
+    configure_logging()
     print("🚀 开始手动模拟 CrewAI 工作流...")
     print("="*50)
-    manual_crewai_simulation() 
\ No newline at end of file
+    manual_crewai_simulation()
\ No newline at end of file
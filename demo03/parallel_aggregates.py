@@ -0,0 +1,145 @@
+# 销售汇总的并行计算
+# 销售记录按行号切成与进程数相同的若干连续区间（不排序、不重排数据）。当前进程计算第一个区间，
+# 其余区间的商品编号（分类编码）、日期和销量三列复制到共享内存中一次，各子进程直接读取自己的区间，
+# 计算按商品编码的累加量、每日总销量与销量取值计数，只把这些部分结果传回；
+# 主进程按编码逐项合并（计数与销量相加、最高日销量取最大），结果与单进程计算完全一致。
+
+import multiprocessing
+import os
+import threading
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from config import PARALLEL_AGGREGATION_CONFIG
+from sales_aggregates import SalesSummary, summarize_sales
+
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def resolve_workers(workers=None):
+    """并行计算使用的进程数；配置为 None 时使用全部 CPU 核心"""
+    if workers is None:
+        workers = PARALLEL_AGGREGATION_CONFIG['workers']
+    if workers is None:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+def use_parallel(num_rows, workers=None):
+    """记录数少于 min_rows 或只有一个进程时不启用并行，避免进程间传输数据的开销超过计算本身"""
+    return resolve_workers(workers) > 1 and num_rows >= PARALLEL_AGGREGATION_CONFIG['min_rows']
+
+
+def get_aggregation_pool(workers):
+    """获取进程内共享的汇总计算进程池（进程数变化时重建）"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown()
+            # 使用 spawn 启动子进程，避免在有后台线程的进程中 fork
+            _pool = ProcessPoolExecutor(max_workers=workers,
+                                        mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = workers
+        return _pool
+
+
+def partition_ranges(num_rows, partitions):
+    """把 num_rows 行按行号分为 partitions 个连续区间 [(start, end), ...]（不含空区间）"""
+    bounds = np.linspace(0, num_rows, partitions + 1).astype('int64')
+    return [(int(start), int(end)) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+
+def _attach(spec):
+    """在子进程中按 (共享内存名, dtype, 长度) 打开共享内存中的数组"""
+    name, dtype, length = spec
+    # 共享内存由主进程创建和释放（spawn 子进程与主进程共用同一个资源跟踪器），子进程只读取
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(length, dtype=dtype, buffer=block.buf)
+
+
+def summarize_arrays(codes, dates, quantities):
+    """
+    计算一段销售记录的部分汇总
+
+    Returns:
+        (codes, counts, sums, maxes, daily_sales, quantity_counts): 出现的商品编码及其累加量，
+        每日总销量与销量取值计数
+    """
+    frame = pd.DataFrame({'code': codes, 'date': dates, 'quantity_sold': quantities})
+    aggregates = frame.groupby('code')['quantity_sold'].agg(['count', 'sum', 'max'])
+    return (aggregates.index.to_numpy(),
+            *(aggregates[column].to_numpy(dtype='int64') for column in ['count', 'sum', 'max']),
+            frame.groupby('date')['quantity_sold'].sum(),
+            frame['quantity_sold'].value_counts())
+
+
+def summarize_range(specs, start, end):
+    """子进程中计算共享内存里 [start, end) 行的部分汇总"""
+    blocks, arrays = zip(*(_attach(spec) for spec in specs))
+    try:
+        return summarize_arrays(*(array[start:end] for array in arrays))
+    finally:
+        del arrays
+        for block in blocks:
+            block.close()
+
+
+def merge_partial_summaries(parts, product_id_dtype):
+    """按商品编码合并各区间的部分汇总，结果与 summarize_sales 对整个表的计算一致"""
+    num_categories = len(product_id_dtype.categories)
+    counts = np.zeros(num_categories, dtype='int64')
+    sums = np.zeros(num_categories, dtype='int64')
+    maxes = np.full(num_categories, np.iinfo('int64').min, dtype='int64')
+    for codes, part_counts, part_sums, part_maxes, _, _ in parts:
+        # 同一区间内的编码互不重复，可以直接按编码累加
+        counts[codes] += part_counts
+        sums[codes] += part_sums
+        maxes[codes] = np.maximum(maxes[codes], part_maxes)
+
+    present = np.flatnonzero(counts)
+    index = pd.CategoricalIndex(pd.Categorical.from_codes(present, dtype=product_id_dtype), name='product_id')
+    aggregates = pd.DataFrame({'count': counts[present], 'sum': sums[present], 'max': maxes[present]}, index=index)
+    daily_sales = pd.concat([part[4] for part in parts]).groupby(level=0).sum().sort_index().astype('int64')
+    quantity_counts = pd.concat([part[5] for part in parts]).groupby(level=0).sum().astype('int64')
+    return SalesSummary(aggregates, daily_sales, quantity_counts)
+
+
+def summarize_sales_parallel(sales_df, workers=None):
+    """
+    多进程计算销售汇总，结果与 summarize_sales(sales_df) 一致（不满足并行条件时在当前进程计算）
+
+    workers 个进程中包括当前进程：当前进程计算第一个区间，其余区间复制到共享内存交给进程池
+    """
+    workers = resolve_workers(workers)
+    product_ids = sales_df['product_id']
+    if (not use_parallel(len(sales_df), workers) or sales_df.empty
+            or not isinstance(product_ids.dtype, pd.CategoricalDtype)):
+        return summarize_sales(sales_df)
+
+    columns = [product_ids.cat.codes.to_numpy(), sales_df['date'].to_numpy(), sales_df['quantity_sold'].to_numpy()]
+    (local_start, local_end), *ranges = partition_ranges(len(sales_df), workers)
+    offset = local_end
+    blocks = []
+    try:
+        specs = []
+        for column in columns:
+            shared = column[offset:]
+            block = shared_memory.SharedMemory(create=True, size=max(1, shared.nbytes))
+            blocks.append(block)
+            np.ndarray(len(shared), dtype=shared.dtype, buffer=block.buf)[:] = shared
+            specs.append((block.name, shared.dtype.str, len(shared)))
+
+        pool = get_aggregation_pool(workers - 1)
+        futures = [pool.submit(summarize_range, specs, start - offset, end - offset) for start, end in ranges]
+        parts = [summarize_arrays(*(column[local_start:local_end] for column in columns))]
+        parts.extend(future.result() for future in futures)
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    return merge_partial_summaries(parts, product_ids.dtype)
@@ -0,0 +1,205 @@
+# 按 token 预算构建提示词
+# prompts.py 中的格式化函数会把完整的数据摘要和上游 JSON 结果放进提示词，商品很多时提示词会超出模型上下文。
+# 这里的构建函数先按完整内容生成提示词，超出 PROMPT_BUDGET_CONFIG['max_prompt_tokens'] 时：
+#   - 各商品列表按风险指数从高到低排序，只保留能放进预算的前若干个商品的明细（多个列表轮流分配名额）；
+#   - 其余商品按类别汇总为 "<列表名>_others_by_category"（商品数、最高/平均风险指数）；
+#   - 通过 logging（inventory.prompts）记录被汇总的商品数，DEBUG 级别记录具体商品编号。
+# 提示词长度因此有上限，每次 LLM 调用的延迟和费用不随商品数增长。token 数由 tracing.count_tokens 估算，
+# 与模型实际的分词结果有出入，因此只用满上限扣除 PROMPT_BUDGET_CONFIG['safety_margin'] 后的部分。
+
+import json
+import logging
+from config import PROMPT_BUDGET_CONFIG
+from tracing import count_tokens
+from prompts import (
+    format_replenishment_prompt,
+    format_promotion_prompt,
+    format_report_prompt
+)
+
+logger = logging.getLogger('inventory.prompts')
+
+OTHER_CATEGORY = '其他'
+
+
+def to_json(value):
+    """不缩进的 JSON（缩进空白同样占用 token）"""
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+class ItemSection:
+    """提示词中可截断的商品列表：按风险指数从高到低保留明细，其余按类别汇总"""
+
+    def __init__(self, key, items, risk_name, risk=None, category_of=None):
+        """
+        Args:
+            key: 列表名（如 low_stock_products）
+            items: 商品字典列表
+            risk_name: 风险指数的名称（如 out_of_stock_risk），汇总字段以此命名
+            risk: 取商品风险指数的函数，默认取 item[risk_name]
+            category_of: {商品编号: 类别}，商品字典中没有 category 时使用
+        """
+        self.key = key
+        self.risk_name = risk_name
+        self.risk = risk or (lambda item: item.get(risk_name) or 0.0)
+        self.category_of = category_of or {}
+        self.original = list(items)
+        self.items = sorted(self.original, key=self.risk, reverse=True)
+
+    def category(self, item):
+        return item.get('category') or self.category_of.get(item.get('product_id'), OTHER_CATEGORY)
+
+    def aggregate(self, items):
+        """按类别汇总商品：商品数、最高与平均风险指数"""
+        groups = {}
+        for item in items:
+            groups.setdefault(self.category(item), []).append(self.risk(item))
+        return [{
+            'category': category,
+            'count': len(risks),
+            f'max_{self.risk_name}': round(max(risks), 1),
+            f'avg_{self.risk_name}': round(sum(risks) / len(risks), 1)
+        } for category, risks in sorted(groups.items(), key=lambda group: -len(group[1]))]
+
+    def compact(self, keep):
+        """保留风险最高的 keep 个商品的明细，返回 {列表名: 明细, 列表名_others_by_category: 汇总}；全部保留时不改变顺序"""
+        if keep >= len(self.items):
+            return {self.key: self.original}
+        return {self.key: self.items[:keep], f'{self.key}_others_by_category': self.aggregate(self.items[keep:])}
+
+
+def allocate(lengths, total):
+    """把 total 个名额轮流分配给各列表（排在前面的列表先分到），列表用完后名额留给其余列表"""
+    counts = [0] * len(lengths)
+    active = [i for i, length in enumerate(lengths) if length > 0]
+    while total > 0 and active:
+        share, extra = divmod(total, len(active))
+        for rank, i in enumerate(active):
+            take = min(lengths[i] - counts[i], share + (1 if rank < extra else 0))
+            counts[i] += take
+            total -= take
+        active = [i for i in active if counts[i] < lengths[i]]
+    return counts
+
+
+def fit_sections(name, sections, render, budget=None):
+    """
+    生成不超过 token 预算的提示词
+
+    Args:
+        name: 提示词名称（用于日志）
+        sections: ItemSection 列表
+        render: 接收 {列表名: 明细, 列表名_others_by_category: 汇总, ...}、返回提示词的函数
+        budget: token 上限，默认取 PROMPT_BUDGET_CONFIG；提示词的估算 token 数不超过扣除安全余量后的部分
+
+    Returns:
+        (prompt, dropped): 提示词，以及 {列表名: 按类别汇总的商品编号列表}
+    """
+    lengths = [len(section.items) for section in sections]
+
+    def build(total):
+        compacted = {}
+        for section, keep in zip(sections, allocate(lengths, total)):
+            compacted.update(section.compact(keep))
+        return render(compacted)
+
+    full_prompt = build(sum(lengths))
+    budget = budget or PROMPT_BUDGET_CONFIG['max_prompt_tokens']
+    if not PROMPT_BUDGET_CONFIG['enabled']:
+        return full_prompt, {}
+    limit = int(budget * (1 - PROMPT_BUDGET_CONFIG['safety_margin']))
+    full_tokens = count_tokens(full_prompt)
+    if full_tokens <= limit:
+        return full_prompt, {}
+
+    # 先成倍增加保留的商品数找到上界，再二分查找能放进预算的最大商品数（每次只渲染不超过约 2 倍预算的提示词）
+    fits = {}
+
+    def fit(total):
+        if total not in fits:
+            prompt = build(total)
+            fits[total] = (count_tokens(prompt) <= limit, prompt)
+        return fits[total][0]
+
+    low, high = 0, 1
+    while high < sum(lengths) and fit(high):
+        low, high = high, high * 2
+    high = min(high, sum(lengths))
+    while high - low > 1:
+        middle = (low + high) // 2
+        if fit(middle):
+            low = middle
+        else:
+            high = middle
+    if not fit(low):
+        logger.warning("%s提示词只保留按类别汇总的内容仍超出 token 预算 %d（扣除安全余量后 %d）", name, budget, limit)
+    prompt = fits[low][1]
+
+    dropped = {}
+    kept_counts = allocate(lengths, low)
+    for section, keep in zip(sections, kept_counts):
+        if keep < len(section.items):
+            dropped[section.key] = [item.get('product_id') for item in section.items[keep:]]
+    logger.info("%s提示词 %d tokens 超出预算 %d（扣除安全余量后 %d），按风险保留 %s；其余商品按类别汇总",
+                name, full_tokens, budget, limit,
+                '、'.join(f"{section.key} {keep}/{len(section.items)}" for section, keep in zip(sections, kept_counts)))
+    for key, product_ids in dropped.items():
+        logger.debug("%s提示词中按类别汇总的 %s: %s", name, key, ', '.join(map(str, product_ids)))
+    return prompt, dropped
+
+
+def _product_lookup(analysis, key):
+    """分析结果中商品编号到商品字典的映射"""
+    return {item['product_id']: item for item in analysis.get(key, [])}
+
+
+def build_replenishment_prompt(low_stock_products, budget=None):
+    """补货策略提示词（按缺货风险保留低库存商品）"""
+    sections = [ItemSection('low_stock_products', low_stock_products, 'out_of_stock_risk')]
+
+    def render(compacted):
+        if len(compacted) == 1:
+            return format_replenishment_prompt(to_json(compacted['low_stock_products']))
+        return format_replenishment_prompt(to_json(compacted))
+    return fit_sections('补货策略', sections, render, budget)[0]
+
+
+def build_promotion_prompt(high_stock_products, budget=None):
+    """促销策略提示词（按积压风险保留高库存商品）"""
+    sections = [ItemSection('high_stock_products', high_stock_products, 'overstock_risk')]
+
+    def render(compacted):
+        if len(compacted) == 1:
+            return format_promotion_prompt(to_json(compacted['high_stock_products']))
+        return format_promotion_prompt(to_json(compacted))
+    return fit_sections('促销策略', sections, render, budget)[0]
+
+
+def _analysis_sections(analysis):
+    return [
+        ItemSection('low_stock_products', analysis.get('low_stock_products', []), 'out_of_stock_risk'),
+        ItemSection('high_stock_products', analysis.get('high_stock_products', []), 'overstock_risk')
+    ]
+
+
+def build_report_prompt(analysis, strategy, budget=None):
+    """报告生成器提示词（商品列表与策略按对应商品的风险截断）"""
+    low = _product_lookup(analysis, 'low_stock_products')
+    high = _product_lookup(analysis, 'high_stock_products')
+    categories = {product_id: item.get('category') for product_id, item in {**low, **high}.items()}
+    sections = _analysis_sections(analysis) + [
+        ItemSection('replenishment_strategies', strategy.get('replenishment_strategies', []), 'out_of_stock_risk',
+                    risk=lambda item: low.get(item.get('product_id'), {}).get('out_of_stock_risk') or 0.0,
+                    category_of=categories),
+        ItemSection('promotion_strategies', strategy.get('promotion_strategies', []), 'overstock_risk',
+                    risk=lambda item: high.get(item.get('product_id'), {}).get('overstock_risk') or 0.0,
+                    category_of=categories)
+    ]
+    analysis_keys = {'low_stock_products', 'high_stock_products'}
+
+    def render(compacted):
+        analysis_part = {key: value for key, value in compacted.items() if key.split('_others')[0] in analysis_keys}
+        strategy_part = {key: value for key, value in compacted.items() if key not in analysis_part}
+        return format_report_prompt(to_json({**analysis, **analysis_part}), to_json({**strategy, **strategy_part}))
+    return fit_sections('报告生成器', sections, render, budget)[0]
+
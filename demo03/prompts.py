@@ -1,7 +1,7 @@
 # 库存管理系统提示词配置
 # 所有AI Agent的提示词模板
 
-# 数据分析师提示词
+# 数据分析师提示词（多 Agent 流水线中由 inventory_analysis.analyze_inventory 直接计算同样结构的结果）
 ANALYST_PROMPT_TEMPLATE = """
 你是一位经验丰富的数据分析师。请根据提供的销售记录、商品种类和库存数据，
 进行严格的库存分析，准确识别出以下两类商品：
@@ -125,6 +125,58 @@ STRATEGY_PROMPT_TEMPLATE = """
 # 策略顾问系统消息
 STRATEGY_SYSTEM_MESSAGE = "你是一个专业的库存策略顾问，专注于制定库存管理策略，能根据数据分析结果提供针对性的建议。"
 
+# 补货策略提示词（多 Agent 流水线中只接收低库存商品）
+REPLENISHMENT_PROMPT_TEMPLATE = """
+你是一位资深的库存策略顾问。请针对以下每个低库存（缺货风险）商品制定具体的补货建议。
+
+低库存商品（JSON格式）如下：
+{low_stock_products}
+
+【工作要求】：
+- 对每个商品，结合其缺货风险指数、销售趋势等，给出补货建议，包括建议补货数量、补货优先级、补货时间和补货原因。
+- 若缺货风险极高（如高于70%），请优先紧急补货。
+- 若销售趋势下降或波动大，可适当降低补货量并给出原因。
+
+【输出格式】请严格按照如下JSON结构返回：
+{{
+    "replenishment_strategies": [
+        {{
+            "product_id": "P001",
+            "replenishment_amount": 200,
+            "priority": "高",
+            "timeline": "紧急补货（48小时内）",
+            "reason": "缺货风险高于70%，且销售趋势上升"
+        }}
+    ]
+}}
+"""
+
+# 促销策略提示词（多 Agent 流水线中只接收高库存商品）
+PROMOTION_PROMPT_TEMPLATE = """
+你是一位资深的库存策略顾问。请针对以下每个高库存（积压风险）商品制定具体的促销或去库存策略。
+
+高库存商品（JSON格式）如下：
+{high_stock_products}
+
+【工作要求】：
+- 对每个商品，结合其积压风险指数、销售趋势等，给出促销或去库存建议，包括促销方式、折扣率/促销力度、促销时间和促销原因。
+- 若积压风险极高（如超过200%），请优先制定强力促销或清仓策略。
+- 若销售趋势上升，可适当缓解促销力度并说明理由。
+
+【输出格式】请严格按照如下JSON结构返回：
+{{
+    "promotion_strategies": [
+        {{
+            "product_id": "P045",
+            "promotion_method": "限时折扣",
+            "discount_rate": 20,
+            "duration": "2周",
+            "reason": "库存积压风险高，销售趋势下降"
+        }}
+    ]
+}}
+"""
+
 # 报告生成器提示词
 REPORT_PROMPT_TEMPLATE = """
 你是一位专业的报告撰写专家。根据以下分析结果和策略建议，撰写一份全面、详细且结构清晰的库存管理报告。
@@ -184,6 +236,14 @@ def format_strategy_prompt(analysis_result: str) -> str:
     """格式化策略顾问提示词"""
     return STRATEGY_PROMPT_TEMPLATE.format(analysis_result=analysis_result)
 
+def format_replenishment_prompt(low_stock_products: str) -> str:
+    """格式化补货策略提示词"""
+    return REPLENISHMENT_PROMPT_TEMPLATE.format(low_stock_products=low_stock_products)
+
+def format_promotion_prompt(high_stock_products: str) -> str:
+    """格式化促销策略提示词"""
+    return PROMOTION_PROMPT_TEMPLATE.format(high_stock_products=high_stock_products)
+
 def format_report_prompt(analysis_result: str, strategy_result: str) -> str:
     """格式化报告生成器提示词"""
     return REPORT_PROMPT_TEMPLATE.format(
@@ -1,416 +1,572 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
-import json
+from llm_client import get_llm, run_async
+from chart_cache import ChartCache
+from response_cache import ResponseCache, prompt_version
+from query_engine import answer_locally, INTENT_LABELS
+from chart_renderer import draw_chart, get_render_pool
+from data_store import add_snapshot_listener, remove_snapshot_listener
+from tracing import start_trace, finish_trace, format_breakdown, token_attributes, configure_logging
+from config import CHART_CONFIG, RESPONSE_CACHE_CONFIG, QUERY_ENGINE_CONFIG, TRACING_CONFIG
+import asyncio
 import os
-from datetime import datetime, timedelta
+import time
+import uuid
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 import warnings
 warnings.filterwarnings('ignore')
 
-# 设置中文字体
-plt.rcParams['font.sans-serif'] = ['SimHei', 'DejaVu Sans']
-plt.rcParams['axes.unicode_minus'] = False
+def answer_source(timings):
+    """未调用LLM时的回答来源说明"""
+    if 'local_intent' in timings:
+        return f"（本地计算：{timings['local_intent']}）"
+    if timings.get('cache_hit'):
+        return "（回答缓存命中）"
+    return ""
 
 class InventoryQASystem:
-    def __init__(self):
-        """初始化问答系统"""
-        from config import MODEL_CONFIG
+    def __init__(self, show_breakdown=False):
+        """
+        初始化问答系统
+        
+        Args:
+            show_breakdown: 命令行问答时是否在每个回答后输出各阶段耗时明细
+        """
         from prompts import QA_SYSTEM_MESSAGE, QA_PROMPT_TEMPLATE
         
-        self.llm = ChatOpenAI(
-            model_name=MODEL_CONFIG["model_name"],
-            openai_api_base=MODEL_CONFIG["openai_api_base"],
-            openai_api_key=MODEL_CONFIG["openai_api_key"],
-            temperature=MODEL_CONFIG["temperature"]
-        )
+        # 共享的LLM客户端
+        self.llm = get_llm()
+        self.show_breakdown = show_breakdown
+        
+        # 图表输出与渲染缓存（数据快照被替换时清理旧图表）
+        self.chart_dir = CHART_CONFIG["output_dir"]
+        self.chart_dpi = CHART_CONFIG["dpi"]
+        self.chart_workers = CHART_CONFIG["render_workers"]
+        self.chart_cache = None
+        self._snapshot_listeners = []
+        if CHART_CONFIG["cache_enabled"]:
+            self.chart_cache = ChartCache(self.chart_dir)
+            self._add_snapshot_listener(self.chart_cache.evict_snapshot)
         
         self.system_message = QA_SYSTEM_MESSAGE
         self.prompt_template = QA_PROMPT_TEMPLATE
         
+        # LLM回答缓存（数据快照被替换时清理旧回答）
+        self.response_cache = None
+        if RESPONSE_CACHE_CONFIG["enabled"]:
+            self.response_cache = ResponseCache(
+                max_entries=RESPONSE_CACHE_CONFIG["max_entries"],
+                ttl_seconds=RESPONSE_CACHE_CONFIG["ttl_seconds"],
+                persist_path=RESPONSE_CACHE_CONFIG["persist_path"]
+            )
+            self._add_snapshot_listener(self.response_cache.evict_snapshot)
+        
         # 加载数据
         self.load_data()
         
     def load_data(self):
-        """加载所有数据文件"""
-        from config import DATA_FILES
+        """加载所有数据文件（与其他入口共享同一份数据快照），并启动后台热加载"""
+        from config import RELOAD_CONFIG
+        from data_store import get_snapshot, start_watcher
         
         try:
-            self.inventory_df = pd.read_csv(DATA_FILES['inventory'])
-            self.products_df = pd.read_csv(DATA_FILES['products'])
-            self.sales_df = pd.read_csv(DATA_FILES['sales_records'])
-            
-            # 合并数据
-            self.merged_df = self.inventory_df.merge(
-                self.products_df, on='product_id', how='left'
-            )
-            
-            # 计算销售统计
-            self.sales_stats = self.sales_df.groupby('product_id').agg({
-                'quantity_sold': ['mean', 'max', 'sum', 'count']
-            }).round(2)
-            self.sales_stats.columns = ['avg_daily_sales', 'max_daily_sales', 'total_sales', 'sales_days']
-            
+            # 同时计算物化视图，第一个问题不需要等待
+            get_snapshot().views
             print("✅ 数据加载成功")
             
         except Exception as e:
             print(f"❌ 数据加载失败: {e}")
             raise
+        
+        if RELOAD_CONFIG["enabled"]:
+            start_watcher()
     
-    def analyze_data(self, question):
-        """分析数据并生成回复"""
-        # 准备数据摘要
-        data_summary = self._prepare_data_summary()
+    def _add_snapshot_listener(self, callback):
+        """注册快照替换回调，close 时取消注册"""
+        add_snapshot_listener(callback)
+        self._snapshot_listeners.append(callback)
+    
+    def close(self):
+        """取消注册快照替换回调；不再使用的问答系统（及其缓存）因此可以被回收"""
+        while self._snapshot_listeners:
+            remove_snapshot_listener(self._snapshot_listeners.pop())
+    
+    @property
+    def snapshot(self):
+        """当前的数据快照（数据文件变化后由后台线程替换）"""
+        from data_store import get_snapshot
+        return get_snapshot()
+    
+    @property
+    def inventory_df(self):
+        return self.snapshot.inventory_df
+    
+    @property
+    def products_df(self):
+        return self.snapshot.products_df
+    
+    @property
+    def sales_df(self):
+        return self.snapshot.sales_df
+    
+    @property
+    def merged_df(self):
+        return self.snapshot.merged_df
+    
+    @property
+    def sales_stats(self):
+        return self.snapshot.sales_stats
+    
+    def analyze_data(self, question, timings=None, llm=None):
+        """
+        分析数据并生成回复
         
-        # 生成图表
-        charts_info = self._generate_charts(question)
+        图表元数据（类型、路径、描述）在渲染前即可确定，因此图表渲染与LLM调用同时进行。
+        传入 timings 字典时，写入各阶段耗时（秒）：summary、prompt、charts、llm、total；
+        命中回答缓存时 cache_hit 为 True；由本地查询引擎回答时 local_intent 为问题类型，local 为计算耗时；
+        breakdown 为链路中各阶段的耗时明细（含 token 数、图表大小等属性），trace_id 为链路编号。
+        llm 为本次调用使用的LLM客户端（如批量问答的限速包装），默认使用问答系统的共享客户端。
+        """
+        timings = {} if timings is None else timings
+        llm = llm or self.llm
+        trace = start_trace('qa.question', question=question)
         
-        # 构建提示词
-        prompt = self.prompt_template.format(
-            question=question,
-            data_summary=data_summary,
-            charts_info=charts_info
+        try:
+            # 整个问题使用同一份快照，期间数据更新不影响本次回答
+            snapshot = self.snapshot
+            cached = self._answer_without_llm(question, snapshot, timings, trace)
+            if cached is not None:
+                return cached
+            
+            messages, charts_info, chart_plan = self._prepare_request(question, snapshot, timings, trace)
+            
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                # 在后台渲染图表
+                charts_future = executor.submit(self._timed_render, snapshot, chart_plan, timings, trace)
+                
+                # 调用LLM
+                with trace.span('llm', timings=timings) as span:
+                    response = llm.invoke(messages)
+                    span.attributes.update(token_attributes(messages, response.content,
+                                                            getattr(response, 'usage_metadata', None)))
+                
+                # 等待图表渲染完成（渲染失败时在这里抛出异常）
+                charts_future.result()
+            
+            self._store_answer(question, snapshot, response.content)
+            return response.content, charts_info
+        finally:
+            self._finish_trace(trace, timings)
+    
+    async def aanalyze_data(self, question, timings=None):
+        """
+        analyze_data 的异步流式版本
+        
+        Returns:
+            (token_stream, charts_info): token_stream 是逐个产出回答片段的异步生成器，
+            遍历结束时图表也已渲染完成；timings 额外记录首字延迟 first_token。
+        """
+        timings = {} if timings is None else timings
+        start = time.perf_counter()
+        trace = start_trace('qa.question', question=question, stream=True)
+        
+        try:
+            snapshot = self.snapshot
+            cached = self._answer_without_llm(question, snapshot, timings, trace)
+            if cached is not None:
+                text, charts_info = cached
+                
+                async def cached_stream():
+                    timings['first_token'] = time.perf_counter() - start
+                    self._finish_trace(trace, timings)
+                    yield text
+                
+                return cached_stream(), charts_info
+            
+            messages, charts_info, chart_plan = self._prepare_request(question, snapshot, timings, trace)
+        except Exception:
+            self._finish_trace(trace, timings)
+            raise
+        
+        # 在后台线程渲染图表；回答流没有被遍历时也取回渲染结果，避免 "Task exception was never retrieved"
+        charts_task = asyncio.create_task(
+            asyncio.to_thread(self._timed_render, snapshot, chart_plan, timings, trace)
         )
+        charts_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        
+        async def token_stream():
+            completed = False
+            try:
+                parts = []
+                usage = None
+                with trace.span('llm', timings=timings) as span:
+                    async for chunk in self.llm.astream(messages):
+                        if 'first_token' not in timings:
+                            timings['first_token'] = time.perf_counter() - start
+                            span.set_attribute('first_token_ms', round(timings['first_token'] * 1000, 1))
+                        usage = getattr(chunk, 'usage_metadata', None) or usage
+                        if chunk.content:
+                            parts.append(chunk.content)
+                            yield chunk.content
+                    span.attributes.update(token_attributes(messages, ''.join(parts), usage))
+                
+                await charts_task
+                completed = True
+                self._store_answer(question, snapshot, ''.join(parts))
+            finally:
+                if not completed:
+                    # LLM调用出错或调用方提前停止遍历：等待后台渲染结束再结束链路，抛出的仍是原来的异常
+                    await asyncio.gather(charts_task, return_exceptions=True)
+                self._finish_trace(trace, timings)
+        
+        return token_stream(), charts_info
+    
+    def _answer_without_llm(self, question, snapshot, timings, trace):
+        """
+        常见问题由本地查询引擎直接计算，重复问题查询回答缓存；能回答时只确保图表已渲染，不调用LLM
         
-        # 调用LLM
-        messages = [
-            SystemMessage(content=self.system_message),
-            HumanMessage(content=prompt)
-        ]
-        
-        response = self.llm.invoke(messages)
-        return response.content, charts_info
-    
-    def _prepare_data_summary(self):
-        """准备数据摘要"""
-        summary = f"""
-        数据概览：
-        - 总商品数：{len(self.products_df)}
-        - 商品类别：{', '.join(self.products_df['category'].unique())}
-        - 销售记录数：{len(self.sales_df)}
-        - 销售日期范围：{self.sales_df['date'].min()} 到 {self.sales_df['date'].max()}
-        
-        库存状况：
-        - 低库存商品（当前库存 < 安全库存）：{len(self.merged_df[self.merged_df['current_stock'] < self.merged_df['safety_stock']])}个
-        - 缺货商品（当前库存 = 0）：{len(self.merged_df[self.merged_df['current_stock'] == 0])}个
-        - 平均库存水平：{self.merged_df['current_stock'].mean():.0f}
-        
-        销售统计：
-        - 平均日销量：{self.sales_df['quantity_sold'].mean():.1f}
-        - 最高日销量：{self.sales_df['quantity_sold'].max()}
-        - 总销量：{self.sales_df['quantity_sold'].sum()}
+        Returns:
+            能回答时返回 (回答, charts_info)，否则返回 None
         """
-        return summary
+        text = None
+        if QUERY_ENGINE_CONFIG["enabled"]:
+            with trace.span('local_query', timings=timings, key='local') as span:
+                local = answer_locally(question, snapshot)
+                if local is not None:
+                    intent, text = local
+                    timings['local_intent'] = INTENT_LABELS[intent]
+                    span.set_attribute('intent', intent)
+        
+        if text is None and self.response_cache is not None:
+            with trace.span('response_cache') as span:
+                version = prompt_version(self.system_message, self.prompt_template)
+                text = self.response_cache.get(question, snapshot, version)
+                span.set_attribute('hit', text is not None)
+            if text is not None:
+                timings['cache_hit'] = True
+        
+        if text is None:
+            return None
+        
+        charts_info, chart_plan = self._plan_charts(question, snapshot)
+        self._timed_render(snapshot, chart_plan, timings, trace)
+        timings.update(summary=0.0, prompt=0.0, llm=0.0)
+        return text, charts_info
     
-    def _generate_charts(self, question):
-        """根据问题生成相关图表"""
-        charts_info = []
+    def _store_answer(self, question, snapshot, text):
+        """保存LLM回答"""
+        if self.response_cache is not None:
+            version = prompt_version(self.system_message, self.prompt_template)
+            self.response_cache.put(question, snapshot, version, text)
+    
+    def _prepare_request(self, question, snapshot, timings, trace):
+        """准备数据摘要、图表计划和LLM消息"""
+        # 准备数据摘要
+        with trace.span('summary', timings=timings):
+            data_summary = self._prepare_data_summary(snapshot)
         
-        # 创建图表目录
-        os.makedirs('charts', exist_ok=True)
+        # 确定图表（不渲染）
+        charts_info, chart_plan = self._plan_charts(question, snapshot)
+        
+        # 构建提示词
+        with trace.span('prompt', timings=timings) as span:
+            prompt = self.prompt_template.format(
+                question=question,
+                data_summary=data_summary,
+                charts_info=charts_info
+            )
+            
+            messages = [
+                SystemMessage(content=self.system_message),
+                HumanMessage(content=prompt)
+            ]
+            span.set_attribute('prompt_chars', len(self.system_message) + len(prompt))
         
-        # 根据问题关键词生成不同类型的图表
+        return messages, charts_info, chart_plan
+    
+    def _timed_render(self, snapshot, chart_plan, timings, trace):
+        """渲染图表并记录耗时（每个图表记录为 charts 下的子阶段）"""
+        with trace.span('charts', timings=timings, count=len(chart_plan)) as span:
+            self._render_planned_charts(snapshot, chart_plan, trace, span)
+    
+    def _finish_trace(self, trace, timings):
+        """结束链路，把总耗时与各阶段明细写入 timings"""
+        finish_trace(trace)
+        timings['total'] = trace.root.duration
+        timings['trace_id'] = trace.trace_id
+        timings['breakdown'] = trace.breakdown()
+    
+    def _prepare_data_summary(self, snapshot):
+        """准备数据摘要（快照的物化视图中预先生成）"""
+        return snapshot.views.summary_text
+    
+    def _select_charts(self, question):
+        """根据问题关键词选择需要生成的图表，返回 [(图表类型, 图表名, 创建方法, 描述)]"""
+        selected = []
         question_lower = question.lower()
         
         # 1. 库存分布图
         if any(keyword in question_lower for keyword in ['库存', 'stock', '分布', 'distribution']):
-            chart_path = self._create_inventory_distribution_chart()
-            charts_info.append({
-                'type': '库存分布',
-                'path': chart_path,
-                'description': '显示各商品的当前库存与安全库存对比'
-            })
+            selected.append(('库存分布', 'inventory_distribution', self._create_inventory_distribution_chart, '显示各商品的当前库存与安全库存对比'))
         
         # 2. 销售趋势图
         if any(keyword in question_lower for keyword in ['销售', 'sale', '趋势', 'trend', '销量']):
-            chart_path = self._create_sales_trend_chart()
-            charts_info.append({
-                'type': '销售趋势',
-                'path': chart_path,
-                'description': '显示过去30天的销售趋势'
-            })
+            selected.append(('销售趋势', 'sales_trend', self._create_sales_trend_chart, '显示过去30天的销售趋势'))
         
         # 3. 类别分析图
         if any(keyword in question_lower for keyword in ['类别', 'category', '分类']):
-            chart_path = self._create_category_analysis_chart()
-            charts_info.append({
-                'type': '类别分析',
-                'path': chart_path,
-                'description': '按商品类别分析库存和销售情况'
-            })
+            selected.append(('类别分析', 'category_analysis', self._create_category_analysis_chart, '按商品类别分析库存和销售情况'))
         
         # 4. 低库存商品图
         if any(keyword in question_lower for keyword in ['低库存', '缺货', 'out of stock', '不足']):
-            chart_path = self._create_low_stock_chart()
-            charts_info.append({
-                'type': '低库存商品',
-                'path': chart_path,
-                'description': '显示库存低于安全库存的商品'
-            })
+            selected.append(('低库存商品', 'low_stock_analysis', self._create_low_stock_chart, '显示库存低于安全库存的商品'))
         
         # 5. 利润率分析图
         if any(keyword in question_lower for keyword in ['利润', 'profit', '收益', '收入']):
-            chart_path = self._create_profit_analysis_chart()
-            charts_info.append({
-                'type': '利润率分析',
-                'path': chart_path,
-                'description': '分析各商品的利润率情况'
-            })
+            selected.append(('利润率分析', 'profit_analysis', self._create_profit_analysis_chart, '分析各商品的利润率情况'))
         
         # 如果没有匹配的关键词，生成综合图表
-        if not charts_info:
-            chart_path = self._create_overview_chart()
+        if not selected:
+            selected.append(('综合概览', 'overview', self._create_overview_chart, '显示库存和销售的综合情况'))
+        
+        return selected
+    
+    def _generate_charts(self, question, snapshot):
+        """根据问题生成相关图表"""
+        charts_info, chart_plan = self._plan_charts(question, snapshot)
+        self._render_planned_charts(snapshot, chart_plan)
+        return charts_info
+    
+    def _plan_charts(self, question, snapshot):
+        """
+        选择图表并确定输出路径（不渲染）
+        
+        Returns:
+            (charts_info, chart_plan): 图表元数据列表，以及 [(图表名, 创建方法, 路径)] 渲染计划
+        """
+        charts_info = []
+        chart_plan = []
+        for chart_type, chart_name, create, description in self._select_charts(question):
+            chart_path = self._chart_path(snapshot, chart_name)
             charts_info.append({
-                'type': '综合概览',
+                'type': chart_type,
                 'path': chart_path,
-                'description': '显示库存和销售的综合情况'
+                'description': description
             })
+            chart_plan.append((chart_name, create, chart_path))
+        return charts_info, chart_plan
+    
+    def _render_planned_charts(self, snapshot, chart_plan, trace=None, parent=None):
+        """按渲染计划生成图表；多个图表同时渲染，总耗时接近最慢的一个图表"""
+        # 创建图表目录
+        os.makedirs(self.chart_dir, exist_ok=True)
+        
+        def render(item):
+            chart_name, create, chart_path = item
+            if trace is None:
+                return self._render_chart(snapshot, chart_name, create, chart_path)
+            with trace.span(f'chart.{chart_name}', parent=parent) as span:
+                path = self._render_chart(snapshot, chart_name, create, chart_path)
+                if os.path.exists(path):
+                    span.set_attribute('size_bytes', os.path.getsize(path))
+                return path
+        
+        with ThreadPoolExecutor(max_workers=len(chart_plan)) as executor:
+            return list(executor.map(render, chart_plan))
+    
+    def _chart_params(self):
+        """参与图表缓存键计算的渲染参数"""
+        return {'dpi': self.chart_dpi}
+    
+    def _chart_path(self, snapshot, chart_name):
+        """图表输出路径：启用缓存时由内容决定，否则每次请求使用独立的文件名，避免并发请求互相覆盖"""
+        if self.chart_cache is None:
+            return os.path.join(self.chart_dir, f'{chart_name}_{uuid.uuid4().hex}.png')
+        return self.chart_cache.chart_path(snapshot, chart_name, self._chart_params())
+    
+    def _render_chart(self, snapshot, chart_name, create, chart_path):
+        """渲染图表；相同快照、图表类型和渲染参数的图表直接复用已有文件"""
+        render = partial(create, snapshot)
         
-        return charts_info
+        if self.chart_cache is None:
+            render(chart_path)
+            return chart_path
+        
+        return self.chart_cache.get_or_render(snapshot, chart_name, self._chart_params(), render)
     
-    def _create_inventory_distribution_chart(self):
+    def _draw(self, chart_name, data, chart_path):
+        """绘制图表：配置了渲染进程池时交给子进程，只传递聚合后的绘图数据"""
+        pool = get_render_pool(self.chart_workers)
+        if pool is None:
+            return draw_chart(chart_name, data, chart_path, self.chart_dpi)
+        return pool.submit(draw_chart, chart_name, data, chart_path, self.chart_dpi).result()
+    
+    def _create_inventory_distribution_chart(self, snapshot, chart_path):
         """创建库存分布图"""
-        plt.figure(figsize=(12, 6))
-        
         # 选择前20个商品进行展示
-        sample_df = self.merged_df.head(20)
-        
-        x = range(len(sample_df))
-        width = 0.35
-        
-        plt.bar([i - width/2 for i in x], sample_df['current_stock'], 
-                width, label='当前库存', alpha=0.8, color='skyblue')
-        plt.bar([i + width/2 for i in x], sample_df['safety_stock'], 
-                width, label='安全库存', alpha=0.8, color='lightcoral')
-        
-        plt.xlabel('商品')
-        plt.ylabel('库存数量')
-        plt.title('库存分布对比图')
-        plt.legend()
-        plt.xticks(x, sample_df['product_id'], rotation=45)
-        plt.tight_layout()
-        
-        chart_path = 'charts/inventory_distribution.png'
-        plt.savefig(chart_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        return chart_path
+        sample_df = snapshot.merged_df.head(20)
+        
+        data = {
+            'product_id': sample_df['product_id'].astype(str).tolist(),
+            'current_stock': sample_df['current_stock'].tolist(),
+            'safety_stock': sample_df['safety_stock'].tolist()
+        }
+        return self._draw('inventory_distribution', data, chart_path)
     
-    def _create_sales_trend_chart(self):
+    def _create_sales_trend_chart(self, snapshot, chart_path):
         """创建销售趋势图"""
-        plt.figure(figsize=(12, 6))
-        
-        # 按日期汇总销售数据
-        daily_sales = self.sales_df.groupby('date')['quantity_sold'].sum().reset_index()
-        daily_sales['date'] = pd.to_datetime(daily_sales['date'])
-        daily_sales = daily_sales.sort_values('date')
-        
-        plt.plot(daily_sales['date'], daily_sales['quantity_sold'], 
-                marker='o', linewidth=2, markersize=4)
-        plt.xlabel('日期')
-        plt.ylabel('日销量')
-        plt.title('销售趋势图')
-        plt.xticks(rotation=45)
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-        
-        chart_path = 'charts/sales_trend.png'
-        plt.savefig(chart_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        return chart_path
+        # 每日总销量
+        daily_sales = snapshot.views.daily_sales
+        
+        data = {
+            'date': daily_sales.index.to_numpy(),
+            'quantity_sold': daily_sales.to_numpy()
+        }
+        return self._draw('sales_trend', data, chart_path)
     
-    def _create_category_analysis_chart(self):
+    def _create_category_analysis_chart(self, snapshot, chart_path):
         """创建类别分析图"""
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
-        
-        # 按类别统计库存
-        category_inventory = self.merged_df.groupby('category').agg({
-            'current_stock': 'sum',
-            'safety_stock': 'sum'
-        }).reset_index()
-        
-        # 库存对比
-        x = range(len(category_inventory))
-        width = 0.35
-        ax1.bar([i - width/2 for i in x], category_inventory['current_stock'], 
-                width, label='当前库存', alpha=0.8, color='skyblue')
-        ax1.bar([i + width/2 for i in x], category_inventory['safety_stock'], 
-                width, label='安全库存', alpha=0.8, color='lightcoral')
-        ax1.set_xlabel('商品类别')
-        ax1.set_ylabel('库存数量')
-        ax1.set_title('各类别库存对比')
-        ax1.legend()
-        ax1.set_xticks(x)
-        ax1.set_xticklabels(category_inventory['category'], rotation=45)
-        
-        # 按类别统计销量
-        category_sales = self.sales_df.merge(self.products_df[['product_id', 'category']], 
-                                           on='product_id').groupby('category')['quantity_sold'].sum()
-        
-        ax2.pie(category_sales.values, labels=category_sales.index, autopct='%1.1f%%')
-        ax2.set_title('各类别销量占比')
-        
-        plt.tight_layout()
-        
-        chart_path = 'charts/category_analysis.png'
-        plt.savefig(chart_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        return chart_path
-    
-    def _create_low_stock_chart(self):
+        # 各类别库存合计与各类别销量
+        category_stock = snapshot.views.category_stock
+        category_sales = snapshot.views.category_sales
+        
+        data = {
+            'category': category_stock.index.astype(str).tolist(),
+            'current_stock': category_stock['current_stock'].tolist(),
+            'safety_stock': category_stock['safety_stock'].tolist(),
+            'sales_category': category_sales.index.astype(str).tolist(),
+            'sales': category_sales.tolist()
+        }
+        return self._draw('category_analysis', data, chart_path)
+    
+    def _create_low_stock_chart(self, snapshot, chart_path):
         """创建低库存商品图"""
-        plt.figure(figsize=(12, 6))
-        
-        # 找出低库存商品
-        low_stock_df = self.merged_df[self.merged_df['current_stock'] < self.merged_df['safety_stock']].head(15)
-        
-        # 计算缺货风险
-        low_stock_df['stockout_risk'] = ((low_stock_df['safety_stock'] - low_stock_df['current_stock']) / 
-                                        low_stock_df['safety_stock'] * 100)
-        
-        # 按缺货风险排序
-        low_stock_df = low_stock_df.sort_values('stockout_risk', ascending=False)
-        
-        colors = ['red' if risk > 70 else 'orange' if risk > 40 else 'yellow' 
-                 for risk in low_stock_df['stockout_risk']]
-        
-        bars = plt.bar(range(len(low_stock_df)), low_stock_df['stockout_risk'], 
-                      color=colors, alpha=0.8)
-        
-        plt.xlabel('商品')
-        plt.ylabel('缺货风险 (%)')
-        plt.title('低库存商品缺货风险分析')
-        plt.xticks(range(len(low_stock_df)), low_stock_df['product_id'], rotation=45)
-        
-        # 添加数值标签
-        for i, bar in enumerate(bars):
-            height = bar.get_height()
-            plt.text(bar.get_x() + bar.get_width()/2., height,
-                    f'{height:.1f}%', ha='center', va='bottom')
-        
-        plt.tight_layout()
-        
-        chart_path = 'charts/low_stock_analysis.png'
-        plt.savefig(chart_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        return chart_path
+        # 前15个低库存商品，按缺货风险排序
+        low_stock_df = snapshot.views.low_stock.head(15).sort_values('stockout_risk', ascending=False)
+        
+        data = {
+            'product_id': low_stock_df['product_id'].astype(str).tolist(),
+            'stockout_risk': low_stock_df['stockout_risk'].tolist()
+        }
+        return self._draw('low_stock_analysis', data, chart_path)
     
-    def _create_profit_analysis_chart(self):
+    def _create_profit_analysis_chart(self, snapshot, chart_path):
         """创建利润率分析图"""
-        plt.figure(figsize=(12, 6))
-        
-        # 计算利润率
-        self.merged_df['profit_margin'] = ((self.merged_df['selling_price'] - self.merged_df['cost_price']) / 
-                                          self.merged_df['selling_price'] * 100)
-        
-        # 按类别统计平均利润率
-        category_profit = self.merged_df.groupby('category')['profit_margin'].mean().sort_values(ascending=False)
-        
-        bars = plt.bar(range(len(category_profit)), category_profit.values, 
-                      color='lightgreen', alpha=0.8)
-        
-        plt.xlabel('商品类别')
-        plt.ylabel('平均利润率 (%)')
-        plt.title('各类别平均利润率')
-        plt.xticks(range(len(category_profit)), category_profit.index, rotation=45)
-        
-        # 添加数值标签
-        for i, bar in enumerate(bars):
-            height = bar.get_height()
-            plt.text(bar.get_x() + bar.get_width()/2., height,
-                    f'{height:.1f}%', ha='center', va='bottom')
-        
-        plt.tight_layout()
-        
-        chart_path = 'charts/profit_analysis.png'
-        plt.savefig(chart_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        return chart_path
+        # 各类别平均利润率
+        category_profit = snapshot.views.category_margin.sort_values(ascending=False)
+        
+        data = {
+            'category': category_profit.index.astype(str).tolist(),
+            'profit_margin': category_profit.tolist()
+        }
+        return self._draw('profit_analysis', data, chart_path)
     
-    def _create_overview_chart(self):
+    def _create_overview_chart(self, snapshot, chart_path):
         """创建综合概览图"""
-        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 10))
-        
-        # 1. 库存vs安全库存散点图
-        ax1.scatter(self.merged_df['safety_stock'], self.merged_df['current_stock'], 
-                   alpha=0.6, color='blue')
-        ax1.plot([0, self.merged_df['safety_stock'].max()], 
-                [0, self.merged_df['safety_stock'].max()], 'r--', alpha=0.8)
-        ax1.set_xlabel('安全库存')
-        ax1.set_ylabel('当前库存')
-        ax1.set_title('库存vs安全库存')
-        
-        # 2. 销量分布直方图
-        ax2.hist(self.sales_df['quantity_sold'], bins=30, alpha=0.7, color='green')
-        ax2.set_xlabel('日销量')
-        ax2.set_ylabel('频次')
-        ax2.set_title('销量分布')
-        
-        # 3. 类别商品数量
-        category_counts = self.products_df['category'].value_counts()
-        ax3.pie(category_counts.values, labels=category_counts.index, autopct='%1.1f%%')
-        ax3.set_title('商品类别分布')
-        
-        # 4. 库存状态饼图
-        low_stock_count = len(self.merged_df[self.merged_df['current_stock'] < self.merged_df['safety_stock']])
-        normal_stock_count = len(self.merged_df) - low_stock_count
-        
-        ax4.pie([low_stock_count, normal_stock_count], 
-                labels=['低库存', '正常库存'], autopct='%1.1f%%',
-                colors=['orange', 'lightblue'])
-        ax4.set_title('库存状态分布')
-        
-        plt.tight_layout()
-        
-        chart_path = 'charts/overview.png'
-        plt.savefig(chart_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        return chart_path
-    
-    def ask_question(self, question):
-        """主问答接口"""
+        merged_df = snapshot.merged_df
+        views = snapshot.views
+        
+        # 库存散点已抽样、销量分布直方图的分箱已预先计算，子进程不需要逐商品的数据与完整的销售记录
+        safety_stock, current_stock = views.stock_scatter
+        hist_counts, hist_edges = views.quantity_histogram
+        low_stock_count = len(views.low_stock)
+        
+        data = {
+            'safety_stock': safety_stock,
+            'current_stock': current_stock,
+            'max_safety_stock': views.max_safety_stock,
+            'hist_counts': hist_counts,
+            'hist_edges': hist_edges,
+            'category_labels': views.category_counts.index.astype(str).tolist(),
+            'category_counts': views.category_counts.tolist(),
+            'low_stock_count': low_stock_count,
+            'normal_stock_count': len(merged_df) - low_stock_count
+        }
+        return self._draw('overview', data, chart_path)
+    
+    def ask_question(self, question, timings=None):
+        """主问答接口（传入 timings 字典时写入各阶段耗时，见 analyze_data）"""
         print(f"🤔 问题: {question}")
         print("="*50)
         
         try:
             # 分析数据并生成回复
-            text_response, charts_info = self.analyze_data(question)
+            timings = {} if timings is None else timings
+            text_response, charts_info = self.analyze_data(question, timings)
             
             # 输出文字回复
             print("📝 回答:")
             print(text_response)
             print("\n" + "="*50)
             
-            # 输出图表信息
-            if charts_info:
-                print("📊 生成的图表:")
-                for chart in charts_info:
-                    print(f"  - {chart['type']}: {chart['path']}")
-                    print(f"    描述: {chart['description']}")
+            self._print_charts_and_timings(charts_info, timings)
+            return text_response, charts_info
+            
+        except Exception as e:
+            error_msg = f"❌ 处理问题时出错: {str(e)}"
+            print(error_msg)
+            return error_msg, []
+    
+    async def aask_question(self, question):
+        """异步问答接口：回答片段到达后立即输出"""
+        print(f"🤔 问题: {question}")
+        print("="*50)
+        
+        try:
+            timings = {}
+            token_stream, charts_info = await self.aanalyze_data(question, timings)
+            
+            # 流式输出文字回复
+            print("📝 回答:")
+            parts = []
+            async for token in token_stream:
+                parts.append(token)
+                print(token, end='', flush=True)
+            text_response = ''.join(parts)
+            print("\n\n" + "="*50)
             
+            self._print_charts_and_timings(charts_info, timings)
             return text_response, charts_info
             
         except Exception as e:
             error_msg = f"❌ 处理问题时出错: {str(e)}"
             print(error_msg)
             return error_msg, []
+    
+    def _print_charts_and_timings(self, charts_info, timings):
+        """输出图表信息和各阶段耗时"""
+        if charts_info:
+            print("📊 生成的图表:")
+            for chart in charts_info:
+                print(f"  - {chart['type']}: {chart['path']}")
+                print(f"    描述: {chart['description']}")
+        
+        # 图表渲染与LLM调用同时进行；流式输出时首字延迟是主要指标
+        first_token = f"首字 {timings['first_token']:.2f}s | " if 'first_token' in timings else ""
+        print(f"⏱️  耗时{answer_source(timings)}: {first_token}数据摘要 {timings['summary']:.2f}s | 图表渲染 {timings['charts']:.2f}s | "
+              f"LLM {timings['llm']:.2f}s | 总计 {timings['total']:.2f}s")
+        
+        if self.show_breakdown and 'breakdown' in timings:
+            print("🧭 阶段明细:")
+            for line in format_breakdown(timings['breakdown']):
+                print(f"  {line}")
 
 def main():
     """主函数 - 交互式问答"""
+    import argparse
+    parser = argparse.ArgumentParser(description="库存管理智能问答系统")
+    parser.add_argument('--breakdown', action='store_true', help='每个回答后输出各阶段耗时明细')
+    parser.add_argument('--log-level', default=TRACING_CONFIG['log_level'], help='日志级别（DEBUG/INFO/WARNING）')
+    args = parser.parse_args()
+    configure_logging(args.log_level)
+    
     print("🚀 库存管理智能问答系统")
     print("="*50)
     print("系统已加载，您可以询问关于库存、销售、商品等任何问题！")
     print("输入 'quit' 或 'exit' 退出系统")
     print("="*50)
     
-    qa_system = InventoryQASystem()
+    qa_system = InventoryQASystem(show_breakdown=args.breakdown)
     
     while True:
         try:
@@ -424,8 +580,8 @@ def main():
                 print("❌ 请输入有效的问题")
                 continue
             
-            # 处理问题
-            qa_system.ask_question(question)
+            # 处理问题（流式输出回答；在共享事件循环中执行，与LLM客户端的连接池保持在同一个事件循环）
+            run_async(qa_system.aask_question(question))
             
         except KeyboardInterrupt:
             print("\n👋 感谢使用，再见！")
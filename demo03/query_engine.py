@@ -0,0 +1,131 @@
+# 本地查询引擎
+# 低库存商品、畅销商品、各类别销量、平均利润率等常见问题有确定的答案，
+# 按关键词识别问题意图后直接由数据快照计算并套用中文模板回答，不调用LLM。
+# 无法识别或需要开放式分析（原因、建议、预测等）的问题仍交给LLM。
+
+import re
+from config import QUERY_ENGINE_CONFIG
+from response_cache import normalize_question
+
+# 含有这些词的问题需要开放式分析，交给LLM
+OPEN_ENDED_KEYWORDS = ['为什么', '原因', '建议', '怎么办', '如何改善', '如何提高', '如何优化',
+                       '策略', '预测', '影响', '评价', '解释']
+
+# 意图 -> 匹配规则（在规范化后的问题上匹配）。同时命中多个意图的问题
+# （如同时问库存和销售）本地模板只能回答其中一部分，交给LLM。
+# 规范化后的问题去掉了空白，且中文也算单词字符，不能用 \b，英文单词的边界用前后是否为字母判断
+INTENT_PATTERNS = [
+    ('low_stock', re.compile(r'库存不足|低库存|缺货|库存不够|需要补货|低于安全库存')),
+    ('category_sales', re.compile(r'(类别|品类|分类).*(销售|销量)|(销售|销量).*(类别|品类|分类)')),
+    ('top_sellers', re.compile(r'(销售|销量|卖得)(最好|最高|最多)|畅销|热销|(销售|销量)(排名|排行|前\d+)|(?<![a-z])top\d*(?![a-z])')),
+    ('avg_margin', re.compile(r'利润率|毛利率')),
+]
+
+INTENT_LABELS = {
+    'low_stock': '低库存商品',
+    'category_sales': '各类别销量',
+    'top_sellers': '畅销商品',
+    'avg_margin': '平均利润率',
+}
+
+_TOP_N_PATTERN = re.compile(r'(?:前|(?<![a-z])top)(\d+)')
+
+
+def classify_question(question):
+    """识别问题意图；不属于常见问题或同时命中多个意图时返回 None"""
+    normalized = normalize_question(question)
+    if any(keyword in normalized for keyword in OPEN_ENDED_KEYWORDS):
+        return None
+    matched = [intent for intent, pattern in INTENT_PATTERNS if pattern.search(normalized)]
+    return matched[0] if len(matched) == 1 else None
+
+
+def _product_label(row):
+    return f"{row.product_id} {row.name}（{row.category}）"
+
+
+def answer_low_stock(question, snapshot):
+    """低库存商品：数量、占比和缺口最大的商品"""
+    views = snapshot.views
+    total = len(snapshot.merged_df)
+    low_stock = views.low_stock
+    if low_stock.empty:
+        return f"当前全部 {total} 个商品的库存都不低于安全库存，暂无低库存商品。"
+
+    listed = low_stock.sort_values('shortage', ascending=False, kind='stable')
+    listed = listed.head(QUERY_ENGINE_CONFIG['max_listed_items'])
+
+    lines = [f"当前共有 {len(low_stock)} 个商品库存低于安全库存"
+             f"（占全部 {total} 个商品的 {len(low_stock) / total * 100:.1f}%），"
+             f"其中 {views.out_of_stock_count} 个已缺货。",
+             f"缺口最大的 {len(listed)} 个商品："]
+    for i, row in enumerate(listed.itertuples(index=False), 1):
+        lines.append(f"{i}. {_product_label(row)}：当前库存 {row.current_stock}，"
+                     f"安全库存 {row.safety_stock:.0f}，缺口 {row.shortage:.0f}")
+    return '\n'.join(lines)
+
+
+def answer_top_sellers(question, snapshot):
+    """畅销商品：总销量最高的前 N 个商品"""
+    match = _TOP_N_PATTERN.search(normalize_question(question))
+    top_n = int(match.group(1)) if match else QUERY_ENGINE_CONFIG['top_n']
+
+    views = snapshot.views
+    top = views.product_sales.sort_values('total_sales', ascending=False, kind='stable').head(top_n)
+    if top.empty:
+        return "暂无销售记录。"
+
+    lines = [f"{views.sales_period} 期间总销量最高的 {len(top)} 个商品："]
+    for i, row in enumerate(top.reset_index().itertuples(index=False), 1):
+        lines.append(f"{i}. {_product_label(row)}：总销量 {row.total_sales:,}，"
+                     f"平均日销量 {row.avg_daily_sales:.1f}，最高日销量 {row.max_daily_sales}")
+    return '\n'.join(lines)
+
+
+def answer_category_sales(question, snapshot):
+    """各类别销量：总销量与占比"""
+    views = snapshot.views
+    category_sales = views.category_sales.sort_values(ascending=False, kind='stable')
+    total = category_sales.sum()
+    if total == 0:
+        return "暂无销售记录。"
+
+    lines = [f"{views.sales_period} 期间共售出 {total:,} 件商品，各类别销量如下："]
+    for i, (category, sales) in enumerate(category_sales.items(), 1):
+        lines.append(f"{i}. {category}：{sales:,} 件，占 {sales / total * 100:.1f}%")
+    return '\n'.join(lines)
+
+
+def answer_avg_margin(question, snapshot):
+    """平均利润率：整体与各类别（利润率 = (售价 - 成本) / 售价）"""
+    views = snapshot.views
+    profit_margin = views.profit_margin
+    category_margin = views.category_margin.sort_values(ascending=False, kind='stable')
+
+    lines = [f"全部 {len(profit_margin)} 个商品的平均利润率为 {profit_margin.mean():.1f}%"
+             f"（最高 {profit_margin.max():.1f}%，最低 {profit_margin.min():.1f}%）。",
+             "各类别平均利润率："]
+    for i, (category, margin) in enumerate(category_margin.items(), 1):
+        lines.append(f"{i}. {category}：{margin:.1f}%")
+    return '\n'.join(lines)
+
+
+INTENT_HANDLERS = {
+    'low_stock': answer_low_stock,
+    'category_sales': answer_category_sales,
+    'top_sellers': answer_top_sellers,
+    'avg_margin': answer_avg_margin,
+}
+
+
+def answer_locally(question, snapshot):
+    """
+    尝试在本地回答问题
+
+    Returns:
+        (意图, 回答)；需要LLM回答时返回 None
+    """
+    intent = classify_question(question)
+    if intent is None:
+        return None
+    return intent, INTENT_HANDLERS[intent](question, snapshot)
@@ -0,0 +1,91 @@
+# 报告表格渲染
+# 简单报告与简洁报告中的四张 Markdown 表格（低库存、高库存、补货建议、促销建议）按列整体格式化：
+# 风险等级用 np.select 一次计算，各列整体转换为字符串，最后一次 join 成全部表格行，
+# 不再逐行 iterrows 拼接字符串。输出与逐行格式化完全一致。
+
+import numpy as np
+import pandas as pd
+
+
+def format_column(values, fmt):
+    """按 printf 格式格式化数值列（与 f-string 的对应格式结果一致）"""
+    return list(map(fmt.__mod__, np.asarray(values, dtype='float64').tolist()))
+
+
+def _as_str(column):
+    """把一列转换为字符串列表；分类列只格式化各个取值一次"""
+    if isinstance(column, pd.Series) and isinstance(column.dtype, pd.CategoricalDtype):
+        # 缺失值的编码为 -1，对应末尾追加的 'nan'
+        labels = np.append(column.cat.categories.astype(str).to_numpy(dtype=object), 'nan')
+        return labels[column.cat.codes.to_numpy()].tolist()
+    if isinstance(column, list):
+        return column
+    return np.asarray(column).astype(str).tolist()
+
+
+def markdown_rows(*columns):
+    """把各列拼接为 Markdown 表格行，返回以换行分隔的字符串（无商品时为空字符串）"""
+    cells = [_as_str(column) for column in columns]
+    if not cells[0]:
+        return ''
+    return '| ' + ' |\n| '.join(map(' | '.join, zip(*cells))) + ' |'
+
+
+def _select(risk, thresholds, choices, default):
+    """按风险阈值从高到低选择标签"""
+    return np.select([risk > threshold for threshold in thresholds], choices, default)
+
+
+def low_stock_rows(low_stock_df):
+    """低库存商品表格行：编号、名称、当前库存、安全库存、缺货风险、类别、风险等级"""
+    risk = low_stock_df['out_of_stock_risk'].to_numpy()
+    return markdown_rows(
+        low_stock_df['product_id'],
+        low_stock_df['name'],
+        low_stock_df['current_stock'],
+        format_column(low_stock_df['safety_stock'], '%.1f'),
+        format_column(risk, '%.1f%%'),
+        low_stock_df['category'],
+        _select(risk, [70, 40], ['🔴', '🟡'], '🟢')
+    )
+
+
+def high_stock_rows(high_stock_df):
+    """高库存商品表格行：编号、名称、当前库存、安全库存、积压风险、类别、风险等级"""
+    risk = high_stock_df['overstock_risk'].to_numpy()
+    return markdown_rows(
+        high_stock_df['product_id'],
+        high_stock_df['name'],
+        high_stock_df['current_stock'],
+        format_column(high_stock_df['safety_stock'], '%.1f'),
+        format_column(risk, '%.1f%%'),
+        high_stock_df['category'],
+        _select(risk, [200, 100], ['🔴', '🟡'], '🟢')
+    )
+
+
+def replenishment_rows(replenishment_df):
+    """补货建议表格行：编号、名称、建议补货量（缺口的1.2倍）、优先级、补货时间、补货原因"""
+    risk = replenishment_df['out_of_stock_risk'].to_numpy()
+    amount = ((replenishment_df['safety_stock'] - replenishment_df['current_stock']) * 1.2).to_numpy()
+    return markdown_rows(
+        replenishment_df['product_id'],
+        replenishment_df['name'],
+        np.trunc(amount).astype('int64'),
+        _select(risk, [70, 50], ['🔴 紧急', '🟡 高'], '🟢 中'),
+        _select(risk, [70, 50], ['48小时内', '7天内'], '14天内'),
+        format_column(risk, '缺货风险%.1f%%')
+    )
+
+
+def promotion_rows(promotion_df):
+    """促销建议表格行：编号、名称、促销方式、折扣率、促销时间、促销原因"""
+    risk = promotion_df['overstock_risk'].to_numpy()
+    return markdown_rows(
+        promotion_df['product_id'],
+        promotion_df['name'],
+        ['限时折扣'] * len(promotion_df),
+        _select(risk, [200, 150], ['30%', '20%'], '15%'),
+        _select(risk, [200, 150], ['立即', '1周内'], '2周内'),
+        format_column(risk, '积压风险%.1f%%')
+    )
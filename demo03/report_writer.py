@@ -0,0 +1,76 @@
+# 报告写出
+# 报告由按顺序排列的片段组成：字符串片段原样输出，表格片段为 (数据, 行渲染函数)。
+# 普通模式把全部片段拼接为一个字符串；流式模式逐段写入文件，表格按固定行数分块渲染，
+# 报告文本逐段写入，不在内存中拼接完整报告（表格所依据的数据表仍完整保存在内存中）。两种模式输出的内容完全一致。
+
+import os
+
+
+def render_report(parts):
+    """把报告片段拼接为完整字符串"""
+    return ''.join(part if isinstance(part, str) else part[1](part[0]) for part in parts)
+
+
+class StreamingReportWriter:
+    """逐段写入报告文件；先写入临时文件，完成后原子替换，避免留下写了一半的报告"""
+
+    def __init__(self, path, encoding='utf-8', chunk_rows=10000, total_rows=0, progress=True):
+        self.path = path
+        self.encoding = encoding
+        self.chunk_rows = chunk_rows
+        self.total_rows = total_rows
+        self.progress = progress
+        self.rows_written = 0
+        self.bytes_written = 0
+        self._tmp_path = path + '.tmp'
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self._tmp_path, 'w', encoding=self.encoding)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._file.close()
+        if exc_type is None:
+            os.replace(self._tmp_path, self.path)
+            if self.progress:
+                print()
+        else:
+            os.remove(self._tmp_path)
+        return False
+
+    def write(self, text):
+        self._file.write(text)
+        self.bytes_written += len(text.encode(self.encoding))
+
+    def write_table(self, df, render_rows):
+        """分块渲染并写入表格行（块之间以换行分隔，与一次性渲染的结果一致）"""
+        for start in range(0, len(df), self.chunk_rows):
+            chunk = df.iloc[start:start + self.chunk_rows]
+            self.write(('\n' if start else '') + render_rows(chunk))
+            self.rows_written += len(chunk)
+            self._show_progress()
+
+    def write_parts(self, parts):
+        for part in parts:
+            if isinstance(part, str):
+                self.write(part)
+            else:
+                self.write_table(*part)
+
+    def _show_progress(self):
+        if not self.progress:
+            return
+        if self.total_rows:
+            percent = self.rows_written / self.total_rows * 100
+            message = f"📝 已写入 {self.rows_written}/{self.total_rows} 行表格 ({percent:.0f}%)"
+        else:
+            message = f"📝 已写入 {self.rows_written} 行表格"
+        print(f"\r{message}，{self.bytes_written / 1e6:.1f} MB", end='', flush=True)
+
+
+def write_report_streaming(parts, path, encoding='utf-8', chunk_rows=10000, total_rows=0, progress=True):
+    """流式写出报告，返回写入的字节数"""
+    with StreamingReportWriter(path, encoding, chunk_rows, total_rows, progress) as writer:
+        writer.write_parts(parts)
+    return writer.bytes_written
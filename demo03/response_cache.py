@@ -0,0 +1,125 @@
+# LLM回答缓存
+# 回答由 规范化后的问题 + 数据快照指纹 + 提示词版本 唯一确定：
+# 数据不变时重复提问直接返回缓存的回答，不再调用LLM。
+# 缓存条目数有上限（超出时淘汰最久未使用的条目），并在 TTL 过期后失效；可选保存到磁盘，重启后继续使用。
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+# 规范化问题时忽略的空白与标点（中英文）
+_IGNORED_CHARS = re.compile(r'[\s\.,!?;:\'"，。！？；：、“”‘’（）()【】\[\]…~～]+')
+
+
+def normalize_question(question):
+    """规范化问题：统一全角/半角与大小写，忽略空白和标点"""
+    question = unicodedata.normalize('NFKC', question).lower()
+    return _IGNORED_CHARS.sub('', question)
+
+
+def prompt_version(*templates):
+    """提示词版本：系统消息与模板内容的摘要，修改提示词后旧回答自动失效"""
+    digest = hashlib.sha1()
+    for template in templates:
+        digest.update(template.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()[:12]
+
+
+class ResponseCache:
+    """按 (规范化问题, 快照指纹, 提示词版本) 缓存LLM回答"""
+
+    def __init__(self, max_entries=256, ttl_seconds=3600, persist_path=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persist_path = persist_path
+        self._entries = OrderedDict()  # 键 -> (写入时间, 快照指纹, 回答)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if persist_path:
+            self._load()
+
+    @staticmethod
+    def make_key(question, snapshot, version):
+        key_source = json.dumps([normalize_question(question), snapshot.fingerprint, version])
+        return hashlib.sha1(key_source.encode('utf-8')).hexdigest()
+
+    def get(self, question, snapshot, version):
+        """返回缓存的回答；不存在或已过期时返回 None"""
+        key = self.make_key(question, snapshot, version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry):
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, question, snapshot, version, answer):
+        """保存回答，超出容量时淘汰最久未使用的条目"""
+        key = self.make_key(question, snapshot, version)
+        with self._lock:
+            self._entries[key] = (time.time(), snapshot.fingerprint, answer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._save()
+
+    def evict_snapshot(self, old_snapshot, new_snapshot=None):
+        """删除基于旧快照的回答（可直接注册为快照替换回调）"""
+        if old_snapshot is None or (new_snapshot is not None
+                                    and old_snapshot.fingerprint == new_snapshot.fingerprint):
+            return
+        with self._lock:
+            stale = [key for key, entry in self._entries.items()
+                     if entry[1] == old_snapshot.fingerprint]
+            for key in stale:
+                del self._entries[key]
+            if stale:
+                self._save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._save()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _expired(self, entry):
+        return self.ttl_seconds is not None and time.time() - entry[0] > self.ttl_seconds
+
+    def _load(self):
+        """从磁盘读取缓存，丢弃已过期的条目；文件不存在或损坏时从空缓存开始"""
+        try:
+            with open(self.persist_path, encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        for key, created_at, fingerprint, answer in entries[-self.max_entries:]:
+            entry = (created_at, fingerprint, answer)
+            if not self._expired(entry):
+                self._entries[key] = entry
+
+    def _save(self):
+        """原子地写入磁盘（调用方持有锁）"""
+        if not self.persist_path:
+            return
+        entries = [[key, *entry] for key, entry in self._entries.items()]
+        tmp_path = self.persist_path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.persist_path)
+        except OSError as e:
+            print(f"⚠️  回答缓存写入失败: {e}")
@@ -0,0 +1,116 @@
+# 销售统计的可合并累加量
+# 每个商品保存 销售天数(count)、总销量(sum)、最高日销量(max)，平均日销量由 sum / count 得出。
+# 累加量可以按任意切分（增量追加、分块读取、并行分区）分别计算后再合并，结果与整体计算一致。
+# SalesSummary 在按商品累加量之外还保存每日总销量与各日销量取值的出现次数，
+# 数据摘要、销售趋势和销量分布都可以由它得到，不需要保留完整的销售记录。
+
+import numpy as np
+import pandas as pd
+
+AGGREGATE_COLUMNS = ['count', 'sum', 'max']
+SALES_STATS_COLUMNS = ['avg_daily_sales', 'max_daily_sales', 'total_sales', 'sales_days']
+
+
+def empty_aggregates():
+    """不含任何商品的累加量"""
+    aggregates = pd.DataFrame({
+        'count': pd.Series(dtype='int64'),
+        'sum': pd.Series(dtype='int64'),
+        'max': pd.Series(dtype='int64')
+    })
+    aggregates.index.name = 'product_id'
+    return aggregates
+
+
+def aggregate_sales(sales_df):
+    """按商品计算销售记录的累加量"""
+    aggregates = sales_df.groupby('product_id', observed=True)['quantity_sold'].agg(AGGREGATE_COLUMNS)
+    return aggregates.astype('int64')
+
+
+def merge_aggregates(*parts):
+    """合并多份累加量"""
+    parts = [part for part in parts if len(part)]
+    if not parts:
+        return empty_aggregates()
+    if len(parts) == 1:
+        return parts[0]
+
+    combined = pd.concat(parts)
+    # 不同来源的分类取值可能不同，统一按字符串分组
+    combined.index = combined.index.astype(str)
+    return combined.groupby(level=0).agg({'count': 'sum', 'sum': 'sum', 'max': 'max'})
+
+
+def finalize_sales_stats(aggregates):
+    """由累加量得到销售统计：平均日销量、最高日销量、总销量、销售天数"""
+    sales_stats = pd.DataFrame({
+        'avg_daily_sales': aggregates['sum'] / aggregates['count'],
+        'max_daily_sales': aggregates['max'],
+        'total_sales': aggregates['sum'],
+        'sales_days': aggregates['count']
+    }, index=aggregates.index).round(2)
+    return sales_stats[SALES_STATS_COLUMNS]
+
+
+class SalesSummary:
+    """销售记录的可合并汇总：按商品累加量、每日总销量、各日销量取值的出现次数"""
+
+    def __init__(self, aggregates, daily_sales, quantity_counts):
+        self.aggregates = aggregates
+        self.daily_sales = daily_sales
+        self.quantity_counts = quantity_counts
+
+    @property
+    def record_count(self):
+        """销售记录数"""
+        return int(self.quantity_counts.sum())
+
+    @property
+    def total_quantity(self):
+        """总销量"""
+        return int((self.quantity_counts.index.to_numpy(dtype='int64') * self.quantity_counts.to_numpy()).sum())
+
+    @property
+    def mean_quantity(self):
+        """平均日销量（每条销售记录）"""
+        return self.total_quantity / self.record_count
+
+    @property
+    def max_quantity(self):
+        """最高日销量"""
+        return int(self.quantity_counts.index.max())
+
+    @property
+    def start_date(self):
+        return self.daily_sales.index.min()
+
+    @property
+    def end_date(self):
+        return self.daily_sales.index.max()
+
+    def quantity_histogram(self, bins):
+        """日销量分布直方图，与 np.histogram(全部日销量, bins) 的结果一致"""
+        counts, edges = np.histogram(self.quantity_counts.index.to_numpy(), bins=bins,
+                                     weights=self.quantity_counts.to_numpy())
+        return counts.astype('int64'), edges
+
+
+def summarize_sales(sales_df, aggregates=None):
+    """计算销售记录的汇总（已有按商品累加量时直接使用）"""
+    if aggregates is None:
+        aggregates = aggregate_sales(sales_df)
+    daily_sales = sales_df.groupby('date')['quantity_sold'].sum().astype('int64')
+    quantity_counts = sales_df['quantity_sold'].value_counts().astype('int64')
+    return SalesSummary(aggregates, daily_sales, quantity_counts)
+
+
+def merge_summaries(*parts):
+    """合并多份销售汇总"""
+    if len(parts) == 1:
+        return parts[0]
+    return SalesSummary(
+        merge_aggregates(*(part.aggregates for part in parts)),
+        pd.concat([part.daily_sales for part in parts]).groupby(level=0).sum().sort_index(),
+        pd.concat([part.quantity_counts for part in parts]).groupby(level=0).sum()
+    )
@@ -1,24 +1,30 @@
 import pandas as pd
 import numpy as np
-from config import DATA_FILES
-
-def generate_simple_report():
-    """生成简单的库存管理报告"""
+from data_store import get_snapshot
+from report_tables import low_stock_rows, high_stock_rows, replenishment_rows, promotion_rows
+from report_writer import render_report, write_report_streaming
+from config import REPORT_CONFIG
+
+def _table(df, render_rows):
+    """表格片段，每行之后带换行（没有商品时不输出）"""
+    if len(df):
+        yield (df, render_rows)
+        yield "\n"
+
+def generate_simple_report(stream=False, output_path='simple_inventory_report.md'):
+    """
+    生成简单的库存管理报告
+    
+    Args:
+        stream: 为 True 时逐段写入报告文件（表格按 REPORT_CONFIG['stream_chunk_rows'] 行分块），
+                不在内存中拼接完整报告，返回报告文件路径；否则返回报告内容
+    """
     print("🚀 开始生成简单库存管理报告...")
     
-    # 加载数据
-    inventory_df = pd.read_csv(DATA_FILES['inventory'])
-    products_df = pd.read_csv(DATA_FILES['products'])
-    sales_df = pd.read_csv(DATA_FILES['sales_records'])
-    
-    # 合并数据
-    merged_df = inventory_df.merge(products_df, on='product_id', how='left')
-    
-    # 计算销售统计
-    sales_stats = sales_df.groupby('product_id').agg({
-        'quantity_sold': ['mean', 'max', 'sum', 'count']
-    }).round(2)
-    sales_stats.columns = ['avg_daily_sales', 'max_daily_sales', 'total_sales', 'sales_days']
+    # 加载数据（共享数据快照，合并表与销售统计已预先计算）
+    snapshot = get_snapshot()
+    merged_df = snapshot.merged_df
+    sales_stats = snapshot.sales_stats
     
     # 识别低库存商品
     low_stock_df = merged_df[merged_df['current_stock'] < merged_df['safety_stock']].copy()
@@ -36,8 +42,30 @@ def generate_simple_report():
     low_stock_df = low_stock_df.sort_values('out_of_stock_risk', ascending=False)
     high_stock_df = high_stock_df.sort_values('overstock_risk', ascending=False)
     
-    # 生成报告
-    report = f"""# 库存管理报告
+    # 需要补货与促销的商品
+    replenishment_df = low_stock_df[low_stock_df['out_of_stock_risk'] > 40]
+    promotion_df = high_stock_df[high_stock_df['overstock_risk'] > 100]
+    
+    # 生成并保存报告
+    parts = _report_parts(merged_df, low_stock_df, high_stock_df, replenishment_df, promotion_df)
+    if stream:
+        total_rows = len(low_stock_df) + len(high_stock_df) + len(replenishment_df) + len(promotion_df)
+        write_report_streaming(parts, output_path, REPORT_CONFIG['encoding'],
+                               REPORT_CONFIG['stream_chunk_rows'], total_rows)
+        report = output_path
+    else:
+        report = render_report(parts)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(report)
+    
+    print(f"✅ 简单报告已保存到 {output_path}")
+    print(f"📊 统计：{len(low_stock_df)}个低库存商品，{len(high_stock_df)}个高库存商品")
+    
+    return report
+
+def _report_parts(merged_df, low_stock_df, high_stock_df, replenishment_df, promotion_df):
+    """按顺序产出报告片段：字符串或 (表格数据, 行渲染函数)"""
+    yield f"""# 库存管理报告
 
 ## 执行摘要
 
@@ -58,11 +86,9 @@ def generate_simple_report():
 """
     
     # 添加低库存商品
-    for _, row in low_stock_df.iterrows():
-        risk_level = "🔴" if row['out_of_stock_risk'] > 70 else "🟡" if row['out_of_stock_risk'] > 40 else "🟢"
-        report += f"| {row['product_id']} | {row['name']} | {row['current_stock']} | {row['safety_stock']:.1f} | {row['out_of_stock_risk']:.1f}% | {row['category']} | {risk_level} |\n"
+    yield from _table(low_stock_df, low_stock_rows)
     
-    report += f"""
+    yield f"""
 
 **说明**：🔴 高风险(>70%)，🟡 中风险(40-70%)，🟢 低风险(<40%)
 
@@ -73,11 +99,9 @@ def generate_simple_report():
 """
     
     # 添加高库存商品
-    for _, row in high_stock_df.iterrows():
-        risk_level = "🔴" if row['overstock_risk'] > 200 else "🟡" if row['overstock_risk'] > 100 else "🟢"
-        report += f"| {row['product_id']} | {row['name']} | {row['current_stock']} | {row['safety_stock']:.1f} | {row['overstock_risk']:.1f}% | {row['category']} | {risk_level} |\n"
+    yield from _table(high_stock_df, high_stock_rows)
     
-    report += f"""
+    yield f"""
 
 **说明**：🔴 高风险(>200%)，🟡 中风险(100-200%)，🟢 低风险(<100%)
 
@@ -90,14 +114,9 @@ def generate_simple_report():
 """
     
     # 生成补货建议
-    replenishment_df = low_stock_df[low_stock_df['out_of_stock_risk'] > 40].copy()
-    for _, row in replenishment_df.iterrows():
-        priority = "🔴 紧急" if row['out_of_stock_risk'] > 70 else "🟡 高" if row['out_of_stock_risk'] > 50 else "🟢 中"
-        amount = int((row['safety_stock'] - row['current_stock']) * 1.2)
-        timeline = "48小时内" if row['out_of_stock_risk'] > 70 else "7天内" if row['out_of_stock_risk'] > 50 else "14天内"
-        report += f"| {row['product_id']} | {row['name']} | {amount} | {priority} | {timeline} | 缺货风险{row['out_of_stock_risk']:.1f}% |\n"
+    yield from _table(replenishment_df, replenishment_rows)
     
-    report += f"""
+    yield f"""
 
 ### 促销策略
 
@@ -106,14 +125,9 @@ def generate_simple_report():
 """
     
     # 生成促销建议
-    promotion_df = high_stock_df[high_stock_df['overstock_risk'] > 100].copy()
-    for _, row in promotion_df.iterrows():
-        priority = "🔴 紧急" if row['overstock_risk'] > 200 else "🟡 高" if row['overstock_risk'] > 150 else "🟢 中"
-        discount = "30%" if row['overstock_risk'] > 200 else "20%" if row['overstock_risk'] > 150 else "15%"
-        duration = "立即" if row['overstock_risk'] > 200 else "1周内" if row['overstock_risk'] > 150 else "2周内"
-        report += f"| {row['product_id']} | {row['name']} | 限时折扣 | {discount} | {duration} | 积压风险{row['overstock_risk']:.1f}% |\n"
+    yield from _table(promotion_df, promotion_rows)
     
-    report += f"""
+    yield f"""
 
 ## 总结
 
@@ -126,15 +140,10 @@ def generate_simple_report():
 - 高风险低库存：{len(low_stock_df[low_stock_df['out_of_stock_risk'] > 70])}个
 - 高风险高库存：{len(high_stock_df[high_stock_df['overstock_risk'] > 200])}个
 """
-    
-    # 保存报告
-    with open('simple_inventory_report.md', 'w', encoding='utf-8') as f:
-        f.write(report)
-    
-    print(f"✅ 简单报告已保存到 simple_inventory_report.md")
-    print(f"📊 统计：{len(low_stock_df)}个低库存商品，{len(high_stock_df)}个高库存商品")
-    
-    return report
 
 if __name__ == "__main__":
-    generate_simple_report()
+    import argparse
+    parser = argparse.ArgumentParser(description='生成简单库存管理报告')
+    parser.add_argument('--stream', action='store_true', help='报告文本逐段写入文件，不在内存中拼接完整报告')
+    args = parser.parse_args()
+    generate_simple_report(stream=args.stream)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+多 Agent 流水线测试：数据分析师阶段本地计算，补货与促销策略同时进行，每个阶段只收到所需的 JSON 片段，
+记录各阶段耗时与 token 数
+"""
+
+import json
+import os
+import tempfile
+import threading
+from langchain_core.messages import AIMessage
+from fake_llm import FakeLLM
+from agent_pipeline import AgentStage, run_pipeline, validate_pipeline, parse_json_response, stage_totals
+from data_store import get_snapshot
+from inventory_analysis import analyze_inventory
+from manual_llm_test import build_stages, manual_crewai_simulation
+
+STAGE_LATENCY = 0.3
+
+
+class ScriptedLLM(FakeLLM):
+    """按提示词内容返回各阶段回答的模拟 LLM，并记录每个阶段收到的提示词"""
+
+    def __init__(self, latency):
+        super().__init__(latency=latency)
+        self.prompts = {}
+        self._prompts_lock = threading.Lock()
+
+    def invoke(self, messages, **kwargs):
+        prompt = messages[-1].content
+        if '报告撰写专家' in prompt:
+            stage = 'report'
+            content = "# 库存管理报告\n\n补货 P001，促销 P045。"
+        elif '制定具体的补货建议' in prompt:
+            stage = 'replenishment'
+            content = json.dumps({"replenishment_strategies": [{"product_id": "P001", "replenishment_amount": 200}]})
+        else:
+            stage = 'promotion'
+            content = "促销策略如下：\n```json\n" + json.dumps(
+                {"promotion_strategies": [{"product_id": "P045", "discount_rate": 20}]}) + "\n```"
+        with self._prompts_lock:
+            self.prompts[stage] = prompt
+        super().invoke(messages, **kwargs)
+        return AIMessage(content=content)
+
+
+def test_agent_pipeline():
+    """测试流水线的依赖调度、输入片段与统计"""
+    print("🧪 开始测试多 Agent 流水线...")
+
+    snapshot = get_snapshot()
+    llm = ScriptedLLM(latency=STAGE_LATENCY)
+    results, trace = run_pipeline(llm, build_stages(snapshot))
+    # 数据分析师阶段不调用 LLM
+    assert llm.calls == 3
+    analysis = analyze_inventory(snapshot)
+    assert results['analyst'] == analysis
+    assert results['promotion'] == {"promotion_strategies": [{"product_id": "P045", "discount_rate": 20}]}
+    assert results['report'].startswith('# 库存管理报告')
+
+    # 补货与促销只收到各自的片段
+    low_ids = [f'"{item["product_id"]}"' for item in analysis['low_stock_products']]
+    high_ids = [f'"{item["product_id"]}"' for item in analysis['high_stock_products']]
+    assert low_ids and high_ids
+    assert all(product_id in llm.prompts['replenishment'] for product_id in low_ids)
+    assert not any(product_id in llm.prompts['replenishment'] for product_id in high_ids)
+    # 促销提示词超出 token 预算时只保留积压风险最高的商品明细，其余按类别汇总
+    listed = [product_id for product_id in high_ids if product_id in llm.prompts['promotion']]
+    assert listed and (len(listed) == len(high_ids)
+                       or 'high_stock_products_others_by_category' in llm.prompts['promotion'])
+    assert not any(product_id in llm.prompts['promotion'] for product_id in low_ids)
+    assert 'analysis_summary' not in llm.prompts['replenishment']
+    print("✅ 补货与促销阶段只收到各自需要的 JSON 片段")
+
+    # 补货与促销同时进行：总耗时小于各阶段耗时之和
+    spans = {span.name: span for span in trace.spans}
+    assert spans['replenishment'].start_ns < spans['promotion'].end_ns
+    assert spans['promotion'].start_ns < spans['replenishment'].end_ns
+    assert spans['report'].start_ns >= max(spans['replenishment'].end_ns, spans['promotion'].end_ns)
+    totals = stage_totals(trace)
+    assert trace.root.duration < totals['stage_seconds'] - STAGE_LATENCY * 0.5
+    assert all(spans[name].attributes['input_tokens'] > 0 and spans[name].attributes['output_tokens'] > 0
+               for name in ['replenishment', 'promotion', 'report'])
+    assert spans['analyst'].attributes['kind'] == 'compute' and 'input_tokens' not in spans['analyst'].attributes
+    print(f"✅ 总耗时 {trace.root.duration:.2f}s，各阶段串行需 {totals['stage_seconds']:.2f}s")
+
+    # 依赖检查与 JSON 解析
+    for stages in [[AgentStage('a', '', str, {'x': ('b', None)}), AgentStage('b', '', str, {'y': ('a', None)})],
+                   [AgentStage('a', '', str, {'x': ('missing', None)})]]:
+        try:
+            validate_pipeline(stages)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("循环依赖或缺失的依赖应当报错")
+    assert parse_json_response('结果：{"a": 1}。') == {"a": 1}
+    print("✅ 循环依赖与缺失依赖会被拒绝")
+
+    # 手动工作流使用流水线生成报告
+    with tempfile.TemporaryDirectory() as output_dir:
+        output_path = os.path.join(output_dir, 'report.md')
+        assert manual_crewai_simulation(ScriptedLLM(latency=0.01), output_path)
+        with open(output_path, encoding='utf-8') as f:
+            assert f.read().startswith('# 库存管理报告')
+    print("✅ 手动工作流生成了报告")
+
+
+if __name__ == "__main__":
+    test_agent_pipeline()
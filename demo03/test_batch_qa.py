@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+批量问答测试：并发数提高时吞吐量随之提高，LLM请求遵守限速（不替换问答系统的共享客户端），
+可重试的错误按退避重试（LLM客户端本身不重试），结果写入 JSONL
+"""
+
+import json
+import os
+import tempfile
+from chart_cache import ChartCache
+from config import RESPONSE_CACHE_CONFIG
+from fake_llm import FakeLLM
+from langchain_openai import ChatOpenAI
+from llm_client import set_llm, without_sdk_retries
+from qa_system import InventoryQASystem
+from batch_qa import read_questions, run_batch
+
+LLM_LATENCY = 0.2
+# 不含图表关键词的开放问题都使用综合概览图，预热后图表直接命中缓存
+QUESTIONS = [f"请评估第{i}个门店的整体经营状况" for i in range(1, 9)]
+
+
+class FlakyLLM(FakeLLM):
+    """前几次调用超时的模拟 LLM"""
+
+    def __init__(self, failures, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+
+    def invoke(self, messages, **kwargs):
+        if self.failures > 0:
+            self.failures -= 1
+            raise TimeoutError("模拟的请求超时")
+        return super().invoke(messages, **kwargs)
+
+
+def test_batch_qa():
+    """测试批量问答的并发、限速、重试与输出"""
+    print("🧪 开始测试批量问答...")
+
+    # 每次都调用 LLM，便于比较不同并发数的吞吐量
+    previous_cache_setting = RESPONSE_CACHE_CONFIG['enabled']
+    RESPONSE_CACHE_CONFIG['enabled'] = False
+    # 图表写入临时目录
+    with tempfile.TemporaryDirectory() as chart_dir:
+        previous_llm = set_llm(FakeLLM(latency=LLM_LATENCY))
+        try:
+            qa_system = InventoryQASystem()
+            qa_system.chart_dir = chart_dir
+            qa_system.chart_cache = ChartCache(chart_dir)
+            qa_system.chart_dpi = 72
+            qa_system.chart_workers = 0
+            run_batch(QUESTIONS[:1], qa_system=qa_system, requests_per_minute=None)
+
+            # 吞吐量随并发数提高
+            _, serial = run_batch(QUESTIONS, qa_system=qa_system, concurrency=1, requests_per_minute=None)
+            _, concurrent = run_batch(QUESTIONS, qa_system=qa_system, concurrency=8, requests_per_minute=None)
+            assert serial['errors'] == concurrent['errors'] == 0
+            assert serial['llm_calls'] == concurrent['llm_calls'] == len(QUESTIONS)
+            assert serial['wall_seconds'] >= LLM_LATENCY * len(QUESTIONS)
+            assert concurrent['questions_per_second'] > serial['questions_per_second'] * 2, \
+                f"并发 8 的吞吐量 {concurrent['questions_per_second']:.2f} 问/s 应明显高于串行 {serial['questions_per_second']:.2f} 问/s"
+            print(f"✅ 串行 {serial['questions_per_second']:.2f} 问/s，并发 8 {concurrent['questions_per_second']:.2f} 问/s")
+
+            # 限速：每分钟 600 次即每 0.1 秒一次，并发再高也不会超过
+            shared_llm = qa_system.llm
+            _, limited = run_batch(QUESTIONS, qa_system=qa_system, concurrency=8, requests_per_minute=600)
+            assert limited['wall_seconds'] >= 0.1 * (len(QUESTIONS) - 1)
+            assert qa_system.llm is shared_llm, "限速包装不应替换问答系统的共享客户端"
+            print(f"✅ 限速 600 次/分钟时耗时 {limited['wall_seconds']:.2f}s")
+
+            # 可重试的错误按退避重试，超出重试次数时记录错误
+            qa_system.llm = FlakyLLM(failures=2, latency=0.01)
+            with tempfile.TemporaryDirectory() as output_dir:
+                questions_path = os.path.join(output_dir, 'questions.txt')
+                with open(questions_path, 'w', encoding='utf-8') as f:
+                    f.write("# 评估问题\n\n" + QUESTIONS[0] + "\n" +
+                            json.dumps({'id': 'q2', 'question': QUESTIONS[1]}, ensure_ascii=False) + "\n")
+                questions = read_questions(questions_path)
+                assert questions == [(3, QUESTIONS[0]), ('q2', QUESTIONS[1])]
+
+                output_path = os.path.join(output_dir, 'results.jsonl')
+                results, summary = run_batch(questions, output_path, qa_system=qa_system, concurrency=1,
+                                             requests_per_minute=None, backoff_seconds=0.01)
+                assert summary['errors'] == 0 and summary['retries'] == 2
+                assert results[0]['attempts'] == 3 and results[1]['attempts'] == 1
+
+                with open(output_path, encoding='utf-8') as f:
+                    lines = [json.loads(line) for line in f]
+                assert {line['id'] for line in lines} == {3, 'q2'}
+                assert all(line['answer'] and line['latency'] > 0 and line['source'] == 'llm' for line in lines)
+                print("✅ 超时后重试成功，结果已写入 JSONL")
+
+            qa_system.llm = FlakyLLM(failures=10, latency=0.01)
+            results, summary = run_batch(QUESTIONS[:1], qa_system=qa_system, requests_per_minute=None,
+                                         max_retries=1, backoff_seconds=0.01)
+            assert summary['errors'] == 1 and results[0]['attempts'] == 2
+            assert results[0]['error'].startswith('TimeoutError')
+            print("✅ 超出重试次数后记录错误")
+
+            # 批量问答自行重试，使用的 ChatOpenAI 客户端关闭 SDK 内部重试，共享客户端不受影响
+            client = ChatOpenAI(model_name='test-model', openai_api_base='http://localhost:9/v1',
+                                openai_api_key='test-key', temperature=0.3)
+            batch_client = without_sdk_retries(client)
+            assert batch_client.max_retries == 0 and batch_client.root_client.max_retries == 0
+            assert (batch_client.model_name, batch_client.temperature) == ('test-model', 0.3)
+            assert client.max_retries != 0 and without_sdk_retries(batch_client) is batch_client
+            assert without_sdk_retries(shared_llm) is shared_llm
+            print("✅ 批量问答使用的客户端不在内部重试")
+            qa_system.close()
+        finally:
+            set_llm(previous_llm)
+            RESPONSE_CACHE_CONFIG['enabled'] = previous_cache_setting
+
+
+if __name__ == "__main__":
+    test_batch_qa()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+端到端基准测试的冒烟测试：使用模拟 LLM 在小规模合成数据上跑通问答与报告，结果可保存并与基线对比
+"""
+
+import json
+import os
+import tempfile
+from config import DATA_FILES, CHART_CONFIG
+from benchmark_end_to_end import run_benchmark, compare_with_baseline, QUESTIONS, QA_PHASES
+
+SIZES = [100, 300]
+
+
+def test_benchmark_end_to_end():
+    """测试基准测试的结果结构与回退比较"""
+    print("🧪 开始测试端到端基准测试...")
+    data_files, chart_config = dict(DATA_FILES), dict(CHART_CONFIG)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        output_path = os.path.join(output_dir, 'results.json')
+        output = run_benchmark(SIZES, num_days=10, llm_latency=0.01, chart_workers=0, output_path=output_path)
+        assert DATA_FILES == data_files and CHART_CONFIG == chart_config, "基准测试结束后应恢复配置"
+
+        with open(output_path, encoding='utf-8') as f:
+            saved = json.load(f)
+        assert [result['num_products'] for result in saved['results']] == SIZES
+        for result in saved['results']:
+            assert result['sales_rows'] == result['num_products'] * 10
+            assert len(result['questions']) == len(QUESTIONS)
+            assert all(phase in result['qa_mean'] for phase in QA_PHASES)
+            assert result['reports']['compact']['bytes'] > 0 and result['reports']['simple']['bytes'] > 0
+            assert result['peak_rss_mb']['self'] > 0
+        # 开放问题调用模拟 LLM，常见问题由本地查询引擎回答
+        llm_questions = sum(item['source'] == 'LLM' for item in saved['results'][0]['questions'])
+        assert saved['settings']['llm_calls'] == llm_questions * len(SIZES)
+        print(f"✅ {len(SIZES)} 种数据规模的结果已保存，模拟 LLM 调用 {saved['settings']['llm_calls']} 次")
+
+        # 与自身对比没有回退；基线耗时显著更短时报告回退
+        assert compare_with_baseline(output['results'], output_path, tolerance=0.25) == []
+        for result in saved['results']:
+            result['phases']['load'] /= 100
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(saved, f)
+        assert len(compare_with_baseline(output['results'], output_path, tolerance=0.25)) == len(SIZES)
+        print("✅ 与基线对比可以发现性能回退")
+
+
+if __name__ == "__main__":
+    test_benchmark_end_to_end()
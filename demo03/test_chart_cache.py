@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+图表缓存测试：图表按 (快照指纹, 图表类型, 渲染参数) 缓存，键相同时不重复渲染；
+数据快照被替换后旧快照的图表不再复用，文件保留到又替换若干次之后才删除；
+渲染期间快照被替换时，渲染结果不再加入缓存，随旧快照一起删除
+"""
+
+import os
+import tempfile
+from types import SimpleNamespace
+import data_store
+from chart_cache import ChartCache
+from data_store import add_snapshot_listener, remove_snapshot_listener
+
+
+def test_chart_cache():
+    """测试图表缓存的键、命中与淘汰"""
+    print("🧪 开始测试图表缓存...")
+
+    old = SimpleNamespace(fingerprint='snapshot-old')
+    new = SimpleNamespace(fingerprint='snapshot-new')
+    renders = []
+
+    def render(chart_path):
+        renders.append(chart_path)
+        with open(chart_path, 'wb') as f:
+            f.write(b'png')
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        cache = ChartCache(output_dir, keep_snapshots=1)
+
+        # 1. 快照指纹、图表类型、渲染参数任一不同时路径不同；相同时路径不变
+        path = cache.chart_path(old, 'sales_trend', {'dpi': 72})
+        assert path == cache.chart_path(SimpleNamespace(fingerprint='snapshot-old'), 'sales_trend', {'dpi': 72})
+        others = [cache.chart_path(new, 'sales_trend', {'dpi': 72}),
+                  cache.chart_path(old, 'overview', {'dpi': 72}),
+                  cache.chart_path(old, 'sales_trend', {'dpi': 300})]
+        assert len({path, *others}) == 4
+        print("✅ 缓存键由快照指纹、图表类型和渲染参数共同决定")
+
+        # 2. 相同的键只渲染一次；文件被删除后重新渲染
+        assert cache.get_or_render(old, 'sales_trend', {'dpi': 72}, render) == path
+        assert cache.get_or_render(old, 'sales_trend', {'dpi': 72}, render) == path
+        assert renders == [path] and (cache.hits, cache.misses) == (1, 1)
+        os.remove(path)
+        cache.get_or_render(old, 'sales_trend', {'dpi': 72}, render)
+        assert len(renders) == 2
+        cache.get_or_render(old, 'sales_trend', {'dpi': 300}, render)
+        new_path = cache.get_or_render(new, 'sales_trend', {'dpi': 72}, render)
+        assert len(renders) == 4
+        print("✅ 相同的图表只渲染一次，文件被删除后重新渲染")
+
+        # 3. 快照替换（通过数据存储的替换回调）后旧快照的图表不再复用，但文件暂时保留
+        third, fourth, fifth = (SimpleNamespace(fingerprint=f'snapshot-{name}') for name in ['third', 'fourth', 'fifth'])
+        old_paths = [path, cache.chart_path(old, 'sales_trend', {'dpi': 300})]
+        previous_snapshot = data_store._snapshot
+        add_snapshot_listener(cache.evict_snapshot)
+        try:
+            data_store._swap_snapshot(old)
+            data_store._swap_snapshot(new)
+        finally:
+            remove_snapshot_listener(cache.evict_snapshot)
+            data_store._swap_snapshot(previous_snapshot)
+        assert all(os.path.exists(item) for item in old_paths), "进行中的回答仍可能引用旧快照的图表"
+        cache.get_or_render(old, 'sales_trend', {'dpi': 72}, render)
+        cache.get_or_render(old, 'sales_trend', {'dpi': 72}, render)
+        assert len(renders) == 6, "旧快照的图表不应再被复用"
+
+        # 指纹相同（数据没有变化）的替换不影响缓存
+        cache.evict_snapshot(new, SimpleNamespace(fingerprint='snapshot-new'))
+        assert cache.get_or_render(new, 'sales_trend', {'dpi': 72}, render) == new_path and len(renders) == 6
+
+        # 又替换 keep_snapshots 次之后删除
+        cache.evict_snapshot(new, third)
+        assert not any(os.path.exists(item) for item in old_paths)
+        assert os.path.exists(new_path)
+        print("✅ 快照替换后旧快照的图表不再复用，文件保留到又替换一次之后才删除")
+
+        # 4. 渲染期间快照被替换：结果交给本次请求，但不加入缓存，之后随该快照一起删除
+        def racing_render(chart_path):
+            cache.evict_snapshot(third, fourth)
+            render(chart_path)
+
+        late_path = cache.get_or_render(third, 'overview', {'dpi': 72}, racing_render)
+        assert os.path.exists(late_path) and not os.path.exists(new_path)
+        cache.get_or_render(third, 'overview', {'dpi': 72}, render)
+        assert len(renders) == 8, "渲染期间快照被替换时，结果不应加入缓存"
+        cache.evict_snapshot(fourth, fifth)
+        assert not os.path.exists(late_path), "渲染期间被替换的快照的图表也应被删除"
+        print("✅ 渲染期间快照被替换时，结果不加入缓存，之后随旧快照删除")
+
+
+if __name__ == "__main__":
+    test_chart_cache()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+图表进程池渲染测试：图表在子进程中绘制（只传递聚合后的绘图数据），结果与在当前进程绘制完全一致
+"""
+
+import hashlib
+import os
+import tempfile
+from chart_renderer import get_render_pool
+from qa_system import InventoryQASystem
+
+RENDER_WORKERS = 2
+
+# 同时命中五类图表的问题，以及使用综合概览图的问题
+QUESTIONS = ["各类别的库存、销售、低库存和利润情况如何？", "请评估一下整体经营状况"]
+
+
+def render_all(qa_system, output_dir):
+    """渲染全部图表，返回 {图表类型: 内容摘要}"""
+    qa_system.chart_dir = output_dir
+    digests = {}
+    for question in QUESTIONS:
+        for chart in qa_system._generate_charts(question, qa_system.snapshot):
+            with open(chart['path'], 'rb') as f:
+                digests[chart['type']] = hashlib.sha1(f.read()).hexdigest()
+    return digests
+
+
+def test_chart_rendering():
+    """测试进程池渲染的结果与当前进程渲染一致"""
+    print("🧪 开始测试图表进程池渲染...")
+
+    pool = get_render_pool(RENDER_WORKERS)
+    assert pool is not None and get_render_pool(0) is None
+    assert pool.submit(os.getpid).result() != os.getpid(), "图表应在子进程中绘制"
+
+    qa_system = InventoryQASystem()
+    qa_system.chart_cache = None
+    qa_system.chart_dpi = 72
+    with tempfile.TemporaryDirectory() as local_dir, tempfile.TemporaryDirectory() as pool_dir:
+        qa_system.chart_workers = 0
+        local = render_all(qa_system, local_dir)
+        qa_system.chart_workers = RENDER_WORKERS
+        pooled = render_all(qa_system, pool_dir)
+    qa_system.close()
+
+    assert len(local) == 6, f"应渲染全部 6 类图表，实际 {sorted(local)}"
+    assert pooled == local, "子进程绘制的图表应与当前进程绘制的完全一致"
+    print(f"✅ {len(pooled)} 类图表在子进程中绘制，结果与当前进程绘制一致")
+
+
+if __name__ == "__main__":
+    test_chart_rendering()
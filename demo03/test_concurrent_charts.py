@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+图表并发渲染压力测试：多个线程同时提问时，各自的图表互不覆盖、互不混淆
+"""
+
+import hashlib
+import tempfile
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from qa_system import InventoryQASystem
+
+NUM_THREADS = 6
+ROUNDS_PER_THREAD = 2
+
+# 同时命中 库存 / 销售 / 类别 / 低库存 / 利润 五组关键词的问题
+QUESTION = "各类别的库存、销售、低库存和利润情况如何？"
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        content = f.read()
+    assert content.startswith(PNG_SIGNATURE), f"{path} 不是完整的PNG文件"
+    return hashlib.sha1(content).hexdigest()
+
+
+def render_concurrently(qa_system):
+    """多线程并发生成图表，返回 [(图表类型, 路径, 内容摘要)]"""
+    snapshot = qa_system.snapshot
+
+    def worker(_):
+        results = []
+        for _ in range(ROUNDS_PER_THREAD):
+            for chart in qa_system._generate_charts(QUESTION, snapshot):
+                results.append((chart['type'], chart['path'], file_digest(chart['path'])))
+        return results
+
+    with ThreadPoolExecutor(max_workers=NUM_THREADS) as executor:
+        return [item for results in executor.map(worker, range(NUM_THREADS)) for item in results]
+
+
+def test_concurrent_charts():
+    """测试并发渲染图表的正确性"""
+    print(f"🧪 {NUM_THREADS} 个线程并发渲染图表...")
+
+    qa_system = InventoryQASystem()
+    qa_system.chart_dpi = 72  # 降低分辨率缩短测试时间
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        # 1. 不使用缓存：每次请求写入独立的文件
+        qa_system.chart_dir = output_dir
+        qa_system.chart_cache = None
+        results = render_concurrently(qa_system)
+
+        paths = [path for _, path, _ in results]
+        assert len(paths) == len(set(paths)), "并发请求的图表文件名发生冲突"
+
+        # 同一类型的图表基于同一快照，内容必须完全一致；不一致说明图表之间互相混淆
+        digests = defaultdict(set)
+        for chart_type, _, digest in results:
+            digests[chart_type].add(digest)
+        for chart_type, values in digests.items():
+            assert len(values) == 1, f"{chart_type} 图表在并发渲染时内容不一致"
+        print(f"✅ 无缓存：{len(paths)} 个图表文件互不冲突，内容一致")
+
+        # 2. 使用缓存：并发的相同请求共用同一个文件，且只渲染一次
+        from chart_cache import ChartCache
+        qa_system.chart_cache = ChartCache(output_dir)
+        results = render_concurrently(qa_system)
+
+        cached_paths = {chart_type: set() for chart_type, _, _ in results}
+        for chart_type, path, digest in results:
+            cached_paths[chart_type].add(path)
+            assert digest in digests[chart_type], f"{chart_type} 缓存图表内容与直接渲染不一致"
+        assert all(len(values) == 1 for values in cached_paths.values())
+        assert qa_system.chart_cache.misses == len(cached_paths), "相同图表被重复渲染"
+        print(f"✅ 有缓存：{len(results)} 次请求只渲染了 {qa_system.chart_cache.misses} 个图表")
+    qa_system.close()
+
+
+if __name__ == "__main__":
+    test_concurrent_charts()
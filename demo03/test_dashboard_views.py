@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+物化视图测试：每份数据快照只计算一次，结果与直接计算一致，数据更新后随新快照重新计算
+"""
+
+import numpy as np
+import pandas as pd
+from config import DATA_FILES
+from dashboard_views import sample_scatter
+from data_store import load_snapshot
+
+
+def test_dashboard_views():
+    """测试物化视图的正确性与生命周期"""
+    print("🧪 开始测试物化视图...")
+
+    snapshot = load_snapshot()
+    views = snapshot.views
+    assert snapshot.views is views, "同一快照的视图只应计算一次"
+
+    # 用原始 CSV 独立计算期望结果
+    inventory = pd.read_csv(DATA_FILES['inventory'])
+    products = pd.read_csv(DATA_FILES['products'])
+    sales = pd.read_csv(DATA_FILES['sales_records'])
+    merged = inventory.merge(products, on='product_id', how='left')
+
+    daily_sales = sales.groupby('date')['quantity_sold'].sum()
+    assert views.daily_sales.tolist() == daily_sales.tolist()
+
+    category_stock = merged.groupby('category')['current_stock'].sum()
+    actual = views.category_stock['current_stock']
+    assert dict(zip(actual.index.astype(str), actual.tolist())) == category_stock.to_dict()
+
+    category_sales = sales.merge(products, on='product_id').groupby('category')['quantity_sold'].sum()
+    actual = views.category_sales
+    assert dict(zip(actual.index.astype(str), actual.tolist())) == category_sales.to_dict()
+
+    low_stock = merged[merged['current_stock'] < merged['safety_stock']]
+    assert views.low_stock['product_id'].astype(str).tolist() == low_stock['product_id'].tolist()
+
+    margin = (merged['selling_price'] - merged['cost_price']) / merged['selling_price'] * 100
+    category_margin = margin.groupby(merged['category']).mean()
+    actual = views.category_margin
+    for category, value in zip(actual.index.astype(str), actual.tolist()):
+        assert abs(value - category_margin[category]) < 1e-9
+    assert f"低库存商品（当前库存 < 安全库存）：{len(low_stock)}个" in views.summary_text
+    print("✅ 物化视图与直接计算一致")
+
+    # 概览图散点：商品数不超过上限时全部保留；超出时点数有上限，并保留离群点与极值点
+    x, y = views.stock_scatter
+    assert x.tolist() == merged['safety_stock'].tolist() and y.tolist() == merged['current_stock'].tolist()
+    rng = np.random.default_rng(0)
+    safety = rng.integers(10, 100, 100_000)
+    current = safety + rng.integers(-20, 20, 100_000)
+    current[12345] = 5000
+    sampled_x, sampled_y = sample_scatter(safety, current, 500)
+    assert len(sampled_x) == 500 and 5000 in sampled_y
+    assert sampled_x.min() == safety.min() and sampled_x.max() == safety.max()
+    assert [a.tolist() for a in sample_scatter(safety, current, 500)] == [sampled_x.tolist(), sampled_y.tolist()]
+    print("✅ 概览图散点抽样后不超过上限，保留离群点")
+
+    # 重新加载得到新快照时，视图随新快照重新计算
+    reloaded = load_snapshot()
+    assert reloaded.views is not views
+    assert reloaded.views.daily_sales.equals(views.daily_sales)
+    print("✅ 新快照使用新计算的视图")
+
+
+if __name__ == "__main__":
+    test_dashboard_views()
@@ -1,24 +1,15 @@
 import pandas as pd
 import numpy as np
-from config import DATA_FILES
+from data_store import get_snapshot
 
 def test_data_accuracy():
     """测试数据准确性"""
     print("🔍 测试数据准确性...")
     
-    # 加载数据
-    inventory_df = pd.read_csv(DATA_FILES['inventory'])
-    products_df = pd.read_csv(DATA_FILES['products'])
-    sales_df = pd.read_csv(DATA_FILES['sales_records'])
-    
-    # 合并数据
-    merged_df = inventory_df.merge(products_df, on='product_id', how='left')
-    
-    # 计算销售统计
-    sales_stats = sales_df.groupby('product_id').agg({
-        'quantity_sold': ['mean', 'max', 'sum', 'count']
-    }).round(2)
-    sales_stats.columns = ['avg_daily_sales', 'max_daily_sales', 'total_sales', 'sales_days']
+    # 加载数据（共享数据快照，合并表与销售统计已预先计算）
+    snapshot = get_snapshot()
+    merged_df = snapshot.merged_df
+    sales_stats = snapshot.sales_stats
     
     # 1. 识别低库存商品
     low_stock_df = merged_df[merged_df['current_stock'] < merged_df['safety_stock']].copy()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+CSV 解析缓存测试：缓存有效时不再解析 CSV，CSV 修改时间或大小变化后重建，命令行可以预热和清除缓存
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from config import DATA_FILES
+from data_cache import read_cached, cache_path_for, cache_available, CACHED_TABLES
+from data_store import read_products
+
+SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data_cache.py')
+
+
+def test_data_cache():
+    """测试缓存命中、失效与命令行"""
+    print("🧪 开始测试CSV解析缓存...")
+    if not cache_available():
+        print("⚠️  未安装 pyarrow 或未启用缓存，跳过")
+        return
+
+    parses = []
+
+    def counting_reader(path):
+        parses.append(path)
+        return read_products(path)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        csv_path = shutil.copy(DATA_FILES['products'], data_dir)
+        cache_path = cache_path_for(csv_path)
+
+        # 1. 首次读取解析 CSV 并写入缓存，之后直接读取缓存，结果与类型不变
+        first = read_cached(csv_path, counting_reader)
+        assert len(parses) == 1 and os.path.exists(cache_path)
+        second = read_cached(csv_path, counting_reader)
+        assert len(parses) == 1, "缓存有效时不应再解析 CSV"
+        assert second.equals(first) and (second.dtypes == first.dtypes).all()
+        print("✅ 缓存命中时不再解析 CSV，结果与类型一致")
+
+        # 2. 修改时间变化（内容不变）与大小变化都会使缓存失效
+        stat = os.stat(csv_path)
+        os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        read_cached(csv_path, counting_reader)
+        assert len(parses) == 2
+        with open(csv_path, 'a', encoding='utf-8') as f:
+            f.write("P999,测试商品999,玩具,10.0,20.0,5\n")
+        refreshed = read_cached(csv_path, counting_reader)
+        assert len(parses) == 3 and len(refreshed) == len(first) + 1
+        read_cached(csv_path, counting_reader)
+        assert len(parses) == 3
+        print("✅ CSV 修改时间或大小变化后重建缓存")
+
+        # 3. 命令行预热与清除（在数据目录中运行，读取默认配置的数据文件）
+        for name in CACHED_TABLES:
+            shutil.copy(DATA_FILES[name], data_dir)
+        cache_paths = [cache_path_for(os.path.join(data_dir, DATA_FILES[name])) for name in CACHED_TABLES]
+        subprocess.run([sys.executable, SCRIPT_PATH, '--warm'], cwd=data_dir, check=True, capture_output=True)
+        assert all(os.path.exists(path) for path in cache_paths)
+        subprocess.run([sys.executable, SCRIPT_PATH, '--clear'], cwd=data_dir, check=True, capture_output=True)
+        assert not any(os.path.exists(path) for path in cache_paths)
+        print("✅ --warm 预热全部数据表，--clear 删除全部缓存文件")
+
+
+if __name__ == "__main__":
+    test_data_cache()
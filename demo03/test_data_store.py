@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+共享数据存储测试：问答系统、报告生成器等入口共用同一份数据快照，进程内只加载一次，且与直接读取 CSV 的结果一致
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import data_store
+from config import DATA_FILES
+from compact_report_generator import CompactReportGenerator
+from qa_system import InventoryQASystem
+
+
+def test_data_store():
+    """测试数据快照的共享与内容"""
+    print("🧪 开始测试共享数据存储...")
+
+    loads = []
+    lock = threading.Lock()
+    original_load, previous_snapshot = data_store.load_snapshot, data_store._snapshot
+
+    def counting_load(*args, **kwargs):
+        with lock:
+            loads.append(threading.current_thread().name)
+        return original_load(*args, **kwargs)
+
+    data_store.load_snapshot = counting_load
+    data_store._snapshot = None
+    try:
+        # 多个线程同时首次获取快照，只加载一次
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            snapshots = list(executor.map(lambda _: data_store.get_snapshot(), range(16)))
+        snapshot = snapshots[0]
+        assert all(item is snapshot for item in snapshots)
+
+        # 各入口共用同一份快照，不再各自读取 CSV
+        qa_system = InventoryQASystem()
+        generator = CompactReportGenerator()
+        assert qa_system.snapshot is snapshot
+        assert generator.merged_df is snapshot.merged_df and generator.sales_stats is snapshot.sales_stats
+        assert len(loads) == 1, f"数据应只加载一次，实际加载 {len(loads)} 次"
+        qa_system.close()
+        print(f"✅ {len(snapshots)} 个并发请求与问答系统、报告生成器共用同一份快照，只加载一次")
+    finally:
+        data_store.load_snapshot = original_load
+        data_store._snapshot = previous_snapshot
+
+    # 快照内容与直接读取 CSV 一致，商品编号与类别使用分类类型
+    inventory = pd.read_csv(DATA_FILES['inventory'])
+    sales = pd.read_csv(DATA_FILES['sales_records'])
+    assert len(snapshot.merged_df) == len(inventory)
+    assert snapshot.merged_df['name'].notna().all()
+    for df in [snapshot.inventory_df, snapshot.products_df, snapshot.sales_df]:
+        assert isinstance(df['product_id'].dtype, pd.CategoricalDtype)
+    grouped = sales.groupby('product_id')['quantity_sold']
+    stats = snapshot.sales_stats
+    assert {str(k): int(v) for k, v in stats['total_sales'].items()} == grouped.sum().to_dict()
+    assert {str(k): int(v) for k, v in stats['max_daily_sales'].items()} == grouped.max().to_dict()
+    assert {str(k): int(v) for k, v in stats['sales_days'].items()} == grouped.count().to_dict()
+    assert ((stats['avg_daily_sales'] - grouped.mean().round(2).to_numpy()).abs() < 1e-9).all()
+    print("✅ 合并表与销售统计与直接读取 CSV 的计算结果一致")
+
+
+if __name__ == "__main__":
+    test_data_store()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+销售记录增量刷新测试：追加记录后重新加载只解析新增的行，不重新读取整个文件、不重新计算销售汇总；
+文件被截断或重写时从头重建；末尾未写完换行的行计入本次结果，但下次不会重复计入；
+进程重启后文件没有变化时直接使用检查点中的按商品累加量
+"""
+
+import os
+import shutil
+import tempfile
+import pandas as pd
+import data_store
+from config import DATA_FILES, PARALLEL_AGGREGATION_CONFIG
+from data_store import load_snapshot
+from sales_aggregates import summarize_sales
+
+
+def check_snapshot(snapshot, sales_path):
+    """快照中的销售记录、销售统计与销售汇总与直接读取整个文件的结果一致"""
+    expected = pd.read_csv(sales_path)
+    assert len(snapshot.sales_df) == len(expected)
+    totals = expected.groupby('product_id')['quantity_sold'].sum()
+    actual = snapshot.sales_stats['total_sales']
+    assert {str(k): int(v) for k, v in actual.items()} == {k: int(v) for k, v in totals.items()}
+    summary = snapshot.sales_summary
+    assert summary.record_count == len(expected)
+    daily = expected.groupby('date')['quantity_sold'].sum()
+    assert [int(v) for v in summary.daily_sales.to_numpy()] == [int(v) for v in daily.to_numpy()]
+
+
+def test_incremental_sales():
+    """测试追加、末尾不完整的行与重写文件时的增量刷新"""
+    print("🧪 开始测试销售记录增量刷新...")
+
+    with open(DATA_FILES['sales_records'], 'rb') as f:
+        header, *lines = f.read().splitlines(keepends=True)
+    full_reads, parallel_summaries, parsed_bytes, aggregated_rows = [], [], [], []
+    original_read_cached, original_parallel = data_store.read_cached, data_store.summarize_sales_parallel
+    original_parse, original_aggregate = data_store.parse_sales_rows, data_store.aggregate_sales
+    previous_parallel = dict(PARALLEL_AGGREGATION_CONFIG)
+
+    def counting_read_cached(path, reader):
+        if reader is data_store.read_sales:
+            full_reads.append(path)
+        return original_read_cached(path, reader)
+
+    def counting_parallel(sales_df):
+        parallel_summaries.append(len(sales_df))
+        return summarize_sales(sales_df)
+
+    def counting_parse(header_line, data):
+        parsed_bytes.append(len(data))
+        return original_parse(header_line, data)
+
+    def counting_aggregate(sales_df):
+        aggregated_rows.append(len(sales_df))
+        return original_aggregate(sales_df)
+
+    data_store.read_cached = counting_read_cached
+    data_store.summarize_sales_parallel = counting_parallel
+    data_store.parse_sales_rows = counting_parse
+    data_store.aggregate_sales = counting_aggregate
+    PARALLEL_AGGREGATION_CONFIG.update(workers=2, min_rows=1)
+    try:
+        with tempfile.TemporaryDirectory() as data_dir:
+            data_files = {}
+            for name in ['inventory', 'products']:
+                data_files[name] = shutil.copy(DATA_FILES[name], data_dir)
+            sales_path = data_files['sales_records'] = os.path.join(data_dir, 'sales_records.csv')
+            with open(sales_path, 'wb') as f:
+                f.write(header + b''.join(lines[:2000]))
+
+            # 1. 首次加载读取整个文件并计算一次销售汇总
+            check_snapshot(load_snapshot(data_files), sales_path)
+            assert len(full_reads) == 1 and parallel_summaries == [2000] and aggregated_rows == [2000]
+
+            # 2. 追加记录：只解析新增的行，销售汇总在原有结果上合并
+            appended = b''.join(lines[2000:2500])
+            with open(sales_path, 'ab') as f:
+                f.write(appended)
+            parsed_bytes.clear()
+            aggregated_rows.clear()
+            check_snapshot(load_snapshot(data_files), sales_path)
+            assert len(full_reads) == 1 and parallel_summaries == [2000], "追加记录后不应重新读取整个文件"
+            assert parsed_bytes == [len(appended)] and aggregated_rows == [500], "新增的行只解析和聚合一次"
+            print("✅ 追加 500 行后只解析新增的行，不重新计算销售汇总")
+
+            # 3. 末尾的行还没有写完换行：本次计入，补全后不重复计入
+            with open(sales_path, 'ab') as f:
+                f.write(b''.join(lines[2500:2600]) + lines[2600].rstrip(b'\r\n'))
+            check_snapshot(load_snapshot(data_files), sales_path)
+            with open(sales_path, 'ab') as f:
+                f.write(b'\n' + b''.join(lines[2601:2700]))
+            check_snapshot(load_snapshot(data_files), sales_path)
+            assert len(full_reads) == 1
+            print("✅ 末尾不完整的行计入本次结果，补全后不重复计入")
+
+            # 4. 进程重启（没有已解析的前缀）：文件没有变化时使用检查点中的累加量，不重新聚合
+            data_store._sales_prefixes.clear()
+            aggregated_rows.clear()
+            check_snapshot(load_snapshot(data_files), sales_path)
+            assert len(full_reads) == 2 and aggregated_rows == []
+            print("✅ 进程重启后直接使用检查点中的累加量")
+
+            # 5. 文件被截断或重写：指纹不匹配，从头重建
+            with open(sales_path, 'wb') as f:
+                f.write(header + b''.join(lines[1000:1800]))
+            check_snapshot(load_snapshot(data_files), sales_path)
+            assert len(full_reads) == 3 and parallel_summaries[-1] == 800
+            with open(sales_path, 'wb') as f:
+                f.write(header + b''.join(reversed(lines[1000:2000])))
+            check_snapshot(load_snapshot(data_files), sales_path)
+            assert len(full_reads) == 4
+            print("✅ 文件被截断或重写后从头重建")
+    finally:
+        data_store.read_cached = original_read_cached
+        data_store.summarize_sales_parallel = original_parallel
+        data_store.parse_sales_rows = original_parse
+        data_store.aggregate_sales = original_aggregate
+        PARALLEL_AGGREGATION_CONFIG.update(previous_parallel)
+
+
+if __name__ == "__main__":
+    test_incremental_sales()
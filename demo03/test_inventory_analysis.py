@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+库存分析测试：本地计算的数据分析师结果与 ANALYST_PROMPT_TEMPLATE 的结构一致，且分类与风险指数准确
+"""
+
+import time
+from agent_pipeline import parse_json_response
+from data_store import get_snapshot, DataSnapshot
+from inventory_analysis import analyze_inventory
+from prompts import format_analyst_prompt
+
+
+def test_inventory_analysis():
+    """测试库存分析的结构与准确性"""
+    print("🧪 开始测试库存分析...")
+
+    snapshot = get_snapshot()
+    start = time.perf_counter()
+    analysis = analyze_inventory(snapshot)
+    elapsed = time.perf_counter() - start
+
+    # 与提示词模板中的 JSON 示例结构一致
+    schema = parse_json_response(format_analyst_prompt('', '', ''))
+    assert analysis.keys() == schema.keys()
+    assert analysis['analysis_summary'].keys() == schema['analysis_summary'].keys()
+    for key in ['low_stock_products', 'high_stock_products']:
+        assert all(item.keys() == schema[key][0].keys() for item in analysis[key])
+    print(f"✅ 结果结构与提示词模板一致，耗时 {elapsed * 1000:.1f}ms")
+
+    # 分类与风险指数：与逐个商品的计算一致，按风险从高到低排序
+    merged_df = snapshot.merged_df
+    expected_low = {row.product_id for row in merged_df.itertuples() if row.current_stock < row.safety_stock}
+    expected_high = {row.product_id for row in merged_df.itertuples() if row.current_stock > row.safety_stock * 2}
+    low, high = analysis['low_stock_products'], analysis['high_stock_products']
+    assert {item['product_id'] for item in low} == expected_low
+    assert {item['product_id'] for item in high} == expected_high
+    for item in low:
+        expected = (item['safety_stock'] - item['current_stock']) / item['safety_stock'] * 100
+        assert abs(item['out_of_stock_risk'] - expected) < 0.2
+    risks = [item['out_of_stock_risk'] for item in low]
+    assert risks == sorted(risks, reverse=True)
+    risks = [item['overstock_risk'] for item in high]
+    assert risks == sorted(risks, reverse=True)
+    assert all(item['sales_trend'] in ('上升', '下降', '平稳') for item in low + high)
+
+    summary = analysis['analysis_summary']
+    assert summary['total_products'] == len(merged_df)
+    assert (summary['low_stock_count'], summary['high_stock_count']) == (len(expected_low), len(expected_high))
+    print(f"✅ 低库存商品 {len(low)} 个，高库存商品 {len(high)} 个，与逐个商品计算一致")
+
+    # 分块汇总模式下没有完整销售记录：分类不变，销售趋势未知
+    chunked = DataSnapshot(snapshot.inventory_df, snapshot.products_df, None, sales_summary=snapshot.sales_summary)
+    chunked_analysis = analyze_inventory(chunked)
+    assert [item['product_id'] for item in chunked_analysis['low_stock_products']] == [item['product_id'] for item in low]
+    assert all(item['sales_trend'] == '未知' for item in chunked_analysis['low_stock_products'])
+    print("✅ 没有完整销售记录时销售趋势为未知")
+
+
+if __name__ == "__main__":
+    test_inventory_analysis()
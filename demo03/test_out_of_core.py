@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+分块汇总测试：分块读取销售记录得到的销售统计、物化视图、本地回答和报告与整体载入内存的结果一致
+"""
+
+import os
+import tempfile
+import data_store
+from config import DATA_FILES, OUT_OF_CORE_CONFIG
+from data_store import load_snapshot, read_sales_summary_chunked
+from query_engine import answer_locally
+from simple_report_generator import generate_simple_report
+
+# 使用很小的分块，确保每个商品、每个日期的记录跨越多个分块
+CHUNK_ROWS = 7
+
+QUESTIONS = ["哪些商品库存不足？", "销量前3的商品是哪些？", "各类别的销量是多少？", "平均利润率是多少？"]
+
+
+def load_out_of_core_snapshot():
+    """以分块模式加载快照"""
+    enabled = OUT_OF_CORE_CONFIG['enabled']
+    OUT_OF_CORE_CONFIG['enabled'] = True
+    try:
+        return load_snapshot()
+    finally:
+        OUT_OF_CORE_CONFIG['enabled'] = enabled
+
+
+def test_out_of_core():
+    """测试分块汇总与整体载入的结果一致"""
+    print("🧪 开始测试分块汇总...")
+
+    in_memory = load_snapshot()
+
+    # 分块汇总的销售统计与整体计算一致
+    summary = read_sales_summary_chunked(DATA_FILES['sales_records'], CHUNK_ROWS)
+    expected = in_memory.sales_summary
+    assert summary.aggregates.sort_index().equals(expected.aggregates.sort_index())
+    assert summary.daily_sales.tolist() == expected.daily_sales.sort_index().tolist()
+    assert summary.record_count == len(in_memory.sales_df)
+    assert summary.total_quantity == int(in_memory.sales_df['quantity_sold'].sum())
+    print(f"✅ 每块 {CHUNK_ROWS} 行的分块汇总与整体计算一致")
+
+    # 分块模式的快照不保留销售记录，物化视图与本地回答保持一致
+    out_of_core = load_out_of_core_snapshot()
+    assert out_of_core.sales_df is None
+    assert out_of_core.sales_stats.equals(in_memory.sales_stats)
+    assert out_of_core.views.summary_text == in_memory.views.summary_text
+    assert out_of_core.views.daily_sales.equals(in_memory.views.daily_sales)
+    for actual, expected in zip(out_of_core.views.quantity_histogram, in_memory.views.quantity_histogram):
+        assert actual.tolist() == expected.tolist()
+    for question in QUESTIONS:
+        assert answer_locally(question, out_of_core) == answer_locally(question, in_memory)
+    print("✅ 分块模式的物化视图与本地回答一致")
+
+    # 报告与整体载入时一致
+    with tempfile.TemporaryDirectory() as output_dir:
+        data_store._swap_snapshot(in_memory)
+        expected_report = generate_simple_report(output_path=os.path.join(output_dir, 'in_memory.md'))
+        data_store._swap_snapshot(out_of_core)
+        try:
+            report = generate_simple_report(output_path=os.path.join(output_dir, 'out_of_core.md'))
+        finally:
+            data_store._swap_snapshot(in_memory)
+    assert report == expected_report
+    print("✅ 分块模式生成的报告一致")
+
+
+if __name__ == "__main__":
+    test_out_of_core()
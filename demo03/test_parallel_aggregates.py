@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+销售汇总并行计算测试：按行号分成连续区间，多进程计算结果与单进程一致
+"""
+
+from config import PARALLEL_AGGREGATION_CONFIG
+from data_store import load_snapshot
+from parallel_aggregates import partition_ranges, summarize_sales_parallel
+from sales_aggregates import summarize_sales
+
+WORKERS = 3
+
+
+def test_parallel_aggregates():
+    """测试分区与并行计算的正确性"""
+    print("🧪 开始测试销售汇总并行计算...")
+
+    serial = load_snapshot()
+    sales_df = serial.sales_df
+
+    # 区间首尾相接，覆盖全部记录；行数少于进程数时不产生空区间
+    ranges = partition_ranges(len(sales_df), WORKERS)
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(sales_df)
+    assert all(end == start for (_, end), (start, _) in zip(ranges[:-1], ranges[1:]))
+    assert partition_ranges(2, WORKERS) == [(0, 1), (1, 2)]
+    print(f"✅ {len(sales_df)} 条记录分为 {len(ranges)} 个连续区间")
+
+    workers, min_rows = PARALLEL_AGGREGATION_CONFIG['workers'], PARALLEL_AGGREGATION_CONFIG['min_rows']
+    PARALLEL_AGGREGATION_CONFIG['workers'], PARALLEL_AGGREGATION_CONFIG['min_rows'] = WORKERS, 0
+    try:
+        summary = summarize_sales_parallel(sales_df)
+        expected = summarize_sales(sales_df)
+        # 同一商品分布在多个区间中，按编码合并后与单进程结果（包括分类索引）完全一致
+        assert summary.aggregates.equals(expected.aggregates)
+        assert summary.aggregates.index.dtype == expected.aggregates.index.dtype
+        assert summary.daily_sales.equals(expected.daily_sales.sort_index())
+        assert summary.quantity_counts.sort_index().equals(expected.quantity_counts.sort_index())
+        print("✅ 多进程计算的销售汇总与单进程一致")
+
+        parallel = load_snapshot()
+    finally:
+        PARALLEL_AGGREGATION_CONFIG['workers'], PARALLEL_AGGREGATION_CONFIG['min_rows'] = workers, min_rows
+
+    assert parallel.sales_stats.equals(serial.sales_stats)
+    assert parallel.views.summary_text == serial.views.summary_text
+    print("✅ 并行加载的快照与单进程加载一致")
+
+
+if __name__ == "__main__":
+    test_parallel_aggregates()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+提示词预算测试：商品很多时提示词不超过 token 预算（扣除安全余量），保留风险最高的商品明细，其余按类别汇总并记录日志
+"""
+
+import json
+import logging
+import random
+import time
+from config import PROMPT_BUDGET_CONFIG
+from tracing import count_tokens
+from prompts import format_replenishment_prompt
+from prompt_builder import build_replenishment_prompt, build_report_prompt, fit_sections, ItemSection, allocate, to_json
+
+BUDGET = 3000
+LIMIT = int(BUDGET * (1 - PROMPT_BUDGET_CONFIG['safety_margin']))
+CATEGORIES = ['电子产品', '服装', '食品', '家居', '玩具']
+
+
+class ListHandler(logging.Handler):
+    """收集日志记录"""
+
+    def __init__(self):
+        super().__init__(level=logging.DEBUG)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def make_products(count, risk_name, low, high, rng):
+    """生成 count 个带风险指数的商品"""
+    return [{
+        'product_id': f'{risk_name[0].upper()}{i:05d}',
+        'name': f'商品{i:05d}',
+        'category': rng.choice(CATEGORIES),
+        'current_stock': rng.randint(0, 1000),
+        'safety_stock': 100.0,
+        risk_name: round(rng.uniform(low, high), 1),
+        'sales_trend': '平稳'
+    } for i in range(count)]
+
+
+def test_prompt_builder():
+    """测试提示词按预算截断与按类别汇总"""
+    print("🧪 开始测试提示词预算...")
+    rng = random.Random(0)
+
+    # 未超出预算时与直接格式化相同
+    small = make_products(3, 'out_of_stock_risk', 0, 100, rng)
+    assert build_replenishment_prompt(small, BUDGET) == format_replenishment_prompt(to_json(small))
+    assert allocate([2, 10, 0], 7) == [2, 5, 0]
+
+    # 估算的 token 数偏保守：ASCII 字符按 2 个一个 token
+    assert count_tokens('{"product_id":"P00001"}') == 12 and count_tokens('库存') == 2
+
+    # 1 万个商品：提示词长度不随商品数增长
+    analysis = {
+        'low_stock_products': make_products(6000, 'out_of_stock_risk', 0, 100, rng),
+        'high_stock_products': make_products(4000, 'overstock_risk', 100, 400, rng),
+        'analysis_summary': {'total_products': 10000, 'low_stock_count': 6000, 'high_stock_count': 4000}
+    }
+    strategy = {
+        'replenishment_strategies': [{'product_id': item['product_id'], 'replenishment_amount': 100}
+                                     for item in analysis['low_stock_products']],
+        'promotion_strategies': [{'product_id': item['product_id'], 'discount_rate': 20}
+                                 for item in analysis['high_stock_products']]
+    }
+    logger = logging.getLogger('inventory.prompts')
+    handler, previous_level = ListHandler(), logger.level
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    try:
+        start = time.perf_counter()
+        prompt = build_report_prompt(analysis, strategy, BUDGET)
+        elapsed = time.perf_counter() - start
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(previous_level)
+    assert count_tokens(prompt) <= LIMIT
+    print(f"✅ 1 万个商品的报告提示词 {count_tokens(prompt)} tokens（预算 {BUDGET}，扣除安全余量后 {LIMIT}），"
+          f"构建耗时 {elapsed:.2f}s")
+
+    # 保留风险最高的商品，其余按类别汇总，汇总数量与被截断的商品数一致
+    compacted = json.loads(prompt[prompt.index('数据分析结果：') + 7:prompt.index('策略建议：')])
+    kept = compacted['low_stock_products']
+    assert 0 < len(kept) < 6000 and compacted['high_stock_products']
+    lowest_kept = min(item['out_of_stock_risk'] for item in kept)
+    assert sum(item['out_of_stock_risk'] > lowest_kept for item in analysis['low_stock_products']) < len(kept)
+    others = compacted['low_stock_products_others_by_category']
+    assert sum(group['count'] for group in others) == 6000 - len(kept)
+    assert {group['category'] for group in others} <= set(CATEGORIES)
+    assert compacted['analysis_summary'] == analysis['analysis_summary']
+    print(f"✅ 保留 {len(kept)} 个缺货风险最高的商品，其余 {6000 - len(kept)} 个按 {len(others)} 个类别汇总")
+
+    # 日志记录被汇总的商品数与商品编号
+    assert any(record.levelno == logging.INFO and f"low_stock_products {len(kept)}/6000" in record.getMessage()
+               for record in handler.records)
+    assert any(record.levelno == logging.DEBUG and 'high_stock_products' in record.getMessage()
+               for record in handler.records)
+
+    # 策略与商品同样按风险截断
+    assert 'replenishment_strategies_others_by_category' in prompt
+
+    # 补货提示词只包含低库存商品
+    prompt = build_replenishment_prompt(analysis['low_stock_products'], BUDGET)
+    assert count_tokens(prompt) <= LIMIT and 'low_stock_products_others_by_category' in prompt
+    print(f"✅ 补货提示词 {count_tokens(prompt)} tokens")
+
+    # 返回被汇总的商品编号
+    section = ItemSection('items', [{'product_id': f'P{i}', 'risk': i} for i in range(50)], 'risk')
+    prompt, dropped = fit_sections('测试', [section], lambda compacted: to_json(compacted), budget=200)
+    assert count_tokens(prompt) <= 200 * (1 - PROMPT_BUDGET_CONFIG['safety_margin'])
+    assert dropped['items'] and 'P49' not in dropped['items'] and 'P0' in dropped['items']
+
+    print("✅ 返回被汇总的商品编号")
+
+if __name__ == "__main__":
+    test_prompt_builder()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+本地查询引擎测试：常见问题不调用LLM，答案与直接计算一致
+"""
+
+import tempfile
+import pandas as pd
+from config import DATA_FILES
+from data_store import get_snapshot
+from query_engine import classify_question, answer_locally
+from qa_system import InventoryQASystem
+
+# 问题 -> 期望的意图（None 表示交给LLM）
+QUESTIONS = {
+    "有哪些商品库存不足？": 'low_stock',
+    "哪些商品需要补货": 'low_stock',
+    "哪些商品销售最好？": 'top_sellers',
+    "销量前3的商品是哪些？": 'top_sellers',
+    "各类别的销售情况如何？": 'category_sales',
+    "我们的利润率怎么样？": 'avg_margin',
+    "我们的库存状况如何？": None,
+    "为什么电子产品利润率低？": None,
+    "请给出补货建议": None,
+    "看看top5": 'top_sellers',
+    # 同时命中多个意图、英文单词中含有 top、只提到利润的问题交给LLM
+    "各类别的库存、销售、低库存和利润情况如何？": None,
+    "哪些商品库存不足，各类别销售如何？": None,
+    "laptop的库存还有多少": None,
+    "我们应该stop哪些商品": None,
+    "利润总额是多少": None,
+}
+
+
+class FailingLLM:
+    """被调用即失败的假LLM"""
+
+    def invoke(self, messages):
+        raise AssertionError("常见问题不应调用LLM")
+
+
+def test_query_engine():
+    """测试问题分类与本地答案的正确性"""
+    print("🧪 开始测试本地查询引擎...")
+
+    for question, expected in QUESTIONS.items():
+        assert classify_question(question) == expected, f"{question} 应识别为 {expected}"
+    print(f"✅ {len(QUESTIONS)} 个问题分类正确")
+
+    # 用原始 CSV 独立计算期望结果
+    inventory = pd.read_csv(DATA_FILES['inventory'])
+    products = pd.read_csv(DATA_FILES['products'])
+    sales = pd.read_csv(DATA_FILES['sales_records'])
+    merged = inventory.merge(products, on='product_id', how='left')
+    snapshot = get_snapshot()
+
+    low_stock_count = int((merged['current_stock'] < merged['safety_stock']).sum())
+    _, answer = answer_locally("有哪些商品库存不足？", snapshot)
+    assert f"共有 {low_stock_count} 个商品库存低于安全库存" in answer
+
+    top = sales.groupby('product_id')['quantity_sold'].sum().sort_values(ascending=False).head(3)
+    _, answer = answer_locally("销量前3的商品是哪些？", snapshot)
+    for product_id, total in top.items():
+        assert f"{product_id} " in answer and f"总销量 {total:,}" in answer
+
+    category_sales = sales.merge(products, on='product_id').groupby('category')['quantity_sold'].sum()
+    _, answer = answer_locally("各类别的销售情况如何？", snapshot)
+    for category, total in category_sales.items():
+        assert f"{category}：{total:,} 件" in answer
+
+    margin = (merged['selling_price'] - merged['cost_price']) / merged['selling_price'] * 100
+    _, answer = answer_locally("我们的利润率怎么样？", snapshot)
+    assert f"平均利润率为 {margin.mean():.1f}%" in answer
+    print("✅ 本地答案与直接计算一致")
+
+    # 问答系统走本地路径，不调用LLM（图表写入临时目录）
+    with tempfile.TemporaryDirectory() as output_dir:
+        qa_system = InventoryQASystem()
+        qa_system.llm = FailingLLM()
+        qa_system.chart_dir = output_dir
+        qa_system.chart_cache = None
+        qa_system.chart_dpi = 72
+        qa_system.chart_workers = 0
+        for question, expected in QUESTIONS.items():
+            if expected is None:
+                continue
+            timings = {}
+            text, _ = qa_system.analyze_data(question, timings)
+            assert text and 'local_intent' in timings
+            print(f"  {question} -> {timings['local_intent']}，{timings['local'] * 1000:.1f}ms")
+        qa_system.close()
+    print("✅ 常见问题在本地回答，不调用LLM")
+
+
+if __name__ == "__main__":
+    test_query_engine()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+LLM回答缓存测试：重复提问不再调用LLM，数据或提示词变化、过期、超出容量时重新生成
+"""
+
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+from chart_cache import ChartCache
+from response_cache import ResponseCache, normalize_question
+from qa_system import InventoryQASystem
+
+
+class CountingLLM:
+    """记录调用次数的假LLM"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return SimpleNamespace(content=f"第{self.calls}次回答")
+
+
+def test_response_cache():
+    """测试回答缓存的命中与失效"""
+    print("🧪 开始测试回答缓存...")
+
+    snapshot = SimpleNamespace(fingerprint='snapshot-a')
+    new_snapshot = SimpleNamespace(fingerprint='snapshot-b')
+
+    # 1. 空白、标点和全角字符不同的问题视为同一个问题
+    assert normalize_question(" 哪些商品库存不足？") == normalize_question("哪些商品库存不足?")
+    assert normalize_question("ＴＯＰ 10 商品") == normalize_question("top10商品")
+
+    cache = ResponseCache(max_entries=2, ttl_seconds=3600)
+    cache.put("哪些商品库存不足？", snapshot, 'v1', "回答A")
+    assert cache.get("哪些商品库存不足", snapshot, 'v1') == "回答A"
+    assert cache.get("哪些商品库存不足", new_snapshot, 'v1') is None, "数据变化后不应命中"
+    assert cache.get("哪些商品库存不足", snapshot, 'v2') is None, "提示词变化后不应命中"
+    assert (cache.hits, cache.misses) == (1, 2)
+    print("✅ 键由规范化问题、快照指纹和提示词版本组成")
+
+    # 2. 超出容量时淘汰最久未使用的条目
+    cache.put("问题B", snapshot, 'v1', "回答B")
+    cache.get("哪些商品库存不足", snapshot, 'v1')
+    cache.put("问题C", snapshot, 'v1', "回答C")
+    assert cache.get("问题B", snapshot, 'v1') is None
+    assert cache.get("哪些商品库存不足", snapshot, 'v1') == "回答A"
+    print("✅ LRU 淘汰正确")
+
+    # 3. 过期失效、快照替换时清理
+    expiring = ResponseCache(ttl_seconds=0.05)
+    expiring.put("问题", snapshot, 'v1', "回答")
+    time.sleep(0.1)
+    assert expiring.get("问题", snapshot, 'v1') is None
+    cache.evict_snapshot(snapshot, new_snapshot)
+    assert len(cache) == 0
+    print("✅ TTL 过期与快照替换清理正确")
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        # 4. 保存到磁盘后重新加载
+        persist_path = os.path.join(output_dir, 'responses.json')
+        ResponseCache(persist_path=persist_path).put("问题", snapshot, 'v1', "回答")
+        assert ResponseCache(persist_path=persist_path).get("问题", snapshot, 'v1') == "回答"
+        print("✅ 磁盘持久化正确")
+
+        # 5. 问答系统重复提问时只调用一次LLM
+        qa_system = InventoryQASystem()
+        qa_system.llm = CountingLLM()
+        qa_system.response_cache = ResponseCache()
+        qa_system.chart_dir = output_dir
+        qa_system.chart_cache = ChartCache(output_dir)
+        qa_system.chart_dpi = 72
+        qa_system.chart_workers = 0
+
+        first, first_charts = qa_system.analyze_data("我们的库存状况如何？")
+        timings = {}
+        second, second_charts = qa_system.analyze_data("我们的库存状况如何", timings)
+        assert qa_system.llm.calls == 1, "重复提问不应再次调用LLM"
+        assert second == first and timings['cache_hit']
+        assert [chart['path'] for chart in second_charts] == [chart['path'] for chart in first_charts]
+        print(f"✅ 重复提问命中缓存，耗时 {timings['total'] * 1000:.1f}ms")
+        qa_system.close()
+
+
+if __name__ == "__main__":
+    test_response_cache()
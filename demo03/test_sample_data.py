@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+示例数据生成测试：相同种子生成相同数据，生成的数据可以被数据存储层直接加载
+"""
+
+import importlib
+import os
+import tempfile
+import pandas as pd
+from config import SAFETY_STOCK_CONFIG
+from data_store import load_snapshot
+
+sample_data = importlib.import_module('1')
+
+NUM_PRODUCTS = 500
+NUM_DAYS = 45
+END_DATE = '2024-06-30'
+
+
+def generate(directory, seed):
+    data_files = {name: os.path.join(directory, f'{name}.csv') for name in ['inventory', 'products', 'sales_records']}
+    sample_data.generate_sample_data(NUM_PRODUCTS, NUM_DAYS, seed=seed, data_files=data_files, end_date=END_DATE)
+    return data_files
+
+
+def test_sample_data():
+    """测试示例数据的规模、可复现性与一致性"""
+    print("🧪 开始测试示例数据生成...")
+
+    with tempfile.TemporaryDirectory() as first_dir, tempfile.TemporaryDirectory() as second_dir:
+        first = generate(first_dir, seed=7)
+        second = generate(second_dir, seed=7)
+        for name in ['products', 'sales_records']:
+            assert pd.read_csv(first[name]).equals(pd.read_csv(second[name])), f"{name} 不可复现"
+        print("✅ 相同种子生成相同数据")
+
+        sales = pd.read_csv(first['sales_records'])
+        inventory = pd.read_csv(first['inventory'])
+        assert len(sales) == NUM_PRODUCTS * NUM_DAYS
+        assert sales['product_id'].nunique() == NUM_PRODUCTS
+        assert (sales.groupby('product_id')['date'].nunique() == NUM_DAYS).all()
+        assert (sales['quantity_sold'] >= 0).all()
+        assert sales['date'].max() == END_DATE
+
+        # 安全库存由最近一个分析周期的平均或最高日销量得到
+        recent = sales.groupby('product_id').tail(SAFETY_STOCK_CONFIG['analysis_period_days'])
+        stats = recent.groupby('product_id')['quantity_sold'].agg(['mean', 'max'])
+        safety_stock = inventory.set_index('product_id')['safety_stock']
+        stable = (safety_stock - stats['mean'] * SAFETY_STOCK_CONFIG['stable_product_multiplier']).abs() < 1e-6
+        volatile = safety_stock == stats['max'] * SAFETY_STOCK_CONFIG['volatile_product_multiplier']
+        assert (stable | volatile).all()
+        print(f"✅ {len(sales)} 条销售记录，安全库存与销量一致")
+
+        snapshot = load_snapshot(first)
+        assert len(snapshot.merged_df) == NUM_PRODUCTS
+        print("✅ 生成的数据可以被数据存储层加载")
+
+
+if __name__ == "__main__":
+    test_sample_data()
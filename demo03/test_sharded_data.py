@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+分片示例数据测试：各分片的商品编号互不重叠，多进程与单进程生成结果一致，数据存储层可以直接加载分片数据集
+"""
+
+import importlib
+import json
+import os
+import tempfile
+import pandas as pd
+from data_store import load_snapshot, read_manifest
+
+sample_data = importlib.import_module('1')
+
+NUM_PRODUCTS = 300
+NUM_DAYS = 20
+SHARDS = 3
+END_DATE = '2024-06-30'
+
+
+def read_shards(manifest_path, name):
+    return pd.concat([pd.read_csv(path) for path in read_manifest(manifest_path)[name]], ignore_index=True)
+
+
+def test_sharded_data():
+    """测试分片示例数据的生成与加载"""
+    print("🧪 开始测试分片示例数据...")
+
+    with tempfile.TemporaryDirectory() as serial_dir, tempfile.TemporaryDirectory() as parallel_dir:
+        manifest_path = sample_data.generate_sharded_data(serial_dir, NUM_PRODUCTS, NUM_DAYS,
+                                                          shards=SHARDS, workers=1, seed=7, end_date=END_DATE)
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        # 各分片负责一段连续且互不重叠的商品编号
+        assert len(manifest['shards']) == SHARDS
+        assert manifest['shards'][0]['product_start'] == 1
+        assert manifest['shards'][-1]['product_stop'] == NUM_PRODUCTS + 1
+        for previous, shard in zip(manifest['shards'], manifest['shards'][1:]):
+            assert previous['product_stop'] == shard['product_start']
+        products = read_shards(manifest_path, 'products')
+        assert products['product_id'].is_unique and len(products) == NUM_PRODUCTS
+        sales = read_shards(manifest_path, 'sales_records')
+        assert len(sales) == sum(shard['rows']['sales_records'] for shard in manifest['shards'])
+        assert manifest['end_date'] == END_DATE and sales['date'].max() == END_DATE
+        print(f"✅ {SHARDS} 个分片覆盖 {NUM_PRODUCTS} 个商品且互不重叠")
+
+        # 每个分片使用独立的随机数流，多进程生成与单进程生成结果一致
+        parallel_manifest = sample_data.generate_sharded_data(parallel_dir, NUM_PRODUCTS, NUM_DAYS,
+                                                              shards=SHARDS, workers=2, seed=7, end_date=END_DATE)
+        for name in ['products', 'sales_records']:
+            assert read_shards(parallel_manifest, name).equals(read_shards(manifest_path, name))
+        print("✅ 多进程生成结果可复现")
+
+        # 数据存储层直接加载分片数据集
+        snapshot = load_snapshot({'manifest': manifest_path})
+        assert len(snapshot.merged_df) == NUM_PRODUCTS
+        assert snapshot.merged_df['name'].notna().all()
+        assert int(snapshot.sales_stats['total_sales'].sum()) == int(sales['quantity_sold'].sum())
+        assert os.path.exists(os.path.join(serial_dir, 'manifest.json'))
+        print("✅ 数据存储层可以直接加载分片数据集")
+
+
+if __name__ == "__main__":
+    test_sharded_data()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Web界面多会话负载测试：所有会话共用一个问答系统（同一份数据快照和同一个LLM客户端），
+打开新会话不会创建新的问答系统；同时输出会话数增加时的内存增长（每个会话只保存自己的聊天历史）
+"""
+
+import gc
+import tracemalloc
+from streamlit.testing.v1 import AppTest
+from data_store import load_snapshot, get_snapshot
+from llm_client import get_llm
+from qa_system import InventoryQASystem
+
+SESSION_COUNTS = [1, 5, 10, 20]
+
+# 测量前先打开的会话数，排除首次运行页面时的一次性初始化开销
+WARMUP_SESSIONS = 3
+
+
+def open_session():
+    """打开一个新的浏览器会话（执行一次页面脚本）"""
+    session = AppTest.from_file('web_qa.py', default_timeout=60)
+    session.run()
+    return session
+
+
+def per_session_cost_without_sharing():
+    """旧实现中每个会话至少额外占用的内存：一份完整的数据快照"""
+    return sum(load_snapshot().memory_usage().values())
+
+
+def test_shared_sessions():
+    """测试各会话共用同一个问答系统，并输出会话数增加时的内存增长"""
+    print("🧪 开始多会话负载测试...")
+
+    baseline_cost = per_session_cost_without_sharing()
+
+    # 记录打开会话期间创建的问答系统
+    created = []
+    original_init = InventoryQASystem.__init__
+
+    def recording_init(self, *args, **kwargs):
+        original_init(self, *args, **kwargs)
+        created.append(self)
+
+    InventoryQASystem.__init__ = recording_init
+    try:
+        # 先打开的会话排除首次运行页面时的一次性初始化开销，测量从最后一个会话开始
+        sessions = [open_session() for _ in range(WARMUP_SESSIONS + 1)]
+        gc.collect()
+        tracemalloc.start()
+        base, _ = tracemalloc.get_traced_memory()
+
+        print(f"{'会话数':<8}{'新增内存 (KB)':>16}{'每会话增量 (KB)':>16}")
+        print("-" * 40)
+        previous_count, previous_growth = 1, 0
+        for count in SESSION_COUNTS[1:]:
+            while len(sessions) < WARMUP_SESSIONS + count:
+                sessions.append(open_session())
+            gc.collect()
+            current, _ = tracemalloc.get_traced_memory()
+            growth = current - base
+            # 相邻两档之间的每会话增量（排除 Streamlit 后台一次性初始化带来的跳变）
+            per_session = (growth - previous_growth) / (count - previous_count)
+            previous_count, previous_growth = count, growth
+            print(f"{count:<10}{growth / 1024:>16.1f}{per_session / 1024:>16.1f}")
+        tracemalloc.stop()
+    finally:
+        InventoryQASystem.__init__ = original_init
+
+    print("-" * 40)
+    print(f"旧实现每会话至少额外占用（一份数据快照）: {baseline_cost / 1024:.1f} KB")
+
+    assert len(created) <= 1, f"{len(sessions)} 个会话创建了 {len(created)} 个问答系统，应共用一个"
+    for qa_system in created:
+        assert qa_system.llm is get_llm() and qa_system.snapshot is get_snapshot()
+    print(f"✅ {len(sessions)} 个会话共用同一个问答系统（同一份数据快照和LLM客户端），每个会话只保存自己的聊天历史")
+
+
+if __name__ == "__main__":
+    test_shared_sessions()
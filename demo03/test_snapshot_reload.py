@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+数据热加载测试：数据文件变化后后台监控线程替换快照并通知回调，并发的重新加载按顺序替换，
+问答系统关闭后取消注册回调，不再被一直引用
+"""
+
+import gc
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+import data_store
+from config import DATA_FILES, RELOAD_CONFIG
+from data_store import SnapshotWatcher, load_snapshot, source_signature, add_snapshot_listener, remove_snapshot_listener
+from qa_system import InventoryQASystem
+
+
+def rewrite_first_stock(path, stock):
+    """修改第一个商品的当前库存"""
+    with open(path, encoding='utf-8') as f:
+        header, first, *rest = f.read().splitlines(keepends=True)
+    fields = first.split(',')
+    fields[1] = str(stock)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(header + ','.join(fields) + ''.join(rest))
+
+
+def test_snapshot_reload():
+    """测试监控线程、快照替换回调与并发重新加载"""
+    print("🧪 开始测试数据热加载...")
+    previous_snapshot = data_store._snapshot
+    swaps = []
+
+    def listener(old, new):
+        swaps.append((old, new))
+
+    add_snapshot_listener(listener)
+    try:
+        # 1. 数据文件变化后替换快照并通知回调；没有变化时不重新加载
+        with tempfile.TemporaryDirectory() as data_dir:
+            data_files = {name: shutil.copy(DATA_FILES[name], data_dir)
+                          for name in ['inventory', 'products', 'sales_records']}
+            original = load_snapshot(data_files)
+            data_store._swap_snapshot(original)
+            swaps.clear()
+
+            watcher = SnapshotWatcher(data_files, interval=0.05)
+            assert watcher.check() is False and data_store.get_snapshot() is original
+
+            rewrite_first_stock(data_files['inventory'], 12345)
+            watcher.start()
+            deadline = time.time() + 10
+            while data_store.get_snapshot() is original and time.time() < deadline:
+                time.sleep(0.05)
+            watcher.stop()
+            watcher.join()
+
+            current = data_store.get_snapshot()
+            assert current is not original, "数据文件变化后应替换快照"
+            assert int(current.inventory_df['current_stock'].iloc[0]) == 12345
+            assert int(original.inventory_df['current_stock'].iloc[0]) != 12345, "旧快照不应被修改"
+            assert swaps == [(original, current)]
+
+            # 监控其他数据文件（如问答系统启动的、监控正式数据的线程）的检查不会把快照换回去
+            assert SnapshotWatcher(DATA_FILES, signature=source_signature(DATA_FILES)).check() is False
+            assert data_store.get_snapshot() is current
+            print("✅ 数据文件变化后后台替换快照，回调收到新旧快照；监控其他文件的线程不会换回快照")
+
+        # 2. 并发的重新加载依次进行，先开始的加载不会覆盖后完成的快照
+        swaps.clear()
+        sequence = []
+        sequence_lock = threading.Lock()
+        original_load = data_store.load_snapshot
+
+        def slow_load(*args, **kwargs):
+            with sequence_lock:
+                number = len(sequence)
+                sequence.append(number)
+            time.sleep(0.2 if number == 0 else 0.01)
+            return SimpleNamespace(number=number)
+
+        data_store.load_snapshot = slow_load
+        try:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                list(executor.map(lambda _: data_store.get_snapshot(reload=True), range(4)))
+        finally:
+            data_store.load_snapshot = original_load
+        numbers = [new.number for _, new in swaps]
+        assert numbers == sorted(numbers) and len(numbers) == 4
+        assert data_store.get_snapshot().number == 3
+        print("✅ 并发的重新加载按开始顺序替换快照")
+    finally:
+        remove_snapshot_listener(listener)
+        data_store._swap_snapshot(previous_snapshot)
+    assert listener not in data_store._listeners
+
+    # 3. 问答系统关闭后取消注册回调，可以被回收
+    previous_reload = RELOAD_CONFIG['enabled']
+    RELOAD_CONFIG['enabled'] = False
+    try:
+        qa_system = InventoryQASystem()
+    finally:
+        RELOAD_CONFIG['enabled'] = previous_reload
+    callbacks = list(qa_system._snapshot_listeners)
+    assert callbacks and all(callback in data_store._listeners for callback in callbacks)
+    qa_system.close()
+    assert not any(callback in data_store._listeners for callback in callbacks)
+    reference = weakref.ref(qa_system)
+    del qa_system, callbacks
+    gc.collect()
+    assert reference() is None, "关闭后的问答系统不应被快照回调引用"
+    print("✅ 问答系统关闭后取消注册回调，可以被回收")
+
+
+if __name__ == "__main__":
+    test_snapshot_reload()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+流式问答测试：多次提问与多个会话线程同时提问时，异步调用都在同一个长期运行的事件循环中执行
+（LLM客户端的连接池绑定在事件循环上），回答片段按顺序完整输出；
+LLM 在输出中途出错或调用方提前停止遍历时，后台图表渲染也会结束并取回结果
+"""
+
+import asyncio
+import gc
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fake_llm import FakeLLM
+from llm_client import run_async, iter_async, get_event_loop
+from qa_system import InventoryQASystem
+
+QUESTION = "请评估一下整体经营状况"
+
+
+class LoopRecordingLLM(FakeLLM):
+    """记录每次流式调用所在事件循环的模拟 LLM"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.loops = []
+
+    async def astream(self, messages, **kwargs):
+        self.loops.append(asyncio.get_running_loop())
+        async for chunk in super().astream(messages, **kwargs):
+            yield chunk
+
+
+class FailingStreamLLM(FakeLLM):
+    """输出两个片段后出错的模拟 LLM"""
+
+    async def astream(self, messages, **kwargs):
+        count = 0
+        async for chunk in super().astream(messages, **kwargs):
+            if count == 2:
+                raise RuntimeError("模拟的连接中断")
+            count += 1
+            yield chunk
+
+
+def stream(qa_system, question):
+    """像 Web 界面一样在调用方线程中逐个取出回答片段"""
+    timings = {}
+    token_stream, charts_info = run_async(qa_system.aanalyze_data(question, timings))
+    return ''.join(iter_async(token_stream)), charts_info, timings
+
+
+def test_streaming_qa():
+    """测试流式问答的事件循环与回答内容"""
+    print("🧪 开始测试流式问答...")
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        qa_system = InventoryQASystem()
+        qa_system.llm = LoopRecordingLLM(latency=0.05)
+        qa_system.response_cache = None
+        qa_system.chart_dir = output_dir
+        qa_system.chart_cache = None
+        qa_system.chart_dpi = 72
+        qa_system.chart_workers = 0
+
+        # 1. 依次提问与多个线程同时提问，都使用同一个事件循环
+        text, _, timings = stream(qa_system, QUESTION)
+        assert text == qa_system.llm.response and timings['first_token'] <= timings['total']
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda i: stream(qa_system, f"{QUESTION}{i}"), range(4)))
+        assert all(text == qa_system.llm.response for text, _, _ in results)
+        loop = get_event_loop()
+        assert len(qa_system.llm.loops) == 5 and all(item is loop for item in qa_system.llm.loops)
+        assert loop.is_running() and not loop.is_closed()
+        print(f"✅ {len(qa_system.llm.loops)} 次流式调用使用同一个事件循环，回答完整")
+
+        # 2. LLM 中途出错、提前停止遍历或没有遍历回答流：渲染结束后才结束链路，渲染异常都被取回
+        unhandled = []
+        loop.set_exception_handler(lambda _, context: unhandled.append(context.get('message')))
+        render = qa_system._timed_render
+
+        def slow_render(*args):
+            time.sleep(0.3)
+            render(*args)
+
+        def failing_render(*args):
+            time.sleep(0.1)
+            raise OSError("模拟的图表写入失败")
+
+        try:
+            qa_system.llm = FailingStreamLLM(latency=0.02)
+            qa_system._timed_render = slow_render
+            timings = {}
+            token_stream, charts_info = run_async(qa_system.aanalyze_data(QUESTION, timings))
+            received = []
+            try:
+                for token in iter_async(token_stream):
+                    received.append(token)
+                raise AssertionError("LLM 出错时应抛出原来的异常")
+            except RuntimeError as e:
+                assert "连接中断" in str(e)
+            assert len(received) == 2 and 'total' in timings
+            assert all(os.path.exists(chart['path']) for chart in charts_info), "应等待后台渲染完成"
+            print("✅ LLM 中途出错时抛出原来的异常，并等待后台渲染完成")
+
+            qa_system.llm = FakeLLM(latency=0.05)
+            qa_system._timed_render = failing_render
+            timings = {}
+            token_stream, _ = run_async(qa_system.aanalyze_data(QUESTION, timings))
+            for _ in iter_async(token_stream):
+                break
+            assert 'total' in timings, "提前停止遍历时也应结束链路"
+
+            token_stream, _ = run_async(qa_system.aanalyze_data(QUESTION, {}))
+            del token_stream
+            time.sleep(0.3)
+            gc.collect()
+            run_async(asyncio.sleep(0))
+            assert not unhandled, f"后台渲染的异常没有被取回: {unhandled}"
+            print("✅ 提前停止遍历或没有遍历回答流时，渲染异常不会遗留")
+        finally:
+            loop.set_exception_handler(None)
+            qa_system._timed_render = render
+        qa_system.close()
+
+
+if __name__ == "__main__":
+    test_streaming_qa()
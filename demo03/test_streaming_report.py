@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+流式报告测试：逐段分块写出的报告与一次性生成的报告逐字节一致
+"""
+
+import os
+import tempfile
+from config import REPORT_CONFIG
+from simple_report_generator import generate_simple_report
+from compact_report_generator import CompactReportGenerator
+
+# 使用很小的分块，确保表格跨越多个分块
+CHUNK_ROWS = 7
+
+
+def read_text(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def test_streaming_report():
+    """测试流式写出与一次性生成的报告一致"""
+    print("🧪 开始测试流式报告...")
+
+    chunk_rows = REPORT_CONFIG['stream_chunk_rows']
+    REPORT_CONFIG['stream_chunk_rows'] = CHUNK_ROWS
+    try:
+        with tempfile.TemporaryDirectory() as output_dir:
+            # 简单报告
+            in_memory_path = os.path.join(output_dir, 'simple.md')
+            streamed_path = os.path.join(output_dir, 'simple_stream.md')
+            report = generate_simple_report(output_path=in_memory_path)
+            assert generate_simple_report(stream=True, output_path=streamed_path) == streamed_path
+            assert read_text(streamed_path) == report == read_text(in_memory_path)
+            print("✅ 简单报告流式写出结果一致")
+
+            # 简洁报告
+            generator = CompactReportGenerator()
+            in_memory_path = os.path.join(output_dir, 'compact.md')
+            streamed_path = os.path.join(output_dir, 'compact_stream.md')
+            report = generator.generate_compact_report(output_path=in_memory_path)
+            generator.generate_compact_report(stream=True, output_path=streamed_path)
+            assert read_text(streamed_path) == report == read_text(in_memory_path)
+            assert not os.path.exists(streamed_path + '.tmp')
+            print("✅ 简洁报告流式写出结果一致")
+    finally:
+        REPORT_CONFIG['stream_chunk_rows'] = chunk_rows
+
+
+if __name__ == "__main__":
+    test_streaming_report()
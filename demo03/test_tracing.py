@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+链路追踪测试：问答各阶段记录为带属性的片段，钩子在问题结束时收到完整链路，OTLP/JSON 导出格式正确，
+命令行入口配置日志后耗时明细输出到标准错误
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from fake_llm import FakeLLM
+from llm_client import set_llm
+from qa_system import InventoryQASystem
+from tracing import OTelFileExporter, TraceHook, add_trace_hook, remove_trace_hook, format_breakdown
+
+QUESTION = "请评估一下整体经营状况"
+
+# 在新的解释器中（根日志器没有处理器，与命令行入口相同）配置日志并结束一条链路
+LOGGING_SCRIPT = """
+import sys
+from tracing import configure_logging, start_trace, finish_trace
+configure_logging(sys.argv[1])
+trace = start_trace('qa.question')
+with trace.span('summary'):
+    pass
+finish_trace(trace)
+"""
+
+
+class CollectingHook(TraceHook):
+    """收集结束的链路"""
+
+    def __init__(self):
+        self.traces = []
+
+    def on_trace_end(self, trace):
+        self.traces.append(trace)
+
+
+def test_tracing():
+    """测试问答链路的阶段、属性与导出"""
+    print("🧪 开始测试链路追踪...")
+
+    previous_llm = set_llm(FakeLLM(latency=0.01))
+    hook = CollectingHook()
+    with tempfile.TemporaryDirectory() as output_dir:
+        exporter = OTelFileExporter(os.path.join(output_dir, 'traces.jsonl'))
+        add_trace_hook(hook)
+        add_trace_hook(exporter)
+        try:
+            qa_system = InventoryQASystem()
+            qa_system.chart_dir = output_dir
+            qa_system.chart_cache = None
+            qa_system.chart_dpi = 72
+            qa_system.chart_workers = 0
+            timings = {}
+            qa_system.analyze_data(QUESTION, timings)
+            qa_system.close()
+        finally:
+            remove_trace_hook(hook)
+            remove_trace_hook(exporter)
+            set_llm(previous_llm)
+
+        # 各阶段按层级排列，耗时与 timings 一致
+        names = [item['name'] for item in timings['breakdown']]
+        assert names[0] == 'qa.question'
+        for phase in ['summary', 'prompt', 'charts', 'llm']:
+            assert phase in names, f"缺少阶段 {phase}"
+        charts_index = names.index('charts')
+        assert names[charts_index + 1].startswith('chart.'), "图表子阶段应紧跟在 charts 之后"
+        breakdown = {item['name']: item for item in timings['breakdown']}
+        assert breakdown['llm']['duration'] == timings['llm']
+        assert breakdown['llm']['attributes']['input_tokens'] > 0
+        assert breakdown['llm']['attributes']['output_tokens'] > 0
+        assert breakdown[names[charts_index + 1]]['attributes']['size_bytes'] > 0
+        print("\n".join(format_breakdown(timings['breakdown'])))
+        print("✅ 阶段耗时、token 数与图表大小已记录")
+
+        # 钩子收到完整链路
+        assert len(hook.traces) == 1 and hook.traces[0].trace_id == timings['trace_id']
+
+        # OTLP/JSON：每条链路一行，子片段引用父片段
+        with open(exporter.path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        assert len(lines) == 1
+        spans = json.loads(lines[0])['resourceSpans'][0]['scopeSpans'][0]['spans']
+        span_ids = {span['spanId'] for span in spans}
+        assert all(span['traceId'] == timings['trace_id'] for span in spans)
+        assert all(span['parentSpanId'] in span_ids for span in spans if 'parentSpanId' in span)
+        assert all(int(span['endTimeUnixNano']) >= int(span['startTimeUnixNano']) for span in spans)
+        print(f"✅ 钩子收到链路，OTLP/JSON 导出 {len(spans)} 个片段")
+
+    # 配置日志后内置日志钩子的耗时明细输出到标准错误，级别调高后不再输出
+    outputs = {level: subprocess.run([sys.executable, '-c', LOGGING_SCRIPT, level], capture_output=True,
+                                     text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stderr
+               for level in ['INFO', 'WARNING']}
+    assert 'INFO inventory.tracing: qa.question' in outputs['INFO'] and 'summary' in outputs['INFO']
+    assert 'inventory.tracing' not in outputs['WARNING']
+    print("✅ 配置日志后耗时明细输出到标准错误")
+
+
+if __name__ == "__main__":
+    test_tracing()
@@ -0,0 +1,287 @@
+# 问答链路追踪
+# 每个问题对应一条链路（trace），其中的各个阶段（本地查询、回答缓存、数据摘要、提示词、图表渲染、LLM调用）
+# 记录为带属性的时间片段（span），属性包括 token 数、图表文件大小等。
+# 链路结束时交给已注册的钩子处理：内置日志钩子把耗时明细写入日志，
+# OTelFileExporter 把链路按 OpenTelemetry OTLP/JSON 格式逐行追加到本地文件
+# （可由 OpenTelemetry Collector 的 otlpjsonfile 接收器读取，不依赖 opentelemetry SDK）。
+# 自定义钩子只需实现 on_trace_end(trace)。
+# 日志由命令行入口调用 configure_logging 输出到标准错误；作为库导入时不配置日志处理器。
+
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from config import TRACING_CONFIG
+
+logger = logging.getLogger('inventory.tracing')
+
+SERVICE_NAME = 'inventory-qa'
+SCOPE_NAME = 'inventory.tracing'
+
+
+class Span:
+    """链路中的一个时间片段"""
+
+    def __init__(self, name, trace_id, parent=None, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self._start = time.perf_counter()
+        self.end_ns = None
+        self.duration = None
+        self.error = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def end(self):
+        if self.duration is None:
+            self.duration = time.perf_counter() - self._start
+            self.end_ns = self.start_ns + int(self.duration * 1e9)
+
+
+class Trace:
+    """一个问题的完整链路；可在多个线程中同时创建片段"""
+
+    def __init__(self, name, **attributes):
+        self.trace_id = secrets.token_hex(16)
+        self.root = Span(name, self.trace_id, attributes=attributes)
+        self.spans = [self.root]
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, parent=None, timings=None, key=None, **attributes):
+        """
+        记录一个阶段；parent 默认为根片段（在其他线程中创建子片段时需显式传入）
+
+        传入 timings 时阶段结束后把耗时（秒）写入 timings[key]（key 默认为 name），
+        与问答系统原有的各阶段耗时保持一致
+        """
+        span = Span(name, self.trace_id, parent or self.root, attributes)
+        with self._lock:
+            self.spans.append(span)
+        try:
+            yield span
+        except Exception as e:
+            span.error = str(e)
+            raise
+        finally:
+            span.end()
+            if timings is not None:
+                timings[key or name] = span.duration
+
+    def breakdown(self):
+        """各阶段耗时明细（可序列化的字典列表），子阶段紧跟在所属阶段之后，同级按开始时间排列"""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start_ns)
+        children = {}
+        for span in spans:
+            if span is not self.root:
+                children.setdefault(span.parent.span_id, []).append(span)
+
+        ordered = []
+        pending = [self.root]
+        while pending:
+            span = pending.pop()
+            ordered.append(span)
+            pending.extend(reversed(children.get(span.span_id, [])))
+        return [{
+            'name': span.name,
+            'depth': span.depth,
+            'duration': span.duration if span.duration is not None else 0.0,
+            'attributes': dict(span.attributes)
+        } for span in ordered]
+
+
+def format_breakdown(breakdown):
+    """把耗时明细格式化为缩进的文本行"""
+    lines = []
+    for item in breakdown:
+        details = ', '.join(f"{key}={value}" for key, value in item['attributes'].items()
+                            if key not in ('question',))
+        line = f"{'  ' * item['depth']}{item['name']} {item['duration'] * 1000:.1f}ms"
+        lines.append(f"{line} ({details})" if details else line)
+    return lines
+
+
+class TraceHook:
+    """链路钩子：链路结束时调用 on_trace_end，子类按需覆盖（默认不做任何处理）"""
+
+    def on_trace_end(self, trace):
+        pass
+
+
+def configure_logging(level=None):
+    """命令行入口的日志配置：inventory.*（链路耗时明细、提示词预算等）按 level 输出到标准错误，
+    默认取 TRACING_CONFIG['log_level']；根日志器已有处理器时沿用原有处理器"""
+    logging.basicConfig(format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    logging.getLogger('inventory').setLevel((level or TRACING_CONFIG['log_level']).upper())
+
+
+class LoggingHook(TraceHook):
+    """把每条链路的耗时明细写入日志"""
+
+    def __init__(self, level=logging.INFO):
+        self.level = level
+
+    def on_trace_end(self, trace):
+        if logger.isEnabledFor(self.level):
+            logger.log(self.level, "%s %s\n%s", trace.root.name, trace.trace_id,
+                       '\n'.join(format_breakdown(trace.breakdown())))
+
+
+def _otlp_value(value):
+    """Python 值转换为 OTLP/JSON 的 AnyValue"""
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _otlp_attributes(attributes):
+    return [{'key': key, 'value': _otlp_value(value)} for key, value in attributes.items()]
+
+
+class OTelFileExporter(TraceHook):
+    """把链路按 OTLP/JSON 格式逐行追加到本地文件（每条链路一行 ExportTraceServiceRequest）"""
+
+    def __init__(self, path, service_name=SERVICE_NAME):
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    def to_otlp(self, trace):
+        spans = []
+        for span in trace.spans:
+            item = {
+                'traceId': span.trace_id,
+                'spanId': span.span_id,
+                'name': span.name,
+                'kind': 1,  # SPAN_KIND_INTERNAL
+                'startTimeUnixNano': str(span.start_ns),
+                'endTimeUnixNano': str(span.end_ns or span.start_ns),
+                'attributes': _otlp_attributes(span.attributes),
+                'status': {'code': 2, 'message': span.error} if span.error else {'code': 1}
+            }
+            if span.parent is not None:
+                item['parentSpanId'] = span.parent.span_id
+            spans.append(item)
+        return {'resourceSpans': [{
+            'resource': {'attributes': _otlp_attributes({'service.name': self.service_name})},
+            'scopeSpans': [{'scope': {'name': SCOPE_NAME}, 'spans': spans}]
+        }]}
+
+    def on_trace_end(self, trace):
+        line = json.dumps(self.to_otlp(trace), ensure_ascii=False)
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+
+_hooks = None
+_hooks_lock = threading.Lock()
+
+
+def _configured_hooks():
+    """按 TRACING_CONFIG 创建默认钩子"""
+    hooks = []
+    if TRACING_CONFIG['log']:
+        hooks.append(LoggingHook())
+    if TRACING_CONFIG['otel_export_path']:
+        hooks.append(OTelFileExporter(TRACING_CONFIG['otel_export_path']))
+    return hooks
+
+
+def get_trace_hooks():
+    """当前注册的钩子（首次调用时按配置创建默认钩子）"""
+    global _hooks
+    with _hooks_lock:
+        if _hooks is None:
+            _hooks = _configured_hooks()
+        return list(_hooks)
+
+
+def add_trace_hook(hook):
+    """注册链路钩子"""
+    get_trace_hooks()
+    with _hooks_lock:
+        if hook not in _hooks:
+            _hooks.append(hook)
+
+
+def remove_trace_hook(hook):
+    """取消注册链路钩子"""
+    get_trace_hooks()
+    with _hooks_lock:
+        if hook in _hooks:
+            _hooks.remove(hook)
+
+
+def start_trace(name, **attributes):
+    """开始一条链路"""
+    return Trace(name, **attributes)
+
+
+def finish_trace(trace):
+    """结束链路并交给各个钩子；钩子出错不影响回答"""
+    trace.root.end()
+    if not TRACING_CONFIG['enabled']:
+        return
+    for hook in get_trace_hooks():
+        try:
+            hook.on_trace_end(trace)
+        except Exception as e:
+            print(f"⚠️  链路钩子执行失败: {e}")
+
+
+def count_tokens(text):
+    """
+    估算文本的 token 数：安装了 tiktoken 时使用 cl100k_base 编码，
+    否则按字符保守估算（中文等非 ASCII 字符按 1 个 token，ASCII 字符按 2 个一个 token；
+    JSON 中的数字、编号和标点切分得很碎，按英文文本的 4 个一个 token 会明显低估）
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        ascii_chars = len(text.encode('ascii', 'ignore'))
+        return len(text) - ascii_chars + -(-ascii_chars // 2)
+    return len(encoding.encode(text))
+
+
+def token_attributes(messages, text, usage=None):
+    """LLM调用的 token 数：优先使用接口返回的用量，否则按文本估算"""
+    if usage:
+        return {'input_tokens': usage['input_tokens'], 'output_tokens': usage['output_tokens']}
+    return {
+        'input_tokens': sum(count_tokens(message.content) for message in messages),
+        'output_tokens': count_tokens(text),
+        'tokens_estimated': True
+    }
+
+
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding('cl100k_base')
+        except Exception:
+            _encoding = None
+        _encoding_loaded = True
+    return _encoding
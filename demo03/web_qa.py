@@ -1,41 +1,75 @@
 import streamlit as st
-from qa_system import InventoryQASystem
+from qa_system import InventoryQASystem, answer_source
+from llm_client import run_async, iter_async
+from tracing import format_breakdown, configure_logging
 import os
 
 st.set_page_config(page_title="库存智能问答", page_icon="📊", layout="centered")
 st.title("📊 库存智能问答系统")
 st.caption("支持多轮对话，自动生成图表 | Powered by LLM + pandas + matplotlib")
 
-# 初始化问答系统（只初始化一次）
-if 'qa_system' not in st.session_state:
-    st.session_state.qa_system = InventoryQASystem()
+# 问答系统在进程内只初始化一次，所有会话共用同一份数据快照和LLM客户端（链路耗时明细输出到服务端日志）
+@st.cache_resource
+def get_qa_system():
+    configure_logging()
+    return InventoryQASystem()
 
-# 聊天历史
+qa = get_qa_system()
+
+# 聊天历史（每个会话独立保存）
 if 'chat_history' not in st.session_state:
-    st.session_state.chat_history = []  # [(user, ai, [charts])]
+    st.session_state.chat_history = []  # [(user, ai, [charts], timings)]
 
 # 用户输入
 with st.form(key="chat_form", clear_on_submit=True):
     user_input = st.text_input("请输入您的问题：", "", key="user_input")
     submit = st.form_submit_button("发送")
 
-if submit and user_input.strip():
-    # 处理问题
-    qa = st.session_state.qa_system
-    ai_reply, charts = qa.analyze_data(user_input)
-    st.session_state.chat_history.append((user_input, ai_reply, charts))
+def show_timings(timings):
+    """展示各阶段耗时（首字延迟为主要指标，图表渲染与LLM调用同时进行）"""
+    first_token = f"首字 {timings['first_token']:.2f}s · " if 'first_token' in timings else ""
+    st.caption(f"⏱️{answer_source(timings)} {first_token}数据摘要 {timings['summary']:.2f}s · "
+               f"图表渲染 {timings['charts']:.2f}s · LLM {timings['llm']:.2f}s · 总计 {timings['total']:.2f}s")
+    if 'breakdown' in timings:
+        with st.expander("🧭 阶段耗时明细"):
+            st.code('\n'.join(format_breakdown(timings['breakdown'])), language=None)
+
+def show_charts(charts):
+    for chart in charts:
+        if os.path.exists(chart['path']):
+            st.image(chart['path'], caption=chart['description'], use_column_width=True)
+        else:
+            # 数据多次更新后，较早快照的图表文件已被清理
+            st.caption(f"📊 {chart['description']}（数据已更新，该图表已清理，请重新提问）")
 
 # 展示历史对话
-for idx, (user, ai, charts) in enumerate(st.session_state.chat_history):
+for idx, (user, ai, charts, timings) in enumerate(st.session_state.chat_history):
     with st.chat_message("user"):
         st.markdown(f"**你：** {user}")
     with st.chat_message("assistant"):
         st.markdown(f"**AI：** {ai}")
-        # 展示图表
-        if charts:
-            for chart in charts:
-                if os.path.exists(chart['path']):
-                    st.image(chart['path'], caption=chart['description'], use_column_width=True)
+        show_charts(charts)
+        show_timings(timings)
+
+if submit and user_input.strip():
+    # 处理问题：回答片段到达后逐步显示
+    with st.chat_message("user"):
+        st.markdown(f"**你：** {user_input}")
+    with st.chat_message("assistant"):
+        placeholder = st.empty()
+        timings = {}
+        
+        # 异步调用在进程内共享的事件循环中执行（各会话共用LLM客户端及其连接池），
+        # 回答片段在页面脚本线程中逐个取出并显示
+        token_stream, charts = run_async(qa.aanalyze_data(user_input, timings))
+        ai_reply = ""
+        for token in iter_async(token_stream):
+            ai_reply += token
+            placeholder.markdown(f"**AI：** {ai_reply}▌")
+        placeholder.markdown(f"**AI：** {ai_reply}")
+        show_charts(charts)
+        show_timings(timings)
+    st.session_state.chat_history.append((user_input, ai_reply, charts, timings))
 
 # 底部说明
 st.markdown("---")